@@ -0,0 +1,80 @@
+from typing import List, TypedDict
+
+from src.engine.grid import Grid, SCORE_GRID
+from src.utils.typing import enum
+
+
+class BenchmarkPosition(TypedDict):
+    name: str
+    # 15 rows of 15 cells, "." for an empty cell
+    rows: List[str]
+    rack: List[str]
+
+
+_EMPTY_ROWS = ["." * 15] * 15
+
+# boards reached by the naive strategies in the game of seed 2024
+_MID_GAME_ROWS = [
+    "...............",
+    "...............",
+    "...............",
+    "azotant........",
+    "...r...........",
+    ".d.i..s........",
+    ".h.c..h........",
+    ".aikidos.......",
+    ".r....weber....",
+    ".mi....lutina..",
+    ".an............",
+    "..d............",
+    "..u............",
+    ".velant........",
+    "mu....epiait...",
+]
+
+_ENDGAME_ROWS = [
+    ".......formais.",
+    ".....soiree....",
+    "....veule......",
+    "azotant.elle...",
+    "...r...........",
+    ".d.i..s........",
+    ".h.c..h........",
+    ".aikidos.......",
+    ".r....weber.f..",
+    ".mi.c..lutina..",
+    "banjo......ex..",
+    "..denoyes.pre..",
+    "..u.g..nuques..",
+    ".velant........",
+    "mu....epiait...",
+]
+
+POSITIONS: List[BenchmarkPosition] = [
+    BenchmarkPosition(name="empty", rows=_EMPTY_ROWS, rack=list("eanrtls")),
+    BenchmarkPosition(name="empty_blank", rows=_EMPTY_ROWS, rack=list("eanrt*s")),
+    BenchmarkPosition(name="mid_game", rows=_MID_GAME_ROWS, rack=list("oqeaisu")),
+    BenchmarkPosition(name="mid_game_blank", rows=_MID_GAME_ROWS, rack=list("lerp*ai")),
+    BenchmarkPosition(name="endgame", rows=_ENDGAME_ROWS, rack=list("tag")),
+    BenchmarkPosition(name="endgame_blank", rows=_ENDGAME_ROWS, rack=list("t*g")),
+]
+
+
+def build_grid(position: BenchmarkPosition) -> Grid:
+    grid = Grid()
+    for row, cells in enumerate(position["rows"]):
+        for col, cell in enumerate(cells):
+            if cell != ".":
+                grid[row, col] = cell
+    return grid
+
+
+def build_score_grid(grid: Grid) -> Grid:
+    """
+    Score grid of a position, the premium cells covered by a tile are consumed
+    :param grid:
+    :return:
+    """
+    score_grid = Grid(SCORE_GRID.grid)
+    score_grid[grid.grid != ""] = enum.CellValue.EMPTY.value
+    return score_grid
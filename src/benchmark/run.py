@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.tree import BASE_TREE, convert_to_tree
+from src.engine.word_checker import WordPlacerChecker
+from src.game_thread import play_computer_vs_computer_game
+from src.search_strategy.ParallelSearch import ParallelSearch
+from src.search_strategy.registry import build_strategy
+from src.settings import settings
+from src.settings.logger_config import print_logger
+from src.utils.utils import derive_seed, load_word, percentile
+
+# metrics where a higher value is better, every other metric is a duration or a size
+HIGHER_IS_BETTER = ("games_per_second", "speedup")
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "mean": sum(latencies) / len(latencies),
+    }
+
+
+def bench_move_generation(
+    strategy_codes: List[str], position_names: Optional[List[str]], repeats: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Latency of find_best_word for each strategy on each position of the corpus
+    :param strategy_codes:
+    :param position_names: positions to run, all of them if None
+    :param repeats: number of searches per strategy and position
+    :return: strategy -> position -> latency percentiles in seconds
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for strategy_code in strategy_codes:
+        strategy = build_strategy(strategy_code)
+        results[strategy_code] = {}
+        for position in POSITIONS:
+            if position_names is not None and position["name"] not in position_names:
+                continue
+            grid = build_grid(position)
+            checker = WordPlacerChecker(grid, BASE_TREE)
+            # the searches only read the premiums, they share one score grid
+            score_grid = build_score_grid(grid)
+            latencies = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                strategy.find_best_word(list(position["rack"]), checker, score_grid)
+                latencies.append(time.perf_counter() - start)
+            results[strategy_code][position["name"]] = _latency_summary(latencies)
+            print_logger.warning(
+                f"{strategy_code} on {position['name']}: "
+                f"p50 {results[strategy_code][position['name']]['p50']:.3f}s"
+            )
+    return results
+
+
+def bench_thread_scaling(
+    thread_counts: List[int], position_names: Optional[List[str]], repeats: int
+) -> Dict[str, Dict[str, float]]:
+    """
+    Time of find_best_word of NaiveSearch with the lines of the board searched by
+    threads, on the positions of the corpus. The threads only scale on a free-threaded
+    build, on other builds the moves are the same but the time is not divided.
+    :param thread_counts: numbers of threads to time, 1 being the serial search
+    :param position_names: positions to run, all of them if None
+    :param repeats: number of searches per position
+    :return: number of threads -> seconds of the searches and speedup over 1 thread
+    """
+    positions = [
+        position
+        for position in POSITIONS
+        if position_names is None or position["name"] in position_names
+    ]
+    results: Dict[str, Dict[str, float]] = {}
+    serial_seconds = None
+    for threads in thread_counts:
+        strategy = ParallelSearch(processes=threads, threads=True)
+        start = time.perf_counter()
+        for position in positions:
+            grid = build_grid(position)
+            checker = WordPlacerChecker(grid, BASE_TREE)
+            score_grid = build_score_grid(grid)
+            for _ in range(repeats):
+                strategy.find_best_word(list(position["rack"]), checker, score_grid)
+        seconds = time.perf_counter() - start
+        strategy.close()
+        if serial_seconds is None:
+            serial_seconds = seconds
+        results[str(threads)] = {
+            "seconds": seconds,
+            "speedup": serial_seconds / seconds,
+        }
+        print_logger.warning(
+            f"{threads} threads: {seconds:.3f}s, "
+            f"speedup {results[str(threads)]['speedup']:.2f}"
+        )
+    return results
+
+
+def bench_lexicon() -> Dict[str, float]:
+    """
+    Time and memory needed to build the lexicon trie like BASE_TREE is.
+    The memory is measured in a second build since tracing slows the build down.
+    :return:
+    """
+    start = time.perf_counter()
+    convert_to_tree(load_word(settings.FRENCH_DICTIONARY_PATH, settings.MAX_WORD_SIZE))
+    build_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    tree = convert_to_tree(
+        load_word(settings.FRENCH_DICTIONARY_PATH, settings.MAX_WORD_SIZE)
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return {
+        "build_seconds": build_seconds,
+        "memory_mb": current / 2**20,
+        "peak_memory_mb": peak / 2**20,
+    }
+
+
+def bench_games(
+    num_games: int, seed: int, strategies: Tuple[str, str]
+) -> Dict[str, float]:
+    """
+    Throughput of whole headless games played one after the other in this process
+    :param num_games:
+    :param seed: seed of the run, the games are the same from one benchmark to another
+    :param strategies:
+    :return:
+    """
+    start = time.perf_counter()
+    for game_index in range(num_games):
+        play_computer_vs_computer_game(derive_seed(seed, game_index), strategies)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "games_per_second": num_games / elapsed}
+
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """
+    Flatten the nested results into "a.b.c" -> value
+    :param results:
+    :param prefix:
+    :return:
+    """
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Compare benchmark results to a baseline
+    :param results:
+    :param baseline:
+    :param tolerance: relative degradation accepted, e.g. 0.2 for 20%
+    :return: description of the metrics that regressed
+    """
+    current = flatten(results["metrics"])
+    reference = flatten(baseline["metrics"])
+    regressions = []
+    for name, value in sorted(current.items()):
+        if name not in reference or reference[name] == 0:
+            continue
+        ratio = value / reference[name]
+        if name.endswith(HIGHER_IS_BETTER):
+            regressed = ratio < 1 - tolerance
+        else:
+            regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(
+                f"{name}: {value:.4g} vs baseline {reference[name]:.4g} ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the scrabble engine")
+    parser.add_argument("--strategies", nargs="+", default=["naive"])
+    parser.add_argument(
+        "--positions",
+        nargs="+",
+        default=None,
+        help=f"positions to run among {[p['name'] for p in POSITIONS]}",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4],
+        help="numbers of threads of the thread scaling benchmark, starting with 1",
+    )
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--game-strategies", nargs=2, default=["naive", "naive"], metavar="CODE"
+    )
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", default=settings.BENCHMARK_BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def _write_json(path: str, data: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    results = {
+        "python": sys.version,
+        "machine": platform.platform(),
+        # False on a free-threaded build, where the thread scaling is meaningful
+        "gil_enabled": getattr(sys, "_is_gil_enabled", lambda: True)(),
+        "params": vars(args),
+        "metrics": {
+            "move_generation": bench_move_generation(
+                args.strategies, args.positions, args.repeats
+            ),
+            "threads": bench_thread_scaling(args.threads, args.positions, args.repeats),
+            "lexicon": bench_lexicon(),
+            "games": bench_games(args.games, args.seed, tuple(args.game_strategies)),
+        },
+    }
+    _write_json(args.output, results)
+    print_logger.warning(f"Results written to {args.output}")
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print_logger.warning(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print_logger.warning(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print_logger.warning("No regression against the baseline")
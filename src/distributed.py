@@ -0,0 +1,500 @@
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+import weakref
+from multiprocessing.managers import BaseManager
+from typing import Callable, Dict, List, Optional, Set, Tuple, cast
+
+from tqdm import tqdm
+
+from src.game.journal import GameJournal
+from src.game_thread import analyze_multiple_games, play_computer_vs_computer_game
+from src.search_strategy.registry import DEFAULT_STRATEGY_PAIR
+from src.settings import settings
+from src.settings.logger_config import (
+    configure_worker_logging,
+    logger,
+    print_logger,
+    worker_log_queue,
+)
+from src.utils.typing import typed_dict as td
+from src.utils.utils import derive_seed
+
+# (game index, run seed, strategy codes) -> history of the game
+GameRunner = Callable[[int, Optional[int], Tuple[str, str]], td.GameHistory]
+
+
+def play_batch_game(
+    game_index: int, run_seed: Optional[int], strategies: Tuple[str, str]
+) -> td.GameHistory:
+    """
+    Play one game of a batch, the seed of the game is derived from the run seed
+    exactly like run_multiple_games does, so a distributed run gives the same games
+    """
+    seed = derive_seed(run_seed, game_index) if run_seed is not None else None
+    return play_computer_vs_computer_game(seed, strategies)
+
+
+def _run_game(
+    task: Tuple[GameRunner, int, Optional[int], Tuple[str, str]],
+) -> Tuple[int, td.GameHistory]:
+    runner, game_index, run_seed, strategies = task
+    return game_index, runner(game_index, run_seed, strategies)
+
+
+# answer of the coordinator to a worker asking for a batch once the run is over
+STOP = "stop"
+
+
+class _CoordinatorService:
+    """
+    Object shared by the coordinator with its workers.
+
+    A batch is leased to a worker as soon as it leaves the task queue, so a worker
+    dying before giving any news still gets its batch handed out again.
+    """
+
+    def __init__(self) -> None:
+        self.task_queue: queue.Queue = queue.Queue()
+        self.result_queue: queue.Queue = queue.Queue()
+        self.stopped: threading.Event = threading.Event()
+        self._lock: threading.Lock = threading.Lock()
+        self.workers: Set[str] = set()
+        self.released_workers: Set[str] = set()
+        # workers holding a session, see _WorkerSession
+        self.connected_workers: Set[str] = set()
+
+    def connect(self, worker_id: str) -> "_WorkerSession":
+        """
+        Session of a worker, the worker is connected until the manager server lets
+        go of it
+        """
+        session = _WorkerSession(self, worker_id)
+        with self._lock:
+            self.connected_workers.add(worker_id)
+        weakref.finalize(session, self._disconnect, worker_id)
+        return session
+
+    def _disconnect(self, worker_id: str) -> None:
+        with self._lock:
+            self.connected_workers.discard(worker_id)
+
+    def get_batch(self, worker_id: str, timeout: float) -> Optional[td.GameBatch] | str:
+        """
+        Give the next batch to a worker
+        :param worker_id:
+        :param timeout: seconds to wait for a batch
+        :return: the batch, None if there is no batch yet, STOP if the run is over
+        """
+        with self._lock:
+            self.workers.add(worker_id)
+        if self.stopped.is_set():
+            with self._lock:
+                self.released_workers.add(worker_id)
+            return STOP
+        try:
+            batch = self.task_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.result_queue.put(("claimed", batch["batch_id"], worker_id, None))
+        return batch
+
+    def report(self, kind: str, batch_id: int, worker_id: str, payload) -> None:
+        self.result_queue.put((kind, batch_id, worker_id, payload))
+
+
+class _WorkerSession:
+    """
+    Service of one worker, exposed to it through a proxy.
+
+    The manager server holds the session as long as the worker holds its proxy: once
+    the worker drops it the session is released and the worker is disconnected, the
+    coordinator can stop listening without leaving the worker waiting on it.
+    """
+
+    def __init__(self, service: _CoordinatorService, worker_id: str):
+        self._service: _CoordinatorService = service
+        self._worker_id: str = worker_id
+
+    def get_batch(self, timeout: float) -> Optional[td.GameBatch] | str:
+        """See _CoordinatorService.get_batch"""
+        return self._service.get_batch(self._worker_id, timeout)
+
+    def report(self, kind: str, batch_id: int, payload) -> None:
+        self._service.report(kind, batch_id, self._worker_id, payload)
+
+
+def _make_coordinator_manager(
+    service: _CoordinatorService, address: Tuple[str, int], authkey: bytes
+) -> BaseManager:
+    # a manager class per coordinator so that the service it exposes is its own
+    class _CoordinatorManager(BaseManager):
+        pass
+
+    _CoordinatorManager.register("get_service", callable=service.connect)
+    return _CoordinatorManager(address=address, authkey=authkey)
+
+
+class _WorkerManager(BaseManager):
+    """Client side of the coordinator service"""
+
+
+_WorkerManager.register("get_service")
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "":
+        return False
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+class SimulationCoordinator:
+    """
+    Hand out batches of games to workers connected over TCP and gather their results.
+
+    Workers pull batches from the coordinator and stream back one message per
+    completed game. A batch whose worker stays silent for more than lease_timeout
+    seconds after taking it is considered lost and its missing games are handed out
+    again, the games received twice are ignored.
+
+    The manager connections unpickle what they receive, the coordinator only listens
+    on the loopback interface unless a private key is set with SCRABBLE_AUTHKEY.
+
+    :param num_games: number of games of the run
+    :param seed: seed of the run, see run_multiple_games
+    :param strategies: codes of the strategies of the two players
+    :param batch_size: number of games per batch
+    :param address: (host, port) to listen on, port 0 picks a free port
+    :param authkey: key shared with the workers
+    :param lease_timeout: seconds without news from a worker before its batch is
+        given to another worker, must be longer than a game
+    :param idle_timeout: seconds without any news from the workers before giving up
+        the run, None to wait forever
+    :param max_attempts: number of times a game can be handed out before giving up
+    :param journal_path: journal recording the completed games, see GameJournal
+    :param resume: skip the games already recorded in the journal
+    """
+
+    def __init__(
+        self,
+        num_games: int,
+        seed: Optional[int] = None,
+        *,
+        strategies: Tuple[str, str] = DEFAULT_STRATEGY_PAIR,
+        batch_size: int = 10,
+        address: Tuple[str, int] = ("127.0.0.1", settings.COORDINATOR_PORT),
+        authkey: bytes = settings.COORDINATOR_AUTHKEY,
+        lease_timeout: float = 300.0,
+        idle_timeout: Optional[float] = 3600.0,
+        max_attempts: int = 3,
+        journal_path: Optional[str] = None,
+        resume: bool = False,
+    ):
+        if (
+            not _is_loopback(address[0])
+            and authkey == settings.COORDINATOR_DEFAULT_AUTHKEY
+        ):
+            raise ValueError(
+                "Refusing to listen on a public interface with the default key, "
+                "set SCRABBLE_AUTHKEY"
+            )
+        self.num_games: int = num_games
+        self.seed: Optional[int] = seed
+        self.strategies: Tuple[str, str] = strategies
+        self.batch_size: int = batch_size
+        self.authkey: bytes = authkey
+        self.lease_timeout: float = lease_timeout
+        self.idle_timeout: Optional[float] = idle_timeout
+        self.max_attempts: int = max_attempts
+        self.journal: Optional[GameJournal] = (
+            GameJournal(journal_path, seed) if journal_path is not None else None
+        )
+        self.resume: bool = resume
+
+        self.service: _CoordinatorService = _CoordinatorService()
+        self._server = _make_coordinator_manager(
+            self.service, address, authkey
+        ).get_server()
+        self.address: Tuple[str, int] = cast(Tuple[str, int], self._server.address)
+        self._server_thread: Optional[threading.Thread] = None
+
+        self._next_batch_id: int = 0
+        self.batches: Dict[int, td.GameBatch] = {}
+        self.attempts: Dict[int, int] = {}
+
+    def _serve(self) -> None:
+        try:
+            self._server.serve_forever()
+        except SystemExit:
+            # serve_forever exits the thread once the server is stopped
+            pass
+
+    def start(self) -> None:
+        """Start serving the workers in a background thread"""
+        self._server_thread = threading.Thread(target=self._serve, daemon=True)
+        self._server_thread.start()
+        print_logger.warning(f"Coordinator listening on {self.address}")
+
+    def stop(self) -> None:
+        # not in the typeshed stubs of Server
+        self._server.stop_event.set()  # type: ignore[attr-defined]
+        self._server.listener.close()  # type: ignore[attr-defined]
+        if self._server_thread is not None:
+            self._server_thread.join(timeout=5.0)
+
+    def _queue_batch(self, game_indices: List[int]) -> None:
+        for game_index in game_indices:
+            self.attempts[game_index] = self.attempts.get(game_index, 0) + 1
+            if self.attempts[game_index] > self.max_attempts:
+                raise RuntimeError(
+                    f"Game {game_index} was lost {self.max_attempts} times, giving up"
+                )
+        batch = td.GameBatch(
+            batch_id=self._next_batch_id,
+            game_indices=game_indices,
+            run_seed=self.seed,
+            strategies=self.strategies,
+        )
+        self._next_batch_id += 1
+        self.batches[batch["batch_id"]] = batch
+        self.service.task_queue.put(batch)
+
+    def _requeue_lost_batches(
+        self, leases: Dict[int, float], remaining: Set[int], lost: Set[int]
+    ) -> None:
+        now = time.monotonic()
+        for batch_id, last_activity in list(leases.items()):
+            if now - last_activity < self.lease_timeout:
+                continue
+            del leases[batch_id]
+            lost.add(batch_id)
+            missing = [
+                game_index
+                for game_index in self.batches[batch_id]["game_indices"]
+                if game_index in remaining
+            ]
+            if missing:
+                logger.warning(
+                    "Batch %s lost, handing out again games %s", batch_id, missing
+                )
+                self._queue_batch(missing)
+
+    def run(self) -> List[td.GameHistory]:
+        """
+        Play all the games of the run on the connected workers
+        :return: the histories of the games, the resumed ones first then in completion
+            order
+        """
+        if self._server_thread is None:
+            self.start()
+        if self.journal is not None:
+            self.journal.open(resume=self.resume)
+        try:
+            return self._run()
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            self._release_workers()
+            self.stop()
+
+    def _run(self) -> List[td.GameHistory]:
+        results: List[td.GameHistory] = (
+            [
+                history
+                for game_index, history in self.journal.completed.items()
+                if game_index < self.num_games
+            ]
+            if self.journal is not None
+            else []
+        )
+        remaining = {
+            game_index
+            for game_index in range(self.num_games)
+            if self.journal is None or not self.journal.is_completed(game_index)
+        }
+        ordered = sorted(remaining)
+        for start in range(0, len(ordered), self.batch_size):
+            self._queue_batch(ordered[start : start + self.batch_size])
+
+        # batch id -> last time its worker gave news
+        leases: Dict[int, float] = {}
+        # batches handed out again, late news from their worker are only results
+        lost: Set[int] = set()
+        last_news = time.monotonic()
+        with tqdm(total=len(remaining), desc="Running games") as progress:
+            while remaining:
+                try:
+                    kind, batch_id, worker_id, payload = self.service.result_queue.get(
+                        timeout=1.0
+                    )
+                except queue.Empty:
+                    self._requeue_lost_batches(leases, remaining, lost)
+                    if (
+                        self.idle_timeout is not None
+                        and time.monotonic() - last_news > self.idle_timeout
+                    ):
+                        raise TimeoutError(
+                            f"No news from the workers for {self.idle_timeout}s, "
+                            f"{len(remaining)} games not played"
+                        )
+                    continue
+                last_news = time.monotonic()
+                if kind == "done":
+                    leases.pop(batch_id, None)
+                elif batch_id not in lost:
+                    leases[batch_id] = last_news
+                if kind == "game":
+                    game_index, history = payload
+                    if game_index in remaining:
+                        remaining.discard(game_index)
+                        if self.journal is not None:
+                            self.journal.record(game_index, history)
+                        results.append(history)
+                        progress.update()
+                self._requeue_lost_batches(leases, remaining, lost)
+        return results
+
+    def _release_workers(self, grace_period: float = 10.0) -> None:
+        """
+        Tell the workers the run is over and give them time to hear it and to
+        disconnect
+        """
+        self.service.stopped.set()
+        while True:
+            try:
+                self.service.task_queue.get_nowait()
+            except queue.Empty:
+                break
+        deadline = time.monotonic() + grace_period
+        while time.monotonic() < deadline:
+            with self.service._lock:
+                if (
+                    self.service.workers <= self.service.released_workers
+                    and not self.service.connected_workers
+                ):
+                    return
+            time.sleep(0.1)
+
+
+def run_worker(
+    address: Tuple[str, int],
+    authkey: bytes = settings.COORDINATOR_AUTHKEY,
+    *,
+    processes: Optional[int] = None,
+    runner: GameRunner = play_batch_game,
+    poll_timeout: float = 5.0,
+) -> int:
+    """
+    Pull batches from a coordinator and play them until the coordinator stops
+
+    Args:
+        address: (host, port) of the coordinator
+        authkey: key shared with the coordinator
+        processes: number of games played in parallel on this host, all the cores
+            if None, 1 plays the games in the worker process itself
+        runner: function playing one game
+        poll_timeout: seconds to wait for a batch before asking again
+
+    Returns:
+        The number of games played by the worker
+    """
+    manager = _WorkerManager(address=address, authkey=authkey)
+    manager.connect()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    service = manager.get_service(worker_id)  # type: ignore[attr-defined]
+    pool = (
+        multiprocessing.Pool(
+            processes,
+            initializer=configure_worker_logging,
+            initargs=(worker_log_queue(),),
+        )
+        if processes != 1
+        else None
+    )
+    played = 0
+    try:
+        while True:
+            batch = service.get_batch(poll_timeout)
+            if batch == STOP:
+                break
+            if batch is None:
+                continue
+            batch_id = batch["batch_id"]
+            tasks = [
+                (runner, game_index, batch["run_seed"], batch["strategies"])
+                for game_index in batch["game_indices"]
+            ]
+            games = (
+                pool.imap_unordered(_run_game, tasks)
+                if pool is not None
+                else map(_run_game, tasks)
+            )
+            for game_index, history in games:
+                service.report("game", batch_id, (game_index, history))
+                played += 1
+            service.report("done", batch_id, None)
+    except (EOFError, ConnectionError):
+        # the coordinator is gone, the run is over for this worker
+        logger.warning("Lost the connection to the coordinator %s", address)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        # dropping the proxy disconnects from the coordinator, which waits for its
+        # workers to disconnect before it stops listening
+        del service
+    return played
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run scrabble games on several machines"
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    coordinator = subparsers.add_parser("coordinator", help="hand out the games")
+    coordinator.add_argument("--host", default="127.0.0.1")
+    coordinator.add_argument("--port", type=int, default=settings.COORDINATOR_PORT)
+    coordinator.add_argument("--games", type=int, default=100)
+    coordinator.add_argument("--seed", type=int, default=42)
+    coordinator.add_argument("--batch-size", type=int, default=10)
+    coordinator.add_argument("--lease-timeout", type=float, default=300.0)
+    coordinator.add_argument(
+        "--strategies", nargs=2, default=list(DEFAULT_STRATEGY_PAIR)
+    )
+    coordinator.add_argument("--journal", default=None)
+    coordinator.add_argument("--resume", action="store_true")
+
+    worker = subparsers.add_parser("worker", help="play the games")
+    worker.add_argument("--host", default="localhost")
+    worker.add_argument("--port", type=int, default=settings.COORDINATOR_PORT)
+    worker.add_argument("--processes", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.mode == "coordinator":
+        analyze_multiple_games(
+            SimulationCoordinator(
+                args.games,
+                args.seed,
+                strategies=tuple(args.strategies),
+                batch_size=args.batch_size,
+                address=(args.host, args.port),
+                lease_timeout=args.lease_timeout,
+                journal_path=args.journal,
+                resume=args.resume,
+            ).run()
+        )
+    else:
+        played = run_worker((args.host, args.port), processes=args.processes)
+        print_logger.warning(f"Worker done, {played} games played")
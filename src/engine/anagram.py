@@ -0,0 +1,96 @@
+"""
+Anagrams of a set of letters, looked up in a dict instead of searched in the trie.
+
+The signature of a word is its letters sorted: the words made of exactly some letters
+are the words of their signature. The index maps each signature to its words, and
+each signature with one letter removed to the words it completes, so that a blank
+("*") costs one lookup too:
+
+- no blank: the words of the signature of the letters,
+- one blank: the words completed by the other letters,
+- two blanks: the words completed by the other letters plus any letter (26 lookups).
+
+Only the words of the lengths of a bingo are indexed: the 7 letters of a full rack,
+and 8 letters for a full rack played through one letter of the board.
+"""
+
+import string
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.settings import settings
+from src.utils.utils import load_word
+
+BLANK = "*"
+BINGO_LENGTHS = (7, 8)
+
+
+def signature(letters: Iterable[str]) -> str:
+    """Letters sorted, the same for every anagram"""
+    return "".join(sorted(letters))
+
+
+class AnagramIndex:
+    """
+    Index of the anagrams of the words, see the module documentation
+
+    :param words: words of the lexicon, lower case
+    :param lengths: lengths of the words indexed
+    """
+
+    def __init__(self, words: Iterable[str], lengths: Tuple[int, ...] = BINGO_LENGTHS):
+        self.lengths: Tuple[int, ...] = lengths
+        exact: Dict[str, List[str]] = defaultdict(list)
+        missing_one: Dict[str, Set[str]] = defaultdict(set)
+        for word in words:
+            if len(word) not in lengths:
+                continue
+            word_signature = signature(word)
+            exact[word_signature].append(word)
+            for index in range(len(word_signature)):
+                if index and word_signature[index] == word_signature[index - 1]:
+                    continue
+                missing_one[word_signature[:index] + word_signature[index + 1 :]].add(
+                    word
+                )
+        # words of a signature, sorted
+        self.exact: Dict[str, Tuple[str, ...]] = {
+            key: tuple(sorted(set(value))) for key, value in exact.items()
+        }
+        # words completed by one more letter of a signature, sorted
+        self.missing_one: Dict[str, Tuple[str, ...]] = {
+            key: tuple(sorted(value)) for key, value in missing_one.items()
+        }
+
+    def anagrams(self, letters: Iterable[str]) -> Tuple[str, ...]:
+        """
+        Words made of exactly the letters, a blank being any letter
+        :param letters: at most two blanks
+        :return: the words, sorted
+        """
+        letters = list(letters)
+        blanks = letters.count(BLANK)
+        others = signature(letter for letter in letters if letter != BLANK)
+        if blanks == 0:
+            return self.exact.get(others, ())
+        if blanks == 1:
+            return self.missing_one.get(others, ())
+        if blanks == 2:
+            words: Set[str] = set()
+            for letter in string.ascii_lowercase:
+                words.update(self.missing_one.get(signature(others + letter), ()))
+            return tuple(sorted(words))
+        raise ValueError(f"At most two blanks, got {blanks}")
+
+
+@lru_cache(maxsize=1)
+def default_anagram_index() -> AnagramIndex:
+    """
+    Index of the dictionary of BASE_TREE, built once per process on first use
+    :return:
+    """
+    return AnagramIndex(
+        word.lower()
+        for word in load_word(settings.FRENCH_DICTIONARY_PATH, settings.MAX_WORD_SIZE)
+    )
@@ -0,0 +1,191 @@
+"""
+Scoring of many candidate moves at once with numpy.
+
+The premiums and the letters already on the board are turned once into arrays: the
+letter and word multiplier of each cell, and for each cell and direction of play the
+value of the letters of the cross word it would join. A batch of candidates is then
+scored without any python loop over the candidates or their letters:
+
+    scorer = BatchScorer(board, score_grid)
+    scores = scorer.score_plays(plays)
+
+The scores are the ones of compute_total_word_score.
+"""
+
+import string
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from src.engine.grid import LETTER_VALUES, Grid
+from src.utils.typing import enum, typed_dict as td
+
+BINGO_BONUS = 50
+BINGO_TILES = 7
+MAX_WORD_LENGTH = 15
+
+# code of a letter: 0 for no letter, then its index in CODE_LETTERS plus one
+CODE_LETTERS = string.ascii_lowercase + "*"
+LETTER_CODES = {letter: code for code, letter in enumerate(CODE_LETTERS, start=1)}
+# value of each letter code
+CODE_VALUES = np.array(
+    [0] + [LETTER_VALUES[letter]["value"] for letter in CODE_LETTERS], dtype=np.int64
+)
+
+# letter and word multiplier of each premium of the score grid
+_LETTER_MULTIPLIERS = {
+    enum.CellValue.DOUBLE_LETTER.value: 2,
+    enum.CellValue.TRIPLE_LETTER.value: 3,
+}
+_WORD_MULTIPLIERS = {
+    enum.CellValue.DOUBLE_WORD.value: 2,
+    enum.CellValue.TRIPLE_WORD.value: 3,
+    enum.CellValue.START.value: 2,
+}
+
+
+def _direction_index(direction: enum.Direction) -> int:
+    return 0 if direction == enum.Direction.HORIZONTAL else 1
+
+
+class BatchScorer:
+    """
+    Scores of candidate moves on a position, see the module documentation
+
+    :param board: letters of the board
+    :param score_grid: premiums left on the board
+    """
+
+    def __init__(self, board: Grid, score_grid: Grid):
+        self.board: Grid = board
+        premiums = score_grid.grid
+        self.letter_multipliers: np.ndarray = np.ones((15, 15), dtype=np.int64)
+        self.word_multipliers: np.ndarray = np.ones((15, 15), dtype=np.int64)
+        for premium, multiplier in _LETTER_MULTIPLIERS.items():
+            self.letter_multipliers[premiums == premium] = multiplier
+        for premium, multiplier in _WORD_MULTIPLIERS.items():
+            self.word_multipliers[premiums == premium] = multiplier
+
+        codes = np.zeros((15, 15), dtype=np.int64)
+        for letter, code in LETTER_CODES.items():
+            codes[board.grid == letter] = code
+        self.codes: np.ndarray = codes
+        values = CODE_VALUES[codes]
+        # [direction of play, row, column]: value of the letters around the cell in
+        # the other direction and whether there is at least one
+        occupied = codes > 0
+        self.cross_values: np.ndarray = np.stack(
+            [
+                self._cross_values(values, occupied),
+                self._cross_values(values.T, occupied.T).T,
+            ]
+        )
+        self.has_cross: np.ndarray = np.stack(
+            [self._has_cross(occupied), self._has_cross(occupied.T).T]
+        )
+
+    @staticmethod
+    def _runs(
+        occupied: np.ndarray, values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Along the rows (axis 0) of each column: value of the run of letters ending
+        just above each cell and of the run starting just below it
+        """
+        above = np.zeros((16, 15), dtype=np.int64)
+        for row in range(15):
+            above[row + 1] = np.where(occupied[row], above[row] + values[row], 0)
+        below = np.zeros((16, 15), dtype=np.int64)
+        for row in range(14, -1, -1):
+            below[row] = np.where(occupied[row], below[row + 1] + values[row], 0)
+        return above[:15], below[1:]
+
+    def _cross_values(self, values: np.ndarray, occupied: np.ndarray) -> np.ndarray:
+        """Cross words of a horizontal play are vertical: runs along the rows"""
+        above, below = self._runs(occupied, values)
+        return above + below
+
+    def _has_cross(self, occupied: np.ndarray) -> np.ndarray:
+        above, below = self._runs(occupied, occupied.astype(np.int64))
+        return (above + below) > 0
+
+    def score(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        directions: np.ndarray,
+        lengths: np.ndarray,
+        letters: np.ndarray,
+        new_tiles: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Scores of a batch of candidates
+        :param rows: row of the first letter of each candidate
+        :param cols: column of the first letter of each candidate
+        :param directions: 0 for a horizontal word, 1 for a vertical one
+        :param lengths: length of each word
+        :param letters: (candidates, 15) letter codes of the words, padded with 0
+        :param new_tiles: (candidates, 15) True for the letters played from the rack
+        :return: the score of each candidate
+        """
+        steps = np.arange(MAX_WORD_LENGTH)
+        in_word = steps < lengths[:, None]
+        vertical = directions[:, None] == 1
+        cell_rows = np.minimum(rows[:, None] + np.where(vertical, steps, 0), 14)
+        cell_cols = np.minimum(cols[:, None] + np.where(vertical, 0, steps), 14)
+        new = new_tiles & in_word
+
+        values = CODE_VALUES[letters] * in_word
+        letter_multipliers = np.where(
+            new, self.letter_multipliers[cell_rows, cell_cols], 1
+        )
+        word_multipliers = np.where(new, self.word_multipliers[cell_rows, cell_cols], 1)
+        letter_scores = values * letter_multipliers
+        main = letter_scores.sum(axis=1) * word_multipliers.prod(axis=1)
+
+        direction_index = np.broadcast_to(directions[:, None], cell_rows.shape)
+        cross = np.where(
+            new & self.has_cross[direction_index, cell_rows, cell_cols],
+            (self.cross_values[direction_index, cell_rows, cell_cols] + letter_scores)
+            * word_multipliers,
+            0,
+        ).sum(axis=1)
+        bingo = np.where(new.sum(axis=1) == BINGO_TILES, BINGO_BONUS, 0)
+        return main + cross + bingo
+
+    def encode_plays(
+        self, plays: Sequence[td.PlaceWord]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arrays of score for full words (as returned by get_full_word), the letters
+        on empty cells of the board being the new tiles
+        :param plays:
+        :return: rows, cols, directions, lengths, letters, new_tiles
+        """
+        count = len(plays)
+        rows = np.empty(count, dtype=np.int64)
+        cols = np.empty(count, dtype=np.int64)
+        directions = np.empty(count, dtype=np.int64)
+        lengths = np.empty(count, dtype=np.int64)
+        letters = np.zeros((count, MAX_WORD_LENGTH), dtype=np.int64)
+        for index, play in enumerate(plays):
+            rows[index], cols[index] = play["start_position"]
+            directions[index] = _direction_index(play["direction"])
+            lengths[index] = len(play["word"])
+            letters[index, : len(play["word"])] = [
+                LETTER_CODES[letter] for letter in play["word"]
+            ]
+        steps = np.arange(MAX_WORD_LENGTH)
+        vertical = directions[:, None] == 1
+        cell_rows = np.minimum(rows[:, None] + np.where(vertical, steps, 0), 14)
+        cell_cols = np.minimum(cols[:, None] + np.where(vertical, 0, steps), 14)
+        new_tiles = (self.codes[cell_rows, cell_cols] == 0) & (steps < lengths[:, None])
+        return rows, cols, directions, lengths, letters, new_tiles
+
+    def score_plays(self, plays: Sequence[td.PlaceWord]) -> np.ndarray:
+        """
+        Scores of full words placed on the board
+        :param plays:
+        :return:
+        """
+        return self.score(*self.encode_plays(plays))
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 
+from src.engine import zobrist
 from src.settings import settings
 from src.utils import utils
 from src.settings.logger_config import logger
@@ -9,14 +10,41 @@ from src.utils.typing import enum, typed_dict as td
 
 LETTER_VALUES = utils.load_letter_values(settings.LETTERS_VALUES_PATH)
 
+# row, column and previous value (letter or premium) of a cell written by a move,
+# see Grid.undo_move
+CellChange = Tuple[int, int, Union[str, int]]
+
 
 class Grid:
+    """
+    A 15x15 grid, of letters for the board ("" for an empty cell) or of premiums for
+    the score grid.
+
+    The Zobrist hash of a board (see src/engine/zobrist.py) is computed the first time
+    it is read, then kept up to date by place_word. Any other write goes through
+    __setitem__ and drops it, it is computed again when read.
+    """
+
     def __init__(self, grid: Optional[np.ndarray] = None):
         if grid is None:
             self.grid = np.array([[""] * 15] * 15, dtype=str)
         else:
             # Create a deep copy of the input grid to ensure independence
             self.grid = np.array(grid, copy=True)
+        self._hash: Optional[int] = 0 if grid is None else None
+
+    @property
+    def hash(self) -> int:
+        """Zobrist hash of the letters of the board"""
+        if self._hash is None:
+            self._hash = zobrist.board_hash(self.grid)
+        return self._hash
+
+    def copy(self) -> "Grid":
+        """Copy of the grid, keeping its hash"""
+        grid = Grid(self.grid)
+        grid._hash = self._hash
+        return grid
 
     def __getitem__(self, item):
         return self.grid[item]
@@ -29,6 +57,7 @@ class Grid:
                 value = value.reshape(expected_shape)
 
         self.grid[key] = value
+        self._hash = None
 
     def __str__(self):
         # print number 1 to 15
@@ -46,20 +75,64 @@ class Grid:
 
     def place_word(
         self, word: str, start_position: tuple, direction: enum.Direction
-    ) -> None:
+    ) -> List[CellChange]:
         """
         Place a word on the grid
         :param start_position:
         :param word:
         :param direction:
-        :return: None
+        :return: the cells whose letter changed with their previous letter, to give
+            to undo_move
         """
         x, y = start_position
+        grid = self.grid
+        board_hash = self._hash
+        keys = zobrist.BOARD_KEYS
+        changes: List[CellChange] = []
         for i, letter in enumerate(word):
             if direction == enum.Direction.HORIZONTAL:
-                self.grid[x, y + i] = letter
+                row, col = x, y + i
             else:
-                self.grid[x + i, y] = letter
+                row, col = x + i, y
+            previous = grid[row, col]
+            if previous != letter:
+                changes.append((row, col, previous))
+                if board_hash is not None:
+                    if previous:
+                        board_hash ^= keys[row][col][previous]
+                    board_hash ^= keys[row][col][letter]
+                grid[row, col] = letter
+        self._hash = board_hash
+        return changes
+
+    def apply_move(self, play: td.PlaceWord) -> List[CellChange]:
+        """
+        Place the word of a move, O(letters of the word)
+        :param play:
+        :return: the cells to give to undo_move
+        """
+        return self.place_word(**play)
+
+    def undo_move(self, changes: List[CellChange]) -> None:
+        """
+        Give back their previous value to the cells changed by a move, O(cells
+        changed). The moves are undone in the reverse order they were applied.
+        :param changes: returned by apply_move (or place_word, consume_premiums)
+        :return:
+        """
+        grid = self.grid
+        board_hash = self._hash
+        keys = zobrist.BOARD_KEYS
+        for row, col, previous in reversed(changes):
+            if board_hash is not None:
+                current = grid[row, col]
+                if current:
+                    board_hash ^= keys[row][col][current]
+                if previous:
+                    # only a board of letters keeps its hash
+                    board_hash ^= keys[row][col][str(previous)]
+            grid[row, col] = previous
+        self._hash = board_hash
 
 
 SCORE_GRID = Grid(
@@ -96,21 +169,21 @@ def _compute_score(
 ) -> int:
     """
     Compute the score of a word placed on the grid
-    :param start_position:
+    :param start_position: (row, column) of the first letter
     :param word:
     :param direction:
     :return:
     """
     score = 0
     word_multiplier = 1
-    logger.debug(f"Computing score for word {word}")
+    logger.debug("Computing score for word %s", word)
     for i, letter in enumerate(word):
         x, y = start_position
         if direction == enum.Direction.HORIZONTAL:
-            x += i
-        else:
             y += i
-        logger.debug(f"Letter {letter} at position {x, y}")
+        else:
+            x += i
+        logger.debug("Letter %s at position %s", letter, (x, y))
         cell_value = score_grid[x, y]
         letter_value = LETTER_VALUES[letter]["value"]
         match cell_value:
@@ -132,6 +205,30 @@ def _compute_score(
     return score * word_multiplier
 
 
+def consume_premiums(score_grid: Grid, play: td.PlaceWord) -> List[CellChange]:
+    """
+    Remove the premiums under a word placed on the grid, they only count once
+    :param score_grid:
+    :param play:
+    :return: the cells whose premium was removed with their premium, to give to
+        score_grid.undo_move
+    """
+    x, y = play["start_position"]
+    grid = score_grid.grid
+    empty = enum.CellValue.EMPTY.value
+    changes: List[CellChange] = []
+    for i in range(len(play["word"])):
+        if play["direction"] == enum.Direction.HORIZONTAL:
+            row, col = x, y + i
+        else:
+            row, col = x + i, y
+        premium = grid[row, col]
+        if premium != empty:
+            changes.append((row, col, premium))
+            grid[row, col] = empty
+    return changes
+
+
 def compute_total_word_score(
     place_word: td.PlaceWord,
     perpendicular_words: List[td.PlaceWord],
@@ -139,7 +236,8 @@ def compute_total_word_score(
     score_grid: Grid,
 ) -> int:
     """
-    Compute the total score of a word placed on the grid
+    Compute the total score of a word placed on the grid, the score grid is only
+    read: the premiums are consumed once the move is played (consume_premiums)
     :param score_grid:
     :param nb_letter_already_placed:
     :param place_word:
@@ -147,28 +245,18 @@ def compute_total_word_score(
     :return:
     """
     word = place_word["word"]
-    row, column = place_word["start_position"]
     direction = place_word["direction"]
-    score = _compute_score(word, (column, row), direction, score_grid=score_grid)
+    score = _compute_score(
+        word, place_word["start_position"], direction, score_grid=score_grid
+    )
     if len(word) - nb_letter_already_placed == 7:
         score += 50
     for perpendicular_word in perpendicular_words:
         perpendicular_score = _compute_score(
             perpendicular_word["word"],
-            (
-                perpendicular_word["start_position"][1],
-                perpendicular_word["start_position"][0],
-            ),
+            perpendicular_word["start_position"],
             perpendicular_word["direction"],
             score_grid=score_grid,
         )
         score += perpendicular_score
-    # update the score grid
-    for i, letter in enumerate(word):
-        x, y = place_word["start_position"]
-        if place_word["direction"] == enum.Direction.VERTICAL:
-            x += i
-        else:
-            y += i
-        score_grid[x, y] = enum.CellValue.EMPTY.value
     return score
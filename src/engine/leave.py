@@ -0,0 +1,262 @@
+"""
+Value of the letters kept on the rack after a move (the leave).
+
+The value of every multiset of up to MAX_LEAVE_SIZE letters is stored in a flat
+float32 array. A multiset is ranked in constant time (at most MAX_LEAVE_SIZE steps)
+with the combinatorial number system: its sorted letter indexes a_0 <= ... <= a_k-1
+are turned into the strictly increasing b_i = a_i + i, a combination whose colex
+rank is sum(C(b_i, i + 1)).
+
+The table is fitted offline from self-play games:
+
+    python -m src.engine.leave --games 200 --seed 42
+    python -m src.engine.leave --journal runs/games.jsonl
+"""
+
+import argparse
+import itertools
+import os
+import string
+from functools import lru_cache
+from math import comb
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from src.settings import settings
+from src.settings.logger_config import logger, print_logger
+from src.utils.typing import typed_dict as td
+
+LEAVE_LETTERS = string.ascii_lowercase + "*"
+LETTER_INDEX = {letter: index for index, letter in enumerate(LEAVE_LETTERS)}
+# a move plays at least one letter of a 7 letters rack
+MAX_LEAVE_SIZE = 6
+
+_NB_KINDS = len(LEAVE_LETTERS)
+# _BINOMIAL[n][k] = C(n, k)
+_BINOMIAL = [
+    [comb(n, k) for k in range(MAX_LEAVE_SIZE + 1)]
+    for n in range(_NB_KINDS + MAX_LEAVE_SIZE)
+]
+# index of the first multiset of each size
+_OFFSETS = [
+    sum(comb(_NB_KINDS + size - 1, size) for size in range(k))
+    for k in range(MAX_LEAVE_SIZE + 2)
+]
+TABLE_SIZE = _OFFSETS[MAX_LEAVE_SIZE + 1]
+
+
+def compute_leave(rack: List[str], letter_used: List[str]) -> List[str]:
+    """
+    Letters of the rack kept after playing some of them, a letter missing from the
+    rack is played with a blank
+    :param rack:
+    :param letter_used:
+    :return: the remaining letters, in the order of the rack
+    """
+    leave = list(rack)
+    for letter in letter_used:
+        if letter in leave:
+            leave.remove(letter)
+        elif "*" in leave:
+            leave.remove("*")
+    return leave
+
+
+def leave_index(leave: Iterable[str]) -> int:
+    """
+    Index of a multiset of letters in the leave table
+    :param leave: letters in any order
+    :return:
+    """
+    kinds = sorted(LETTER_INDEX[letter] for letter in leave)
+    if len(kinds) > MAX_LEAVE_SIZE:
+        raise ValueError(
+            f"A leave has at most {MAX_LEAVE_SIZE} letters, got {len(kinds)}"
+        )
+    rank = _OFFSETS[len(kinds)]
+    for i, kind in enumerate(kinds):
+        rank += _BINOMIAL[kind + i][i + 1]
+    return rank
+
+
+class LeaveTable:
+    """
+    Value in points of every leave, see the module documentation
+
+    :param values: one float32 value per multiset, indexed by leave_index
+    """
+
+    def __init__(self, values: np.ndarray):
+        if values.shape != (TABLE_SIZE,):
+            raise ValueError(
+                f"A leave table has {TABLE_SIZE} values, got shape {values.shape}"
+            )
+        self.values: np.ndarray = values
+
+    @classmethod
+    def zeros(cls) -> "LeaveTable":
+        return cls(np.zeros(TABLE_SIZE, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: str) -> "LeaveTable":
+        """
+        Load a table saved with save, memory mapped so that the pages are shared by
+        the processes using it
+        :param path:
+        :return:
+        """
+        return cls(np.load(path, mmap_mode="r"))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(path, self.values.astype(np.float32))
+
+    def value(self, leave: Iterable[str]) -> float:
+        """
+        Value of a leave, 0 for an empty leave of a fitted table
+        :param leave: letters in any order
+        :return:
+        """
+        return float(self.values[leave_index(leave)])
+
+
+@lru_cache(maxsize=1)
+def default_leave_table() -> LeaveTable:
+    """
+    Table of settings.LEAVE_TABLE_PATH, loaded once per process. Without a fitted
+    table every leave is worth 0 and equity is the score of the move.
+    :return:
+    """
+    if os.path.exists(settings.LEAVE_TABLE_PATH):
+        return LeaveTable.load(settings.LEAVE_TABLE_PATH)
+    logger.warning(
+        "No leave table at %s, every leave is worth 0 (fit one with "
+        "python -m src.engine.leave)",
+        settings.LEAVE_TABLE_PATH,
+    )
+    return LeaveTable.zeros()
+
+
+def leave_samples(
+    game_histories: Iterable[td.GameHistory],
+) -> Iterator[Tuple[List[str], int]]:
+    """
+    Leave of each move of the games and the score of the next move of the same
+    player, the moves without a next move and the passes are skipped
+    :param game_histories:
+    :return:
+    """
+    for history in game_histories:
+        turns = history["history"]
+        for turn, next_turn in zip(turns, turns[1:]):
+            for player_id, move in turn.items():
+                if player_id not in next_turn or not move["valid_word"]["letter_used"]:
+                    continue
+                leave = compute_leave(
+                    move["rack_before"], move["valid_word"]["letter_used"]
+                )
+                if len(leave) <= MAX_LEAVE_SIZE:
+                    yield leave, next_turn[player_id]["valid_word"]["score"]
+
+
+def _letter_counts(leaves: Sequence[Sequence[str]]) -> np.ndarray:
+    counts = np.zeros((len(leaves), _NB_KINDS), dtype=np.float64)
+    for row, leave in enumerate(leaves):
+        for letter in leave:
+            counts[row, LETTER_INDEX[letter]] += 1
+    return counts
+
+
+def fit_leave_table(
+    game_histories: Iterable[td.GameHistory],
+    *,
+    ridge: float = 1.0,
+    prior_weight: float = 20.0,
+) -> LeaveTable:
+    """
+    Fit the value of the leaves from self-play games: the value of a leave is how
+    much the next move of the player scores above the average move.
+    A value per letter is fitted by ridge regression, the value of a multiset is the
+    sum of the values of its letters, corrected by the mean residual of the moves
+    with exactly this leave, shrunk towards 0 when the leave was seen rarely.
+    :param game_histories:
+    :param ridge: regularization of the values per letter
+    :param prior_weight: number of samples for which the observed residual counts
+        as much as the per letter value
+    :return:
+    """
+    samples = list(leave_samples(game_histories))
+    if not samples:
+        raise ValueError("No move to fit the leave table on")
+    leaves = [leave for leave, _ in samples]
+    targets = np.array([score for _, score in samples], dtype=np.float64)
+    targets -= targets.mean()
+
+    counts = _letter_counts(leaves)
+    letter_values = np.linalg.solve(
+        counts.T @ counts + ridge * np.eye(_NB_KINDS), counts.T @ targets
+    )
+
+    values = np.zeros(TABLE_SIZE, dtype=np.float64)
+    binomial = np.array(_BINOMIAL, dtype=np.int64)
+    for size in range(1, MAX_LEAVE_SIZE + 1):
+        # every sorted multiset of this size, one per row
+        kinds = np.array(
+            list(itertools.combinations_with_replacement(range(_NB_KINDS), size)),
+            dtype=np.int64,
+        )
+        columns = np.arange(size)
+        indexes = _OFFSETS[size] + binomial[kinds + columns, columns + 1].sum(axis=1)
+        values[indexes] = letter_values[kinds].sum(axis=1)
+
+    sample_indexes = np.array([leave_index(leave) for leave in leaves])
+    residuals = targets - counts @ letter_values
+    seen = np.bincount(sample_indexes, minlength=TABLE_SIZE)
+    residual_sums = np.bincount(sample_indexes, weights=residuals, minlength=TABLE_SIZE)
+    values += residual_sums / (seen + prior_weight)
+    values[leave_index([])] = 0.0
+    logger.info(
+        "Leave table fitted on %s moves, letter values %s",
+        len(samples),
+        dict(zip(LEAVE_LETTERS, np.round(letter_values, 2))),
+    )
+    return LeaveTable(values.astype(np.float32))
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fit the leave table from self-play games"
+    )
+    parser.add_argument(
+        "--journal",
+        nargs="+",
+        default=None,
+        help="journals of games already played, see src/game/journal.py",
+    )
+    parser.add_argument(
+        "--games", type=int, default=100, help="games to play if no journal is given"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=settings.LEAVE_TABLE_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from src.game.journal import GameJournal
+    from src.game_thread import run_multiple_games
+
+    args = _parse_args()
+    histories: List[td.GameHistory] = []
+    if args.journal is not None:
+        for journal_path in args.journal:
+            histories.extend(GameJournal.read(journal_path).completed.values())
+    else:
+        histories = run_multiple_games(args.games, args.seed)
+    table = fit_leave_table(histories)
+    table.save(args.output)
+    print_logger.warning(
+        "Leave table fitted on %s games written to %s", len(histories), args.output
+    )
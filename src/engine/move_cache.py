@@ -0,0 +1,136 @@
+"""
+Cache of the moves of each line of the board, reused from one search to the next.
+
+The moves starting on a row (horizontal words) or a column (vertical words) only
+depend on:
+
+- the letters and the premiums of the line,
+- for each empty cell of the line, the letters (and their premiums) touching it in
+  the other direction, which make the cross words of a tile played there,
+- whether the board is empty (the first move goes through the center),
+- the rack and the lexicon.
+
+The key of a line holds all of these. A move changes its own line and the lines
+crossing it, every other line keeps its key and its moves are served from the cache:
+on consecutive searches with a same rack (the positions of a search tree, the
+rollouts, a rack kept after a pass) most lines hit.
+
+    cache = LineMoveCache()
+    key = line_key(rows, premiums, enum.Direction.HORIZONTAL, 7, rack, is_empty)
+    moves = cache.get(key)
+"""
+
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+from src.engine.tree import Tree
+from src.utils.typing import enum, typed_dict as td
+
+# lines kept at most, the least recently used are evicted first
+LINE_CACHE_SIZE = 512
+
+# moves of each start position of a line, in the order of the line
+LineMoves = List[List[td.Move]]
+
+
+def _run(
+    rows: List[List[str]],
+    premiums: List[List[int]],
+    row: int,
+    col: int,
+    step: int,
+) -> Tuple[str, Tuple[int, ...]]:
+    """Letters and premiums of the contiguous letters from a cell, along a column"""
+    letters = []
+    values = []
+    row += step
+    while 0 <= row < 15 and rows[row][col] != "":
+        letters.append(rows[row][col])
+        values.append(premiums[row][col])
+        row += step
+    return "".join(letters), tuple(values)
+
+
+def line_key(
+    rows: List[List[str]],
+    premiums: List[List[int]],
+    direction: enum.Direction,
+    line: int,
+    rack: List[str],
+    is_empty: bool,
+) -> Hashable:
+    """
+    Key of the moves of a line: everything the moves of the line depend on
+    :param rows: letters of the board as lists, transposed for a vertical line
+    :param premiums: premiums of the board as lists, transposed like rows
+    :param direction:
+    :param line: row of a horizontal line, column of a vertical one
+    :param rack: rack of the player, its letters sorted by generate_moves
+    :param is_empty: the board is empty
+    :return:
+    """
+    # no tile is played on a letter, its cross word is never checked nor scored
+    cross = tuple(
+        (
+            (_run(rows, premiums, line, col, -1), _run(rows, premiums, line, col, 1))
+            if rows[line][col] == ""
+            else None
+        )
+        for col in range(15)
+    )
+    return (
+        direction.value,
+        line,
+        tuple(rows[line]),
+        tuple(premiums[line]),
+        cross,
+        tuple(rack),
+        is_empty,
+    )
+
+
+class LineMoveCache:
+    """
+    Least recently used cache of the moves of the lines, see the module documentation.
+    The cached moves are shared by the searches that read them, they must not be
+    modified.
+
+    :param max_size: lines kept at most
+    """
+
+    def __init__(self, max_size: int = LINE_CACHE_SIZE):
+        self.max_size: int = max_size
+        self._lines: "OrderedDict[Hashable, LineMoves]" = OrderedDict()
+        # the lexicon the cached moves were generated with
+        self._tree: Optional[Tree] = None
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def use_tree(self, tree: Tree) -> None:
+        """Drop the cached moves if they were generated with another lexicon"""
+        if tree is not self._tree:
+            self._lines.clear()
+            self._tree = tree
+
+    def get(self, key: Hashable) -> Optional[LineMoves]:
+        moves = self._lines.get(key)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._lines.move_to_end(key)
+        return moves
+
+    def put(self, key: Hashable, moves: LineMoves) -> None:
+        self._lines[key] = moves
+        self._lines.move_to_end(key)
+        if len(self._lines) > self.max_size:
+            self._lines.popitem(last=False)
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self.hits = 0
+        self.misses = 0
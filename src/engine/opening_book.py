@@ -0,0 +1,272 @@
+"""
+Best first moves of the racks, looked up instead of searched on the empty board.
+
+On the empty board (with the standard premiums and the base lexicon) the moves only
+depend on the multiset of letters of the rack. The book stores, for each rack it
+covers, its BOOK_MOVES best scoring moves in one numpy structured array of fixed size
+records sorted by rack, saved as a .npy file and memory mapped: a lookup is a binary
+search (np.searchsorted) over the sorted racks, the processes of a pool share its
+pages.
+
+A record is a rack (its letters sorted, up to 7), a word, its row, column and
+direction and its score. The moves of a rack are in the order of generate_moves(k),
+best score first and the first generated first for a same score. generate_moves sorts
+the letters of the rack, its order of generation does not depend on their order: a
+strategy plays the same move from the book as from its search. A rack without any
+move has a single record with an empty word.
+
+The book is generated offline, for the first racks of the games of a seeded run or
+for random racks:
+
+    python -m src.engine.opening_book --games 200 --seed 42
+    python -m src.engine.opening_book --racks 5000 --seed 42
+"""
+
+import argparse
+import os
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.engine.grid import SCORE_GRID, Grid
+from src.engine.leave import compute_leave
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.settings import settings
+from src.settings.logger_config import logger, print_logger
+from src.utils.typing import enum, typed_dict as td
+
+# moves kept per rack
+BOOK_MOVES = 16
+MAX_RACK_SIZE = 7
+
+BOOK_DTYPE = np.dtype(
+    [
+        ("rack", f"S{MAX_RACK_SIZE}"),
+        ("word", "S15"),
+        ("row", "u1"),
+        ("col", "u1"),
+        ("vertical", "u1"),
+        ("score", "u2"),
+    ]
+)
+
+
+def rack_key(rack: Iterable[str]) -> bytes:
+    """Key of a rack in the book: its letters sorted"""
+    return "".join(sorted(rack)).encode("ascii")
+
+
+class OpeningBook:
+    """
+    Best first moves of racks, see the module documentation
+
+    :param entries: records of BOOK_DTYPE sorted by rack
+    """
+
+    def __init__(self, entries: np.ndarray):
+        if entries.dtype != BOOK_DTYPE:
+            raise ValueError(
+                f"An opening book has records of {BOOK_DTYPE}, got {entries.dtype}"
+            )
+        self.entries: np.ndarray = entries
+
+    def __len__(self) -> int:
+        """Number of racks of the book"""
+        return len(np.unique(self.entries["rack"]))
+
+    @classmethod
+    def load(cls, path: str) -> "OpeningBook":
+        """
+        Load a book saved with save, memory mapped
+        :param path:
+        :return:
+        """
+        return cls(np.load(path, mmap_mode="r"))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(path, np.asarray(self.entries))
+
+    def moves(self, rack: List[str]) -> Optional[List[td.Move]]:
+        """
+        Best moves of a rack on the empty board
+        :param rack:
+        :return: the moves best score first, None if the rack is not in the book
+        """
+        if len(rack) > MAX_RACK_SIZE:
+            return None
+        key = rack_key(rack)
+        racks = self.entries["rack"]
+        start = int(np.searchsorted(racks, key, side="left"))
+        end = int(np.searchsorted(racks, key, side="right"))
+        if start == end:
+            return None
+        moves: List[td.Move] = []
+        for entry in self.entries[start:end]:
+            word = entry["word"].decode("ascii")
+            if not word:
+                continue
+            # every letter of the word is played, as counted by _make_move
+            letter_used = list(Counter(word).elements())
+            moves.append(
+                td.Move(
+                    play=td.PlaceWord(
+                        word=word,
+                        start_position=(int(entry["row"]), int(entry["col"])),
+                        direction=(
+                            enum.Direction.VERTICAL
+                            if entry["vertical"]
+                            else enum.Direction.HORIZONTAL
+                        ),
+                    ),
+                    letter_used=letter_used,
+                    score=int(entry["score"]),
+                    leave=compute_leave(rack, letter_used),
+                )
+            )
+        return moves
+
+
+def is_opening_position(
+    word_placer_checker: WordPlacerChecker, score_grid: Grid
+) -> bool:
+    """
+    The board is the one the book was generated on: empty, with the standard premiums
+    and the base lexicon
+    :param word_placer_checker:
+    :param score_grid:
+    :return:
+    """
+    return (
+        word_placer_checker.tree is BASE_TREE
+        and bool((word_placer_checker.grid.grid == "").all())
+        and np.array_equal(score_grid.grid, SCORE_GRID.grid)
+    )
+
+
+def build_opening_book(
+    racks: Iterable[List[str]], moves_per_rack: int = BOOK_MOVES
+) -> OpeningBook:
+    """
+    Search the best first moves of racks with NaiveSearch
+    :param racks: racks of at most MAX_RACK_SIZE letters, the duplicates are
+        searched once
+    :param moves_per_rack:
+    :return: the book of the racks
+    """
+    # imported here, the strategies import this module
+    from src.search_strategy.NaiveSearch import NaiveSearch
+
+    strategy = NaiveSearch(line_cache_size=0, use_opening_book=False)
+    keys = sorted({rack_key(rack) for rack in racks})
+    records: List[Tuple[bytes, bytes, int, int, int, int]] = []
+    for index, key in enumerate(keys):
+        rack = list(key.decode("ascii"))
+        moves = [
+            move
+            for move in strategy.generate_moves(
+                rack,
+                WordPlacerChecker(Grid(), BASE_TREE),
+                Grid(SCORE_GRID.grid),
+                k=moves_per_rack,
+            )
+            if move["score"] > 0
+        ]
+        for move in moves:
+            row, col = move["play"]["start_position"]
+            records.append(
+                (
+                    key,
+                    move["play"]["word"].encode("ascii"),
+                    row,
+                    col,
+                    int(move["play"]["direction"] == enum.Direction.VERTICAL),
+                    move["score"],
+                )
+            )
+        if not moves:
+            records.append((key, b"", 0, 0, 0, 0))
+        logger.info("Opening book: rack %s/%s %s", index + 1, len(keys), key)
+    return OpeningBook(np.array(records, dtype=BOOK_DTYPE))
+
+
+def sample_racks(
+    nb_racks: int, seed: int, rack_size: int = MAX_RACK_SIZE
+) -> List[List[str]]:
+    """
+    Racks drawn from a full bag
+    :param nb_racks:
+    :param seed:
+    :param rack_size:
+    :return:
+    """
+    from src.game.bag import BASE_BAG
+
+    rng = random.Random(seed)
+    return [
+        list(BASE_BAG.copy(rng=rng).pick_n_random_letters(rack_size))
+        for _ in range(nb_racks)
+    ]
+
+
+@lru_cache(maxsize=1)
+def default_opening_book() -> Optional[OpeningBook]:
+    """
+    Book of settings.OPENING_BOOK_PATH, loaded once per process, None without a book
+    :return:
+    """
+    if os.path.exists(settings.OPENING_BOOK_PATH):
+        return OpeningBook.load(settings.OPENING_BOOK_PATH)
+    logger.debug("No opening book at %s", settings.OPENING_BOOK_PATH)
+    return None
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate the opening book of the empty board"
+    )
+    parser.add_argument(
+        "--games",
+        type=int,
+        default=None,
+        help="cover the first racks of the games of a run of this many games",
+    )
+    parser.add_argument(
+        "--racks", type=int, default=1000, help="random racks if --games is not given"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--moves", type=int, default=BOOK_MOVES)
+    parser.add_argument("--output", default=settings.OPENING_BOOK_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from src.game.game import Game
+    from src.game.player import ComputerPlayer
+    from src.search_strategy.NaiveSearch import NaiveSearch
+    from src.utils.utils import derive_seed
+
+    args = _parse_args()
+    if args.games is not None:
+        # the rack of the player starting each game of run_multiple_games
+        opening_racks = []
+        for game_index in range(args.games):
+            game = Game(
+                [ComputerPlayer(NaiveSearch()), ComputerPlayer(NaiveSearch())],
+                seed=derive_seed(args.seed, game_index),
+            )
+            game.init_game()
+            opening_racks.append(game.players[0].rack)
+    else:
+        opening_racks = sample_racks(args.racks, args.seed)
+    book = build_opening_book(opening_racks, args.moves)
+    book.save(args.output)
+    print_logger.warning(
+        "Opening book of %s racks written to %s", len(book), args.output
+    )
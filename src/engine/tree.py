@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 
 from src.settings import settings
+from src.utils import metrics
 from src.utils.utils import load_word
 
 
@@ -16,12 +17,20 @@ class TreeNode:
 
 class Tree:
     """
-    Tree data structure to store a list of words
+    Tree data structure to store a list of words.
+
+    Once built the tree is frozen: it is only read afterwards, so that threads can
+    search it at the same time without any lock.
     """
 
     def __init__(self, origin_file_path: str = settings.FRENCH_DICTIONARY_PATH):
         self.origin_file_path = origin_file_path
         self.root: TreeNode = TreeNode()
+        self.frozen: bool = False
+
+    def freeze(self) -> None:
+        """Refuse any new word, the tree is read only from now on"""
+        self.frozen = True
 
     def __str__(self):
         return f"Tree with root {self.root}"
@@ -32,6 +41,8 @@ class Tree:
         :param word:
         :return:
         """
+        if self.frozen:
+            raise RuntimeError(f"Cannot insert {word}, the tree is frozen")
         node = self.root
         for letter in word:
             if letter not in node.children:
@@ -47,17 +58,45 @@ class Tree:
         results: List,
         *,
         constraint: Optional[Dict[int, str]] = None,
+        max_depth: Optional[List[int]] = None,
     ):
         """
         Search for all valid words that can be formed with the given letters, respecting position constraints
         :param node: Current node in the trie
-        :param letters_count: Dictionary counting available letters
+        :param letters_count: Dictionary counting available letters, not modified
         :param path: Current word being built
         :param results: List to store valid words
         :param constraint: Dictionary mapping positions to required letters, e.g., {0: 'a'} means 'a' must be at index 0
+        :param max_depth: if set, its single value is raised to the deepest position reached
         :return: None but modifies the results list in place
         """
+        # the search takes and gives back letters, on a copy so that the counts of
+        # the caller are never seen half consumed (e.g. by another thread)
+        self._search(
+            node,
+            dict(letters_count),
+            list(path),
+            results,
+            constraint=constraint,
+            max_depth=max_depth,
+        )
+
+    def _search(
+        self,
+        node: TreeNode,
+        letters_count: Dict,
+        path: List,
+        results: List,
+        *,
+        constraint: Optional[Dict[int, str]] = None,
+        max_depth: Optional[List[int]] = None,
+    ):
+        """Depth first search of search, letters_count is its own copy"""
+        if metrics.ENABLED:
+            metrics.incr("tree.nodes_visited")
         current_pos = len(path)
+        if max_depth is not None and current_pos > max_depth[0]:
+            max_depth[0] = current_pos
         # Early constraint check - if current position has a constraint, only proceed if it matches
         if constraint and constraint.get(current_pos, {}):
             required_letter = constraint[current_pos]
@@ -70,12 +109,13 @@ class Tree:
             # Process only the constrained letter
             letters_count[required_letter] -= 1
             path.append(required_letter)
-            self.search(
+            self._search(
                 node.children[required_letter],
                 letters_count,
                 path,
                 results,
                 constraint=constraint,
+                max_depth=max_depth,
             )
             path.pop()
             letters_count[required_letter] += 1
@@ -92,12 +132,13 @@ class Tree:
             if letters_count[letter] > 0 and letter in node.children:
                 letters_count[letter] -= 1
                 path.append(letter)
-                self.search(
+                self._search(
                     node.children[letter],
                     letters_count,
                     path,
                     results,
                     constraint=constraint,
+                    max_depth=max_depth,
                 )
                 path.pop()
                 letters_count[letter] += 1
@@ -115,12 +156,13 @@ class Tree:
                         continue
 
                     path.append(child)
-                    self.search(
+                    self._search(
                         node.children[child],
                         letters_count,
                         path,
                         results,
                         constraint=constraint,
+                        max_depth=max_depth,
                     )
                     path.pop()
                 letters_count[letter] += 1
@@ -131,6 +173,8 @@ class Tree:
         :param word:
         :return:
         """
+        if metrics.ENABLED:
+            metrics.incr("tree.is_word_calls")
         node = self.root
         for letter in word:
             if letter not in node.children:
@@ -143,11 +187,12 @@ def convert_to_tree(words: list) -> Tree:
     """
     Convert a list of words to a tree
     :param words: list of words
-    :return: tree containing all words
+    :return: frozen tree containing all words
     """
     tree = Tree()
     for word in words:
         tree.insert(word.lower())
+    tree.freeze()
     return tree
 
 
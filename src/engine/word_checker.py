@@ -241,7 +241,7 @@ class WordPlacerChecker:
             bottom_touching = y + 1 < 15 and self.grid[x, y + 1] != ""
             place_word = self._get_horizontal_word(x, y, letter)
 
-        logger.debug(f"Checking perpendicular word {place_word}")
+        logger.debug("Checking perpendicular word %s", place_word)
 
         if not (top_touching or bottom_touching):
             return self._create_result(True, {}, "", perpendicular_words=[])
@@ -331,8 +331,9 @@ class WordPlacerChecker:
             nx, ny = nx + dx, ny + dy
 
         if dx < 0 or dy < 0:
-            # For backward direction, the start position is where we stopped
-            start_x, start_y = nx + dx, ny + dy
+            # For backward direction, the start position is the last letter found,
+            # one step before where we stopped
+            start_x, start_y = nx - dx, ny - dy
             word = word[::-1]
         else:
             # For forward direction, the start position is where we started looking
@@ -0,0 +1,88 @@
+"""
+Zobrist keys of the game state.
+
+The board is hashed by XOR of one random 64 bits key per (cell, letter): placing or
+removing a letter XORs its key, so Grid keeps its hash up to date in O(letters
+placed). Racks and the bag are multisets, hashed by the sum modulo 2**64 of one key
+per letter: drawing or putting back a letter subtracts or adds its key, whatever the
+number of copies of the letter. Each owner of letters (the bag, the rack of each
+seat) has its own keys so that a letter moving from the bag to a rack changes the
+hash of the state.
+
+The keys come from a fixed seed: the hashes are the same in every process and every
+run, they can be stored (e.g. to deduplicate the positions of a game corpus).
+"""
+
+import random
+import string
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from src.settings import settings
+
+ZOBRIST_SEED = 0x5C4A881E
+MASK = (1 << 64) - 1
+# lowercase letters are played from the rack, uppercase ones are written by some
+# tests, "*" is the blank
+ZOBRIST_LETTERS = string.ascii_lowercase + string.ascii_uppercase + "*"
+# the bag then the racks of the seats of a game
+MAX_OWNERS = 5
+
+_rng = random.Random(ZOBRIST_SEED)
+# BOARD_KEYS[row][col][letter]
+BOARD_KEYS: List[List[Dict[str, int]]] = [
+    [{letter: _rng.getrandbits(64) for letter in ZOBRIST_LETTERS} for _ in range(15)]
+    for _ in range(15)
+]
+# MULTISET_KEYS[owner][letter]
+MULTISET_KEYS: List[Dict[str, int]] = [
+    {letter: _rng.getrandbits(64) for letter in ZOBRIST_LETTERS}
+    for _ in range(MAX_OWNERS)
+]
+# XORed for the seat of the player to move, nothing for the first seat
+SEAT_KEYS: List[int] = [0] + [_rng.getrandbits(64) for _ in range(MAX_OWNERS - 2)]
+# SKIP_KEYS[player][turns skipped], XORed for the turns skipped by the player to move
+# (0) and by the other player (1), nothing for no turn skipped
+SKIP_KEYS: List[List[int]] = [
+    [0] + [_rng.getrandbits(64) for _ in range(settings.MAX_SKIPPED_TURNS)]
+    for _ in range(2)
+]
+# XORed when the player to move plays first in a round
+ROUND_START_KEY: int = _rng.getrandbits(64)
+
+BAG_OWNER = 0
+
+
+def board_hash(board: np.ndarray) -> int:
+    """
+    Hash of a board from scratch, O(letters on the board)
+    :param board: 15x15 array of letters, "" for an empty cell
+    :return:
+    """
+    result = 0
+    rows, cols = np.nonzero(board != "")
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        result ^= BOARD_KEYS[row][col][board[row, col]]
+    return result
+
+
+def multiset_hash(letters: Iterable[str], owner: int = BAG_OWNER) -> int:
+    """
+    Hash of a multiset of letters, independent of their order
+    :param letters:
+    :param owner: BAG_OWNER for the bag, 1 + seat for the rack of a seat
+    :return:
+    """
+    keys = MULTISET_KEYS[owner]
+    return sum(keys[letter] for letter in letters) & MASK
+
+
+def rack_hash(rack: Iterable[str], seat: int) -> int:
+    """
+    Hash of the rack of the player of a seat
+    :param rack:
+    :param seat: index of the player in the game
+    :return:
+    """
+    return multiset_hash(rack, BAG_OWNER + 1 + seat)
@@ -1,26 +1,59 @@
 import random
-from typing import Generator, List
+from typing import Dict, Generator, Iterable, List, Optional
 
+import numpy as np
+
+from src.engine import zobrist
 from src.settings import settings
 from src.utils.utils import LetterValue, load_letter_values
 
 
 class Bag:
-    def __init__(self, letter_distribution: dict[str, LetterValue]):
+    """
+    Bag of letters the players draw from, stored as the number of tiles of each
+    letter: a draw, a put back or a copy costs O(number of different letters),
+    whatever the number of tiles in the bag.
+
+    :param letter_distribution: number and value of each letter
+    :param rng: random generator used for the draws, a fresh unseeded one if None
+    """
+
+    def __init__(
+        self,
+        letter_distribution: dict[str, LetterValue],
+        rng: Optional[random.Random] = None,
+    ):
         self.letter_distribution: dict[str, LetterValue] = letter_distribution
-        self.bag: list = self._create_bag()
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        # the letters in the order of the distribution and their index
+        self.kinds: List[str] = list(letter_distribution)
+        self.kind_index: Dict[str, int] = {
+            letter: index for index, letter in enumerate(self.kinds)
+        }
+        self.counts: List[int] = [
+            values["number"] for values in letter_distribution.values()
+        ]
+        self.total: int = sum(self.counts)
+        # Zobrist hash of the letters of the bag, kept up to date by the draws
+        keys = zobrist.MULTISET_KEYS[zobrist.BAG_OWNER]
+        self.hash: int = (
+            sum(count * keys[letter] for letter, count in zip(self.kinds, self.counts))
+            & zobrist.MASK
+        )
 
     def __len__(self) -> int:
-        return len(self.bag)
+        return self.total
 
     def __str__(self) -> str:
-        return f"Bag with {len(self.bag)} letters"
+        return f"Bag with {self.total} letters"
 
-    def _create_bag(self) -> list[str]:
-        bag = []
-        for letter, values in self.letter_distribution.items():
-            bag.extend([letter] * values["number"])
-        return bag
+    @property
+    def bag(self) -> List[str]:
+        """Letters of the bag, in the order of the distribution. O(tiles)"""
+        letters: List[str] = []
+        for letter, count in zip(self.kinds, self.counts):
+            letters.extend([letter] * count)
+        return letters
 
     def serialize(self) -> dict:
         return {
@@ -28,22 +61,77 @@ class Bag:
             "bag": self.bag,
         }
 
-    def copy(self):
-        return Bag(self.letter_distribution)
+    def copy(self, rng: Optional[random.Random] = None) -> "Bag":
+        """
+        Copy of the bag with its current letters
+        :param rng: random generator of the copy, the one of this bag if None
+        :return:
+        """
+        bag = Bag.__new__(Bag)
+        bag.letter_distribution = self.letter_distribution
+        bag.rng = rng if rng is not None else self.rng
+        bag.kinds = self.kinds
+        bag.kind_index = self.kind_index
+        bag.counts = self.counts.copy()
+        bag.total = self.total
+        bag.hash = self.hash
+        return bag
 
     def is_in_bag(self, letter: str) -> bool:
-        return letter in self.bag
+        index = self.kind_index.get(letter)
+        return index is not None and self.counts[index] > 0
 
     def pick_random_letter(self) -> str:
-        if not self.bag:
+        if not self.total:
             raise ValueError("Bag is empty")
-        return self.bag.pop(random.randint(0, len(self.bag) - 1))
+        # the tile of rank r in the order of the distribution
+        rank = self.rng.randrange(self.total)
+        index = 0
+        counts = self.counts
+        while rank >= counts[index]:
+            rank -= counts[index]
+            index += 1
+        counts[index] -= 1
+        self.total -= 1
+        letter = self.kinds[index]
+        self.hash = (self.hash - zobrist.MULTISET_KEYS[zobrist.BAG_OWNER][letter]) & (
+            zobrist.MASK
+        )
+        return letter
 
     def put_back(self, letter: str | List[str]) -> None:
-        if isinstance(letter, str):
-            self.bag.append(letter)
-        else:
-            self.bag.extend(letter)
+        letters = [letter] if isinstance(letter, str) else letter
+        for put_letter in letters:
+            self.counts[self.kind_index[put_letter]] += 1
+        self.total += len(letters)
+        self.hash = (self.hash + zobrist.multiset_hash(letters)) & zobrist.MASK
+
+    def remove_letters(self, letters: List[str]) -> None:
+        """
+        Take given letters out of the bag, e.g. to undo a put_back
+        :param letters:
+        :return:
+        """
+        for letter in letters:
+            index = self.kind_index[letter]
+            if not self.counts[index]:
+                raise ValueError(f"No {letter} left in the bag")
+            self.counts[index] -= 1
+            self.total -= 1
+            self.hash = (
+                self.hash - zobrist.MULTISET_KEYS[zobrist.BAG_OWNER][letter]
+            ) & zobrist.MASK
+
+    def set_letters(self, letters: List[str]) -> None:
+        """
+        Replace the letters of the bag, e.g. to restore a snapshot
+        :param letters:
+        :return:
+        """
+        self.counts = [0] * len(self.kinds)
+        self.total = 0
+        self.hash = zobrist.multiset_hash([])
+        self.put_back(list(letters))
 
     def pick_n_random_letters(self, n: int) -> Generator[str, None, None]:
         for _ in range(n):
@@ -53,4 +141,86 @@ class Bag:
                 break
 
 
+class UnseenTiles:
+    """
+    The tiles a player cannot see: the bag and the racks of the opponents, as a
+    number of tiles of each letter. The racks of the opponents are plausibly any
+    draw of these tiles, sampled without replacement (multivariate hypergeometric).
+
+    :param kinds: the letters
+    :param counts: number of unseen tiles of each letter
+    """
+
+    def __init__(self, kinds: List[str], counts: List[int]):
+        self.kinds: List[str] = kinds
+        self.counts: np.ndarray = np.array(counts, dtype=np.int64)
+        self.total: int = int(self.counts.sum())
+
+    @classmethod
+    def from_bag(cls, bag: Bag, racks: Iterable[List[str]]) -> "UnseenTiles":
+        """
+        Unseen tiles of a player
+        :param bag:
+        :param racks: racks of the opponents of the player
+        :return:
+        """
+        counts = bag.counts.copy()
+        for rack in racks:
+            for letter in rack:
+                counts[bag.kind_index[letter]] += 1
+        return cls(bag.kinds, counts)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def letters(self) -> List[str]:
+        """The unseen tiles, in the order of the kinds"""
+        return np.repeat(np.array(self.kinds), self.counts).tolist()
+
+    def sample_racks(
+        self, rack_size: int, nb_samples: int, generator: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Sample racks of the opponent in one vectorized call
+        :param rack_size: tiles of a rack, at most the number of unseen tiles
+        :param nb_samples:
+        :param generator: numpy random generator, e.g. np.random.default_rng(seed)
+        :return: (nb_samples, number of kinds) array, the number of tiles of each
+            letter in each rack
+        """
+        # the count method is the fastest for small samples of a few tiles
+        return generator.multivariate_hypergeometric(
+            self.counts, min(rack_size, self.total), size=nb_samples, method="count"
+        )
+
+    def rack_letters(self, rack_counts: np.ndarray) -> List[str]:
+        """
+        Letters of a rack of sample_racks
+        :param rack_counts: one row of sample_racks
+        :return:
+        """
+        return np.repeat(np.array(self.kinds), rack_counts).tolist()
+
+    def sample_rack(self, rack_size: int, rng: random.Random) -> List[str]:
+        """
+        Sample one rack of the opponent with a python random generator
+        :param rack_size:
+        :param rng:
+        :return:
+        """
+        counts = self.counts.tolist()
+        total = self.total
+        rack: List[str] = []
+        for _ in range(min(rack_size, total)):
+            rank = rng.randrange(total)
+            index = 0
+            while rank >= counts[index]:
+                rank -= counts[index]
+                index += 1
+            counts[index] -= 1
+            total -= 1
+            rack.append(self.kinds[index])
+        return rack
+
+
 BASE_BAG = Bag(load_letter_values(settings.LETTERS_VALUES_PATH))
@@ -4,12 +4,16 @@ from typing import List, Dict
 
 from typing_extensions import Optional
 
-from src.game.bag import Bag, BASE_BAG
-from src.engine.grid import Grid, SCORE_GRID
+from src.game.bag import Bag, BASE_BAG, UnseenTiles
+from src.engine import zobrist
+from src.engine.grid import Grid, SCORE_GRID, consume_premiums
 from src.engine.word_checker import WordPlacerChecker
+from src.game.observer import GameObserver
 from src.game.player import Player
+from src.game.snapshot import pack_snapshot, unpack_snapshot
 from src.engine.tree import Tree, BASE_TREE
-from src.settings.logger_config import print_logger
+from src.settings import settings
+from src.utils import metrics
 from src.utils.typing import typed_dict as td
 
 
@@ -22,6 +26,12 @@ class Game:
     :param tree: the word trie of the game
     :param bag: the bag at the start of the game
     :param rack_size: the size of the rack of the players
+    :param seed: seed of the game random generator, used for the bag and the players,
+        the same seed replays the same game
+    :param observer: hooks rendering the game or reporting its progress, the game is
+        played headless (no rendering, no pause between turns) if None
+    :param record_stats: record in the history of each move the time the player took
+        and the effort of its search
 
     Attributes:
     - players: list of players
@@ -31,6 +41,10 @@ class Game:
     - bag: the bag of the game, where the letters are picked
     - starter_bag: the bag at the start of the game (immutable)
     - rack_size: the size of the rack of the players
+    - seed: the seed of the game random generator (None if unseeded)
+    - rng: the random generator of the game, shared by the bag and the players
+    - observer: the hooks called while the game is played, None when headless
+    - record_stats: whether the moves of the history carry their search statistics
     - current_player: the id of the current player (hash of the player object)
     - game_history: a dictionary containing the game states at each turn, indexed by turn number
         a state is registered after each turn
@@ -47,22 +61,40 @@ class Game:
         bag: Optional[Bag] = None,  # Set up the bag similarly
         score_grid: Optional[Grid] = None,
         rack_size: int = 7,
+        seed: Optional[int] = None,
+        observer: Optional[GameObserver] = None,
+        record_stats: bool = False,
     ):
         if len(players) < 2:
             raise ValueError("At least two players are required to play the game")
 
+        self.seed: Optional[int] = seed
+        self.observer: Optional[GameObserver] = observer
+        self.record_stats: bool = record_stats
+        self.rng: random.Random = random.Random(seed)
+
         # Ensure a unique Grid instance per game
         self.players: List[Player] = players
+        for player in self.players:
+            player.set_rng(self.rng)
         self.grid: Grid = grid if grid is not None else Grid()
         self.starter_grid: Grid = self.grid
         self.tree: Tree = tree
-        self.bag: Bag = bag.copy() if bag is not None else BASE_BAG.copy()
-        self.score_grid: Grid = score_grid if score_grid is not None else SCORE_GRID
+        self.bag: Bag = (
+            bag.copy(rng=self.rng) if bag is not None else BASE_BAG.copy(rng=self.rng)
+        )
+        # scoring consumes the premium cells of the score grid, copy it so that
+        # games played in the same process do not depend on each other
+        self.score_grid: Grid = Grid(
+            score_grid.grid if score_grid is not None else SCORE_GRID.grid
+        )
         self.starter_bag: Bag = self.bag
         self.rack_size: int = rack_size
 
         self.turn: int = 0
-        self.game_history: td.GameHistory = td.GameHistory(history=[], players_score={})
+        self.game_history: td.GameHistory = td.GameHistory(
+            history=[], players_score={}, seed=seed
+        )
         self.word_placer_checker = WordPlacerChecker(self.grid, self.tree)
 
     @property
@@ -71,6 +103,19 @@ class Game:
             return 0
         return sum([sum(player.score_history) for player in self.players])
 
+    def state_hash(self, seat: int = 0) -> int:
+        """
+        Zobrist hash of the state of the game: the board, the bag, the rack of each
+        seat and the seat to move. O(1) for the board and the bag, whose hashes are
+        kept up to date, O(rack size) for the racks.
+        :param seat: index in self.players of the player to move
+        :return:
+        """
+        result = self.grid.hash ^ self.bag.hash ^ zobrist.SEAT_KEYS[seat]
+        for player_seat, player in enumerate(self.players):
+            result ^= zobrist.rack_hash(player.rack, player_seat)
+        return result
+
     def _list_players_str(self) -> str:
         return ", ".join([str(player) for player in self.players])
 
@@ -84,9 +129,77 @@ class Game:
             "starter_bag": self.starter_bag.serialize(),
             "tree": self.tree.origin_file_path,
             "rack_size": self.rack_size,
+            "seed": self.seed,
             "game_history": self.game_history,
         }
 
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary snapshot of the state of the game: board, premiums, bag,
+        racks, scores and turn (see src/game/snapshot.py). The history is not part of
+        it.
+        :return:
+        """
+        return pack_snapshot(
+            td.GameSnapshot(
+                board=self.grid.grid,
+                premiums=self.score_grid.grid,
+                bag=self.bag.bag,
+                racks=[player.rack for player in self.players],
+                scores=[sum(player.score_history) for player in self.players],
+                skipped=[player.nb_skip_turn for player in self.players],
+                turn=self.turn,
+                seed=self.seed,
+                rack_size=self.rack_size,
+            )
+        )
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        players: List[Player],
+        *,
+        tree: Tree = BASE_TREE,
+        observer: Optional[GameObserver] = None,
+        record_stats: bool = False,
+    ) -> "Game":
+        """
+        Game in the state of a snapshot of to_bytes. The score history of each player
+        is its total score. The random generator is seeded again with the seed of the
+        game, it does not draw the letters the original game would have drawn.
+        :param data:
+        :param players: the players of the game, in the seat order of the snapshot
+        :param tree:
+        :param observer:
+        :param record_stats:
+        :return:
+        """
+        snapshot = unpack_snapshot(data)
+        if len(players) != len(snapshot["racks"]):
+            raise ValueError(
+                f"The snapshot has {len(snapshot['racks'])} players, got {len(players)}"
+            )
+        game = cls(
+            players,
+            grid=Grid(snapshot["board"]),
+            tree=tree,
+            score_grid=Grid(snapshot["premiums"]),
+            rack_size=snapshot["rack_size"],
+            seed=snapshot["seed"],
+            observer=observer,
+            record_stats=record_stats,
+        )
+        game.bag.set_letters(snapshot["bag"])
+        game.turn = snapshot["turn"]
+        for player, rack, score, skipped in zip(
+            players, snapshot["racks"], snapshot["scores"], snapshot["skipped"]
+        ):
+            player.init_player(rack=rack)
+            player.score_history = [score]
+            player.nb_skip_turn = skipped
+        return game
+
     def _next_turn(self, plays: Dict[str, td.PlayerMove]) -> None:
         """
         Go to the next turn, a turn is when each player has played once
@@ -101,57 +214,159 @@ class Game:
         nb_letters = self.rack_size - len(player.rack)
         player.rack.extend(self.bag.pick_n_random_letters(nb_letters))
 
+    def unseen_tiles(self, player: Player) -> UnseenTiles:
+        """
+        Tiles the player cannot see: the bag and the racks of the other players
+        :param player:
+        :return:
+        """
+        return UnseenTiles.from_bag(
+            self.bag, [other.rack for other in self.players if other is not player]
+        )
+
+    def _search_context(self, player: Player) -> td.SearchContext:
+        unseen = self.unseen_tiles(player).letters()
+        seat = self.players.index(player)
+        opponent = self.players[(seat + 1) % len(self.players)]
+        return td.SearchContext(
+            unseen=unseen,
+            bag_size=len(self.bag),
+            # the opponent fills its rack before playing
+            opponent_rack_size=min(self.rack_size, len(unseen)),
+            skipped_turns=(player.nb_skip_turn, opponent.nb_skip_turn),
+            first_to_play=seat == 0,
+        )
+
+    @staticmethod
+    def _move_stats(
+        player: Player, wall_time: float, cpu_time: float, bag_size: int
+    ) -> td.MoveStats:
+        search_stats = player.last_search_stats()
+        return td.MoveStats(
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            bag_size=bag_size,
+            candidates_generated=(
+                search_stats["candidates_generated"] if search_stats else 0
+            ),
+            candidates_validated=(
+                search_stats["candidates_validated"] if search_stats else 0
+            ),
+            max_depth=search_stats["max_depth"] if search_stats else 0,
+        )
+
+    def apply_move(self, player: Player, valid_word: td.ValidWord) -> td.MoveUndo:
+        """
+        Play the move of a player: the letters leave its rack, the word is placed, its
+        premiums are consumed and the player scores. A pass (empty word) puts the
+        rack back in the bag and draws a new one.
+        O(letters of the word), plus the redraw of a pass.
+        :param player:
+        :param valid_word:
+        :return: what undo_move needs to restore the game
+        """
+        rack_before = player.rack.copy()
+        player.remove_from_rack(valid_word["letter_used"])
+        player.update_score(valid_word["score"])
+        play = valid_word["play"]
+        board_changes = self.grid.apply_move(play)
+        premium_changes = consume_premiums(self.score_grid, play)
+        drawn: List[str] = []
+        passed = len(play["word"]) == 0
+        # if the player played no word, skip the turn and reroll the rack
+        if passed:
+            player.nb_skip_turn += 1
+            # reroll the rack
+            self.bag.put_back(player.rack)
+            player.rack = []
+            self._fill_rack(player)
+            drawn = player.rack.copy()
+        return td.MoveUndo(
+            rack_before=rack_before,
+            board_changes=board_changes,
+            premium_changes=premium_changes,
+            drawn=drawn,
+            passed=passed,
+        )
+
+    def undo_move(self, player: Player, undo: td.MoveUndo) -> None:
+        """
+        Restore the game as it was before a move of apply_move, the moves are undone
+        in the reverse order they were played. The letters of the bag are restored,
+        not the state of the random generator.
+        :param player: the player of the move
+        :param undo: returned by apply_move
+        :return:
+        """
+        self.grid.undo_move(undo["board_changes"])
+        self.score_grid.undo_move(undo["premium_changes"])
+        player.score_history.pop()
+        if undo["passed"]:
+            player.nb_skip_turn -= 1
+            self.bag.put_back(undo["drawn"])
+            self.bag.remove_letters(undo["rack_before"])
+        player.rack = undo["rack_before"]
+
     def _play_turn(self):
         plays = {}
-        print_logger.info(f"Turn {self.turn}")
-        print_logger.info(f"Players: {self._list_players_str()}")
+        observer = self.observer
+        if observer is not None:
+            observer.on_turn_start(self)
         for player in self.players:
-            print_logger.info(f"Player {player.player_id} is playing")
             self._fill_rack(player)
-            print_logger.info(self.grid)
-            print_logger.info(player.display_rack())
+            if observer is not None:
+                observer.on_player_turn(self, player)
             previous_race = player.rack.copy()
+            bag_size = len(self.bag)
+            player.set_search_context(self._search_context(player))
+            start = time.perf_counter()
+            cpu_start = time.process_time()
             valid_word = player.get_valid_move(
                 self.word_placer_checker, self.score_grid
             )
-            player.remove_from_rack(valid_word["letter_used"])
-            player.update_score(valid_word["score"])
-            play = valid_word["play"]
-            self.grid.place_word(**play)
-            # if the player played no word, skip the turn and reroll the rack
-            if len(play["word"]) == 0:
-                player.nb_skip_turn += 1
-                # reroll the rack
-                self.bag.put_back(player.rack)
-                player.rack = []
-                self._fill_rack(player)
-
-            print_logger.info(
-                f"Player {player.player_id} played {play} and scored {player.score_history[-1]} points, new score: {sum(player.score_history)}"
-            )
+            wall_time = time.perf_counter() - start
+            cpu_time = time.process_time() - cpu_start
+            if metrics.ENABLED:
+                metrics.observe(f"turn.{player.strategy_code}", wall_time)
+            self.apply_move(player, valid_word)
 
             plays[player.player_id] = td.PlayerMove(
                 rack_before=previous_race, valid_word=valid_word
             )
-            print_logger.info("\n")
+            if self.record_stats:
+                plays[player.player_id]["stats"] = self._move_stats(
+                    player, wall_time, cpu_time, bag_size
+                )
+            if observer is not None:
+                observer.on_move(self, player, plays[player.player_id])
         self._next_turn(plays)
+        if observer is not None:
+            observer.on_turn_end(self)
 
     def play_game(self) -> td.GameHistory:
-        print_logger.info(f"Starting game with players: {self._list_players_str()}")
-        while any([len(player.rack) > 0 for player in self.players]) and all(
-            [player.nb_skip_turn < 3 for player in self.players]
-        ):
-            self._play_turn()
-            time.sleep(0.1)
-        print_logger.info(f"Game over, final score: {self.score}")
-        print_logger.info(f"Players: {self._list_players_str()}")
+        if self.observer is not None:
+            self.observer.on_game_start(self)
+        try:
+            while any([len(player.rack) > 0 for player in self.players]) and all(
+                [
+                    player.nb_skip_turn < settings.MAX_SKIPPED_TURNS
+                    for player in self.players
+                ]
+            ):
+                self._play_turn()
+        finally:
+            # e.g. the worker pools of the strategies do not outlive the game
+            for player in self.players:
+                player.close()
+        if self.observer is not None:
+            self.observer.on_game_end(self)
         self.game_history["players_score"] = {
             player.player_id: player.score_history for player in self.players
         }
         return self.game_history
 
     def init_game(self):
-        random.shuffle(self.players)
+        self.rng.shuffle(self.players)
         for player in self.players:
             nb_letters = self.rack_size - len(player.rack)
             player.init_player(rack=list(self.bag.pick_n_random_letters(nb_letters)))
@@ -0,0 +1,171 @@
+import json
+import os
+from typing import Dict, Optional, TextIO
+
+from src.settings.logger_config import logger
+from src.utils.typing import enum, typed_dict as td
+
+
+def _encode(value):
+    """
+    json.dump hook for the values that are not natively serializable
+    :param value:
+    :return:
+    """
+    if isinstance(value, enum.Direction):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_history(history: dict) -> td.GameHistory:
+    """
+    Restore the python types of a game history read from json
+    (directions are enums and positions are tuples)
+    :param history:
+    :return:
+    """
+    for plays in history["history"]:
+        for move in plays.values():
+            play = move["valid_word"]["play"]
+            play["direction"] = enum.Direction(play["direction"])
+            play["start_position"] = tuple(play["start_position"])
+    return td.GameHistory(
+        history=history["history"],
+        players_score=history["players_score"],
+        seed=history.get("seed"),
+    )
+
+
+class GameJournal:
+    """
+    Append only journal of the games completed during a run, one json line per game.
+    Every game is flushed to disk as soon as it is recorded so that an interrupted run
+    can be resumed without playing again the games already completed.
+
+    The first line records the parameters of the run, a journal can only be resumed
+    with the same parameters.
+
+    :param path: path of the journal file
+    :param seed: seed of the run the journal belongs to
+    """
+
+    def __init__(self, path: str, seed: Optional[int] = None):
+        self.path: str = path
+        self.seed: Optional[int] = seed
+        self.completed: Dict[int, td.GameHistory] = {}
+        self._file: Optional[TextIO] = None
+
+    def __enter__(self) -> "GameJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def open(self, *, resume: bool = False) -> "GameJournal":
+        """
+        Open the journal for writing
+        :param resume: load the games of an existing journal instead of refusing to
+            overwrite it
+        :return: the journal
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            if not resume:
+                raise FileExistsError(
+                    f"Journal {self.path} already exists, resume it or remove it"
+                )
+            valid_size = self._load()
+            # drop a record partially written when the run was interrupted
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"run": {"seed": self.seed}})
+        return self
+
+    @classmethod
+    def read(cls, path: str) -> "GameJournal":
+        """
+        Load the games of a journal without opening it for writing, whatever the
+        seed of its run
+        :param path:
+        :return: the journal, its games in completed
+        """
+        with open(path, "rb") as f:
+            header = f.readline()
+        try:
+            seed = json.loads(header)["run"]["seed"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise ValueError(f"Journal {path} has no run header")
+        journal = cls(path, seed)
+        journal._load()
+        return journal
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load(self) -> int:
+        """
+        Load the games of the journal, only the last record may be damaged (written
+        when the run was interrupted), a damaged record anywhere else is an error
+        :return: size in bytes of the valid part of the journal
+        """
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        valid_size = 0
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except json.JSONDecodeError:
+                record = None
+            if record is None:
+                if line_number == len(lines) - 1 and line_number > 0:
+                    logger.warning(
+                        "Ignoring truncated record at the end of journal %s", self.path
+                    )
+                    break
+                raise ValueError(
+                    f"Journal {self.path} is corrupted at line {line_number + 1}"
+                )
+            if line_number == 0:
+                if "run" not in record:
+                    raise ValueError(f"Journal {self.path} has no run header")
+                if record["run"]["seed"] != self.seed:
+                    raise ValueError(
+                        f"Journal {self.path} was written with seed "
+                        f"{record['run']['seed']}, cannot resume it with seed {self.seed}"
+                    )
+            else:
+                self.completed[record["game_index"]] = _decode_history(
+                    record["history"]
+                )
+            valid_size += len(line)
+        return valid_size
+
+    def _write(self, record: dict) -> None:
+        if self._file is None:
+            raise ValueError("Journal is not open")
+        self._file.write(json.dumps(record, default=_encode) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_completed(self, game_index: int) -> bool:
+        return game_index in self.completed
+
+    def record(self, game_index: int, history: td.GameHistory) -> None:
+        """
+        Durably append a completed game to the journal
+        :param game_index:
+        :param history:
+        :return:
+        """
+        self._write({"game_index": game_index, "history": history})
+        self.completed[game_index] = history
@@ -0,0 +1,75 @@
+import time
+from typing import TYPE_CHECKING
+
+from src.settings.logger_config import print_logger
+from src.utils.typing import typed_dict as td
+
+if TYPE_CHECKING:
+    from src.game.game import Game
+    from src.game.player import Player
+
+
+class GameObserver:
+    """
+    Hooks called by a game while it is played, to render it or report its progress.
+    Every hook does nothing by default, subclasses override the ones they need.
+    A game without observer skips them entirely (headless mode).
+    """
+
+    def on_game_start(self, game: "Game") -> None:
+        pass
+
+    def on_turn_start(self, game: "Game") -> None:
+        pass
+
+    def on_player_turn(self, game: "Game", player: "Player") -> None:
+        """Called when the player is about to play, its rack is already filled"""
+        pass
+
+    def on_move(self, game: "Game", player: "Player", move: td.PlayerMove) -> None:
+        pass
+
+    def on_turn_end(self, game: "Game") -> None:
+        pass
+
+    def on_game_end(self, game: "Game") -> None:
+        pass
+
+
+class ConsoleObserver(GameObserver):
+    """
+    Print the game in the console: the board and the rack before each move, the
+    moves and the scores. It prints at the warning level, the level print_logger
+    shows by default.
+
+    :param delay: pause in seconds after each turn, to follow the game
+    """
+
+    def __init__(self, delay: float = 0.1):
+        self.delay: float = delay
+
+    def on_game_start(self, game: "Game") -> None:
+        print_logger.warning(f"Starting game with players: {game._list_players_str()}")
+
+    def on_turn_start(self, game: "Game") -> None:
+        print_logger.warning(f"Turn {game.turn}")
+        print_logger.warning(f"Players: {game._list_players_str()}")
+
+    def on_player_turn(self, game: "Game", player: "Player") -> None:
+        print_logger.warning(f"Player {player.player_id} is playing")
+        print_logger.warning(game.grid)
+        print_logger.warning(player.display_rack())
+
+    def on_move(self, game: "Game", player: "Player", move: td.PlayerMove) -> None:
+        print_logger.warning(
+            f"Player {player.player_id} played {move['valid_word']['play']} and scored {player.score_history[-1]} points, new score: {sum(player.score_history)}"
+        )
+        print_logger.warning("\n")
+
+    def on_turn_end(self, game: "Game") -> None:
+        if self.delay > 0:
+            time.sleep(self.delay)
+
+    def on_game_end(self, game: "Game") -> None:
+        print_logger.warning(f"Game over, final score: {game.score}")
+        print_logger.warning(f"Players: {game._list_players_str()}")
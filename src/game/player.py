@@ -1,9 +1,11 @@
+import random
 from abc import ABC, abstractmethod
 from typing import List, Tuple, Optional
 from collections import Counter
 
 from src.engine.grid import compute_total_word_score, Grid
 from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.EndgameSolver import EndgameSolver
 from src.search_strategy.WordSearchStrategy import WordSearchStrategy
 from src.settings.logger_config import logger, print_logger
 from src.utils.typing import enum, typed_dict as td
@@ -17,6 +19,7 @@ class Player(ABC):
     - rack: List[str]: The letters that the player has
     - score: List[int]: The score of the player, updated after each move
     - nb_skip_turn: int: The number of turn the player has skipped
+    - rng: random.Random: The random generator of the player, set by the game
 
     Methods:
     - player_id: int: The hash of the player object
@@ -27,6 +30,7 @@ class Player(ABC):
         self.rack: List[str] = []
         self.score_history: List[int] = []
         self.nb_skip_turn: int = 0
+        self.rng: random.Random = random.Random()
 
     @property
     def player_id(self) -> str:
@@ -60,6 +64,36 @@ class Player(ABC):
         """
         pass
 
+    def set_rng(self, rng: random.Random) -> None:
+        """
+        Share the game random generator with the player
+        :param rng:
+        :return:
+        """
+        self.rng = rng
+
+    def set_search_context(self, context: td.SearchContext) -> None:
+        """
+        What the player knows of the game before its move, given by the game
+        :param context:
+        :return:
+        """
+        pass
+
+    def last_search_stats(self) -> Optional[td.SearchStats]:
+        """
+        Effort spent to find the last move, None if the player does not measure it
+        :return:
+        """
+        return None
+
+    def close(self) -> None:
+        """
+        Release what the player holds once its game is over, called by the game
+        :return:
+        """
+        pass
+
     def init_player(self, *, rack: Optional[List[str]] = None):
         self.rack = rack if rack is not None else []
         self.score_history = []
@@ -185,9 +219,23 @@ class HumanPlayer(Player):
 
 
 class ComputerPlayer(Player):
-    def __init__(self, word_search_strategy: WordSearchStrategy):
+    """
+    Player whose moves are found by a search strategy
+
+    :param word_search_strategy: strategy finding the moves
+    :param endgame_solver: solver finding the moves once the bag is empty in a two
+        player game, the strategy plays them too if None
+    """
+
+    def __init__(
+        self,
+        word_search_strategy: WordSearchStrategy,
+        endgame_solver: Optional[EndgameSolver] = None,
+    ):
         super().__init__()
         self.research_method: WordSearchStrategy = word_search_strategy
+        self.endgame_solver: Optional[EndgameSolver] = endgame_solver
+        self.search_context: Optional[td.SearchContext] = None
         self.strategy_code = f"computer_{word_search_strategy.strategy_code}"
 
     def __repr__(self):
@@ -199,9 +247,39 @@ class ComputerPlayer(Player):
     def serialize(self) -> dict:
         return super().serialize() | {"type": "ComputerPlayer"}
 
+    def set_rng(self, rng: random.Random) -> None:
+        super().set_rng(rng)
+        self.research_method.rng = rng
+
+    def set_search_context(self, context: td.SearchContext) -> None:
+        self.search_context = context
+        self.research_method.context = context
+
+    def last_search_stats(self) -> Optional[td.SearchStats]:
+        return self.research_method.search_stats
+
+    def close(self) -> None:
+        self.research_method.close()
+
     def get_valid_move(
         self, word_placer_checker: WordPlacerChecker, score_grid: Grid
     ) -> td.ValidWord:
+        context = self.search_context
+        if (
+            self.endgame_solver is not None
+            and context is not None
+            and context["bag_size"] == 0
+        ):
+            # the unseen letters are the rack of the opponent, empty once it went out
+            # while the game goes on until it skipped enough turns
+            return self.endgame_solver.solve(
+                self.rack,
+                context["unseen"],
+                word_placer_checker,
+                score_grid,
+                context.get("skipped_turns", (0, 0)),
+                context.get("first_to_play", True),
+            )
         return self.research_method.find_best_word(
             self.rack, word_placer_checker, score_grid
         )
@@ -0,0 +1,153 @@
+"""
+Compact binary snapshot of the state of a game, see Game.to_bytes and Game.from_bytes.
+
+The layout is fixed for a number of players and a rack size, little endian:
+
+- header: magic b"SCRB", version (u8), number of players (u8), rack size (u8),
+  seeded (u8), turn (u16), seed (u64, 0 if the game is not seeded)
+- board: 225 letter codes (u8) row by row, 0 for an empty cell
+- premiums: 225 premiums (u8) row by row, as in the score grid
+- bag: number of each letter in the bag (u8), in the order of SNAPSHOT_LETTERS
+- each player in seat order: total score (i32), skipped turns (u8) and the rack as
+  rack size letter codes (u8), padded with 0
+
+A letter code is 0 for no letter, then the index of the letter in SNAPSHOT_LETTERS
+plus one. The history of the game and the state of its random generator are not part
+of the snapshot.
+"""
+
+import string
+import struct
+from typing import List, Optional
+
+import numpy as np
+
+from src.utils.typing import typed_dict as td
+
+SNAPSHOT_MAGIC = b"SCRB"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_LETTERS = string.ascii_lowercase + "*"
+
+_HEADER = struct.Struct("<4sBBBBHQ")
+_PLAYER = struct.Struct("<iB")
+_CELLS = 15 * 15
+_NB_LETTERS = len(SNAPSHOT_LETTERS)
+
+# letter of each code, code of each unicode code point, and the same tables for
+# bytes.translate
+_LETTERS = np.array([""] + list(SNAPSHOT_LETTERS), dtype="<U1")
+_CODES = np.zeros(128, dtype=np.uint8)
+for _code, _letter in enumerate(SNAPSHOT_LETTERS, start=1):
+    _CODES[ord(_letter)] = _code
+_ENCODE_TABLE = bytes(_CODES) + bytes(128)
+_DECODE_TABLE = ("\0" + SNAPSHOT_LETTERS).encode("ascii").ljust(256, b"\0")
+
+
+def snapshot_size(nb_players: int, rack_size: int) -> int:
+    return (
+        _HEADER.size
+        + 2 * _CELLS
+        + _NB_LETTERS
+        + nb_players * (_PLAYER.size + rack_size)
+    )
+
+
+def _encode_board(board: np.ndarray) -> bytes:
+    """Codes of the cells of a board, "" being 0"""
+    return _CODES[np.asarray(board, dtype="<U1").view(np.uint32)].tobytes()
+
+
+def _encode_letters(letters: List[str]) -> bytes:
+    """Codes of a list of letters"""
+    return "".join(letters).encode("ascii").translate(_ENCODE_TABLE)
+
+
+def _decode_letters(codes: bytes) -> List[str]:
+    return list(codes.translate(_DECODE_TABLE).decode("ascii"))
+
+
+def pack_snapshot(snapshot: td.GameSnapshot) -> bytes:
+    """
+    Binary snapshot of the state of a game, see the module documentation
+    :param snapshot:
+    :return:
+    """
+    racks = snapshot["racks"]
+    rack_size = snapshot["rack_size"]
+    seed = snapshot["seed"]
+    parts = [
+        _HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            len(racks),
+            rack_size,
+            seed is not None,
+            snapshot["turn"],
+            0 if seed is None else seed,
+        ),
+        _encode_board(snapshot["board"]),
+        snapshot["premiums"].astype(np.uint8).tobytes(),
+        np.bincount(
+            np.frombuffer(_encode_letters(snapshot["bag"]), dtype=np.uint8),
+            minlength=_NB_LETTERS + 1,
+        )[1:]
+        .astype(np.uint8)
+        .tobytes(),
+    ]
+    for rack, score, skipped in zip(racks, snapshot["scores"], snapshot["skipped"]):
+        if len(rack) > rack_size:
+            raise ValueError(f"Rack {rack} is larger than the rack size {rack_size}")
+        parts.append(_PLAYER.pack(score, skipped))
+        parts.append(_encode_letters(rack).ljust(rack_size, b"\0"))
+    return b"".join(parts)
+
+
+def unpack_snapshot(data: bytes) -> td.GameSnapshot:
+    """
+    State of a game from a binary snapshot of pack_snapshot
+    :param data:
+    :return:
+    """
+    magic, version, nb_players, rack_size, seeded, turn, seed = _HEADER.unpack_from(
+        data
+    )
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Not a version {SNAPSHOT_VERSION} game snapshot")
+    if len(data) != snapshot_size(nb_players, rack_size):
+        raise ValueError(
+            f"A snapshot of {nb_players} players has "
+            f"{snapshot_size(nb_players, rack_size)} bytes, got {len(data)}"
+        )
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    offset = _HEADER.size
+    board = _LETTERS[buffer[offset : offset + _CELLS]].reshape(15, 15)
+    offset += _CELLS
+    premiums = buffer[offset : offset + _CELLS].astype(np.int64).reshape(15, 15)
+    offset += _CELLS
+    bag: List[str] = np.repeat(
+        _LETTERS[1:], buffer[offset : offset + _NB_LETTERS]
+    ).tolist()
+    offset += _NB_LETTERS
+
+    racks: List[List[str]] = []
+    scores: List[int] = []
+    skipped: List[int] = []
+    for _ in range(nb_players):
+        score, skip = _PLAYER.unpack_from(data, offset)
+        offset += _PLAYER.size
+        racks.append(_decode_letters(data[offset : offset + rack_size].rstrip(b"\0")))
+        offset += rack_size
+        scores.append(score)
+        skipped.append(skip)
+    seed_value: Optional[int] = seed if seeded else None
+    return td.GameSnapshot(
+        board=board,
+        premiums=premiums,
+        bag=bag,
+        racks=racks,
+        scores=scores,
+        skipped=skipped,
+        turn=turn,
+        seed=seed_value,
+        rack_size=rack_size,
+    )
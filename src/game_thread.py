@@ -1,13 +1,24 @@
+import gc
 import multiprocessing
-from typing import List
+import multiprocessing.pool
+from typing import List, Optional
 from tqdm import tqdm
 
 from src.game.game import Game
-from src.game.player import ComputerPlayer
-from src.search_strategy.NaiveBlindSearch import NaiveBlindSearch
-from src.search_strategy.NaiveSearch import NaiveSearch
-from src.settings.logger_config import print_logger
+from src.game.journal import GameJournal
+from src.game.player import ComputerPlayer, Player
+from src.search_strategy.EndgameSolver import EndgameSolver
+from src.search_strategy.registry import DEFAULT_STRATEGY_PAIR, build_strategy
+from src.settings.logger_config import (
+    configure_worker_logging,
+    logger,
+    print_logger,
+    worker_log_queue,
+)
+from src.utils import metrics
+from src.utils.profiling import ProfileData, ProfileReport, profile_call
 from src.utils.typing import typed_dict as td
+from src.utils.utils import derive_seed, percentile
 
 from typing import Dict, Tuple
 from collections import defaultdict
@@ -54,6 +65,67 @@ def print_game_scores(game_history: td.GameHistory) -> None:
     print(f"Total Score: {total_score} points")
 
 
+def game_phase(bag_size: int) -> str:
+    """
+    Phase of the game given the number of letters left in the bag
+    :param bag_size:
+    :return: "early", "mid" or "end" (the bag is empty)
+    """
+    if bag_size == 0:
+        return "end"
+    if bag_size >= 50:
+        return "early"
+    return "mid"
+
+
+def print_latency_statistics(game_histories: List[td.GameHistory]) -> None:
+    """
+    Print the distribution of the time taken by each strategy to find its moves,
+    per phase of the game. Only the moves recorded with their statistics are used.
+
+    Args:
+        game_histories: List of GameHistory objects, one for each completed game
+    """
+    # strategy -> phase -> statistics of the moves
+    moves_stats: Dict[str, Dict[str, List[td.MoveStats]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for history in game_histories:
+        for plays in history["history"]:
+            for player_id, move in plays.items():
+                if "stats" not in move:
+                    continue
+                strategy = player_id.split("/")[1]
+                moves_stats[strategy][game_phase(move["stats"]["bag_size"])].append(
+                    move["stats"]
+                )
+    if not moves_stats:
+        return
+
+    print("\nMove Latency:")
+    print("=" * 40)
+    for strategy, phases in sorted(moves_stats.items()):
+        print(f"\nStrategy {strategy}:")
+        print("-" * 20)
+        for phase in ["early", "mid", "end"]:
+            if phase not in phases:
+                continue
+            stats = phases[phase]
+            wall_times = [move_stats["wall_time"] for move_stats in stats]
+            cpu_times = [move_stats["cpu_time"] for move_stats in stats]
+            print(
+                f"{phase:>5}: {len(stats)} moves, "
+                f"wall p50 {percentile(wall_times, 50):.3f}s "
+                f"p90 {percentile(wall_times, 90):.3f}s "
+                f"p99 {percentile(wall_times, 99):.3f}s "
+                f"max {max(wall_times):.3f}s, "
+                f"cpu mean {sum(cpu_times) / len(cpu_times):.3f}s, "
+                f"candidates {sum(s['candidates_generated'] for s in stats) / len(stats):.0f} "
+                f"generated / {sum(s['candidates_validated'] for s in stats) / len(stats):.0f} "
+                f"validated, depth max {max(s['max_depth'] for s in stats)}"
+            )
+
+
 def analyze_multiple_games(game_histories: List[td.GameHistory]) -> None:
     """
     Analyze scores for multiple games and print summary statistics including win/tie/loss records.
@@ -99,6 +171,8 @@ def analyze_multiple_games(game_histories: List[td.GameHistory]) -> None:
             print(f"Player {player_id}: {player_score} points")
             player_aggregates[player_id.split("/")[1]].append(player_score)
         print(f"Total: {total_score} points")
+        if history.get("seed") is not None:
+            print(f"Seed: {history['seed']}")
         if len(winners) > 1:
             print(f"Result: Tie between Players {', '.join(winners)}")
         else:
@@ -123,34 +197,323 @@ def analyze_multiple_games(game_histories: List[td.GameHistory]) -> None:
         print(f"Highest Score: {max(scores)} points")
         print(f"Lowest Score: {min(scores)} points")
 
+    print_latency_statistics(game_histories)
+
 
-def play_computer_vs_computer_game() -> td.GameHistory:
-    player_1 = ComputerPlayer(NaiveBlindSearch())
-    player_2 = ComputerPlayer(NaiveSearch())
-    game_instance = Game([player_1, player_2])
+def play_computer_vs_computer_game(
+    seed: Optional[int] = None,
+    strategies: Tuple[str, str] = DEFAULT_STRATEGY_PAIR,
+    endgame_time_limit: Optional[float] = None,
+) -> td.GameHistory:
+    """
+    Play a game between two computer players
+
+    Args:
+        seed: seed of the game, replaying a seed replays the exact same game
+        strategies: codes of the strategies of the two players
+        endgame_time_limit: seconds of the endgame solver playing the moves once
+            the bag is empty, the strategies play them if None
+
+    Returns:
+        The history of the game
+    """
+    players: List[Player] = [
+        ComputerPlayer(
+            build_strategy(strategy_code),
+            (
+                EndgameSolver(endgame_time_limit)
+                if endgame_time_limit is not None
+                else None
+            ),
+        )
+        for strategy_code in strategies
+    ]
+    game_instance = Game(players, seed=seed, record_stats=True)
     game_instance.init_game()
     result = game_instance.play_game()
     return result
 
 
-def play_computer_vs_computer_game_thread(game_nb: int) -> td.GameHistory:
+# seconds between two stack samples of the games profiled by this worker, the games
+# are not profiled if None. Set by the initializer of the pool workers.
+_profile_interval: Optional[float] = None
+
+
+def play_computer_vs_computer_game_thread(
+    task: Tuple[int, Optional[int]],
+) -> Tuple[int, td.GameHistory, Optional[metrics.Snapshot], Optional[ProfileData]]:
+    """
+    Play one game of a batch in a pool worker
+    :param task: index of the game in the batch and seed of the run
+    :return: index of the game, its history, the metrics collected while playing
+        it (None if metrics are disabled) and its profile (None if the worker does
+        not profile)
+    """
+    game_nb, run_seed = task
+    seed = derive_seed(run_seed, game_nb) if run_seed is not None else None
     print_logger.info(
-        f"Starting game {game_nb} in thread {multiprocessing.current_process().pid}"
+        "Starting game %s (seed %s) in thread %s",
+        game_nb,
+        seed,
+        multiprocessing.current_process().pid,
     )
-    return play_computer_vs_computer_game()
+    if metrics.ENABLED:
+        metrics.reset()
+    profile = None
+    if _profile_interval is None:
+        history = play_computer_vs_computer_game(seed)
+    else:
+        history, profile = profile_call(
+            play_computer_vs_computer_game, seed, sampling_interval=_profile_interval
+        )
+    game_metrics = metrics.snapshot() if metrics.ENABLED else None
+    return game_nb, history, game_metrics, profile
 
 
-def run_multiple_games(num_games: int) -> List[td.GameHistory]:
-    with multiprocessing.Pool() as pool:
-        # Run the games in parallel using multiprocessing, with a progress bar
-        results = list(
-            tqdm(
-                pool.imap_unordered(
-                    play_computer_vs_computer_game_thread, range(num_games)
-                ),
-                total=num_games,
-                desc="Running games",
+def play_game_in_thread(
+    task: Tuple[int, Optional[int]],
+) -> Tuple[int, td.GameHistory, Optional[metrics.Snapshot], Optional[ProfileData]]:
+    """
+    Play one game of a batch in a thread of this process: the lexicon is shared
+    without copy and the metrics go straight to the registry of this process
+    :param task: index of the game in the batch and seed of the run
+    :return: same as play_computer_vs_computer_game_thread, without metrics nor
+        profile
+    """
+    game_nb, run_seed = task
+    seed = derive_seed(run_seed, game_nb) if run_seed is not None else None
+    return game_nb, play_computer_vs_computer_game(seed), None, None
+
+
+def _init_game_worker(
+    collect_metrics: bool = False,
+    profile_interval: Optional[float] = None,
+    log_queue: Optional[multiprocessing.Queue] = None,
+) -> None:
+    """
+    Initializer of the pool workers: make the lexicon, the letter tables and the base
+    bag ready once per worker instead of once per game. Forked workers inherit them
+    from the parent, spawned workers build them here.
+    :param collect_metrics: enable the metrics in the worker
+    :param profile_interval: profile every game of the worker, sampling its stack at
+        this interval in seconds, no profiling if None
+    :param log_queue: send the logs of the worker to the parent through this queue,
+        see logger_config
+    """
+    if log_queue is not None:
+        configure_worker_logging(log_queue)
+    global _profile_interval
+    _profile_interval = profile_interval
+    if collect_metrics:
+        metrics.enable()
+    # imported here so that the cost is paid in the worker, not by whoever imports
+    # this module
+    from src.engine.grid import LETTER_VALUES
+    from src.engine.tree import BASE_TREE
+    from src.game.bag import BASE_BAG
+
+    logger.debug(
+        "Worker %s ready: %s letters, %s tiles, lexicon root with %s children",
+        multiprocessing.current_process().pid,
+        len(LETTER_VALUES),
+        len(BASE_BAG),
+        len(BASE_TREE.root.children),
+    )
+
+
+class GamePool:
+    """
+    Long lived pool of game workers, reused by successive batches of games so that
+    the worker startup and the lexicon are paid once per worker instead of once per
+    batch.
+
+    :param processes: number of workers, the number of cores if None
+    :param chunksize: number of games sent to a worker at once, larger chunks lower
+        the scheduling overhead of short games but balance the load less evenly
+    :param games_per_worker: replace a worker after it played about this many games
+        to bound the memory growth of long runs, never if None
+    :param collect_metrics: collect the metrics in the workers and merge them in the
+        metrics of this process, by default if metrics are enabled in this process
+    :param profile: profile every game with cProfile and a stack sampler, the
+        profiles of the workers are merged in profile_report
+    :param sampling_interval: seconds between two stack samples when profiling
+    :param threads: play the games in threads of this process instead of worker
+        processes, which only scales on a free-threaded build of python (3.13t and
+        later). The games cannot be profiled and the workers are never replaced.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        *,
+        chunksize: int = 1,
+        games_per_worker: Optional[int] = None,
+        collect_metrics: Optional[bool] = None,
+        profile: bool = False,
+        sampling_interval: float = 0.005,
+        threads: bool = False,
+    ):
+        if threads and profile:
+            raise ValueError("Games played in threads cannot be profiled")
+        self.chunksize: int = chunksize
+        self.threads: bool = threads
+        self.profile_report: Optional[ProfileReport] = (
+            ProfileReport() if profile else None
+        )
+        self.collect_metrics: bool = (
+            collect_metrics if collect_metrics is not None else metrics.ENABLED
+        )
+        # the pool counts the tasks of a worker, a task being a chunk of games
+        max_tasks = (
+            max(1, games_per_worker // chunksize)
+            if games_per_worker is not None
+            else None
+        )
+        if threads:
+            # the threads update the metrics of this process themselves
+            if self.collect_metrics:
+                metrics.enable()
+            self._pool: multiprocessing.pool.Pool = multiprocessing.pool.ThreadPool(
+                processes
             )
+            return
+        # keep the objects built at import (the lexicon mostly) out of the garbage
+        # collector so that forked workers do not copy their pages by scanning them
+        gc.freeze()
+        self._pool = multiprocessing.Pool(
+            processes,
+            initializer=_init_game_worker,
+            initargs=(
+                self.collect_metrics,
+                sampling_interval if profile else None,
+                worker_log_queue(),
+            ),
+            maxtasksperchild=max_tasks,
         )
 
+    def __enter__(self) -> "GamePool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def run(
+        self,
+        num_games: int,
+        seed: Optional[int] = None,
+        *,
+        journal_path: Optional[str] = None,
+        resume: bool = False,
+        progress: bool = True,
+    ) -> List[td.GameHistory]:
+        """
+        Play a batch of games on the workers of the pool, see run_multiple_games
+        """
+        journal = GameJournal(journal_path, seed) if journal_path is not None else None
+        if journal is not None:
+            journal.open(resume=resume)
+        try:
+            results = (
+                [
+                    history
+                    for game_nb, history in journal.completed.items()
+                    if game_nb < num_games
+                ]
+                if journal is not None
+                else []
+            )
+            tasks = [
+                (game_nb, seed)
+                for game_nb in range(num_games)
+                if journal is None or not journal.is_completed(game_nb)
+            ]
+            if journal is not None and len(tasks) < num_games:
+                print_logger.warning(
+                    f"Resuming {journal.path}: {num_games - len(tasks)} games already played"
+                )
+            # Run the games in parallel using multiprocessing, with a progress bar
+            for game_nb, history, game_metrics, profile in tqdm(
+                self._pool.imap_unordered(
+                    (
+                        play_game_in_thread
+                        if self.threads
+                        else play_computer_vs_computer_game_thread
+                    ),
+                    tasks,
+                    chunksize=self.chunksize,
+                ),
+                total=len(tasks),
+                desc="Running games",
+                disable=not progress,
+            ):
+                if journal is not None:
+                    journal.record(game_nb, history)
+                if game_metrics is not None:
+                    metrics.merge(game_metrics)
+                if profile is not None and self.profile_report is not None:
+                    self.profile_report.add(profile)
+                results.append(history)
+        finally:
+            if journal is not None:
+                journal.close()
+
+        return results
+
+
+def run_multiple_games(
+    num_games: int,
+    seed: Optional[int] = None,
+    *,
+    journal_path: Optional[str] = None,
+    resume: bool = False,
+    pool: Optional[GamePool] = None,
+    progress: bool = True,
+    profile_dir: Optional[str] = None,
+) -> List[td.GameHistory]:
+    """
+    Run games in parallel on all the cores of the machine
+
+    Args:
+        num_games: number of games to play
+        seed: seed of the run, the seed of each game is derived from it and the game
+            index so that the same run seed gives the same games whatever the worker
+            that plays them. None for unseeded games
+        journal_path: if set, every completed game is appended to this journal as
+            soon as it is done
+        resume: skip the games already recorded in the journal instead of refusing
+            to overwrite it
+        pool: warm pool to play the games on, a pool is created for this batch only
+            if None
+        progress: display a progress bar of the batch
+        profile_dir: if set, profile the games in the workers and write the merged
+            report in this directory (the profiling of a warm pool is chosen when
+            the pool is created)
+
+    Returns:
+        The histories of the games, the resumed ones first then in completion order
+    """
+    if pool is not None:
+        results = pool.run(
+            num_games,
+            seed,
+            journal_path=journal_path,
+            resume=resume,
+            progress=progress,
+        )
+    else:
+        pool = GamePool(profile=profile_dir is not None)
+        with pool:
+            results = pool.run(
+                num_games,
+                seed,
+                journal_path=journal_path,
+                resume=resume,
+                progress=progress,
+            )
+    if profile_dir is not None and pool.profile_report is not None:
+        pool.profile_report.write(profile_dir)
     return results
@@ -1,23 +1,74 @@
-import random
+import argparse
 
 from src.game.game import Game
+from src.game.observer import ConsoleObserver
 from src.game.player import ComputerPlayer
-from src.game_thread import analyze_multiple_games, run_multiple_games
+from src.game_thread import GamePool, analyze_multiple_games
 from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils import metrics
 from src.utils.typing import typed_dict as td
 
 
 def play_player_vs_computer_game() -> td.GameHistory:
     player_1 = ComputerPlayer(NaiveSearch())
     player_2 = ComputerPlayer(NaiveSearch())
-    game_instance = Game([player_1, player_2])
+    game_instance = Game([player_1, player_2], observer=ConsoleObserver())
     game_instance.init_game()
     result = game_instance.play_game()
     return result
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run scrabble games between computers")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the run")
+    parser.add_argument(
+        "--journal", default=None, help="journal file recording the completed games"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the games already recorded in the journal",
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=1, help="games sent to a worker at once"
+    )
+    parser.add_argument(
+        "--games-per-worker",
+        type=int,
+        default=None,
+        help="replace a worker after this many games to bound its memory",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="collect and print the hot path counters and latencies",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help="profile the games in the workers and write the merged report in DIR",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    _a = 0
-    #random.seed(42)
-    analyze_multiple_games(run_multiple_games(100))
+    args = _parse_args()
+    if args.metrics:
+        metrics.enable()
+    with GamePool(
+        chunksize=args.chunksize,
+        games_per_worker=args.games_per_worker,
+        profile=args.profile is not None,
+    ) as pool:
+        histories = pool.run(
+            args.games, args.seed, journal_path=args.journal, resume=args.resume
+        )
+    analyze_multiple_games(histories)
+    if args.metrics:
+        print(metrics.report())
+    if pool.profile_report is not None:
+        pool.profile_report.write(args.profile)
+        print(f"Profile written to {args.profile}")
     # play_player_vs_computer_game()
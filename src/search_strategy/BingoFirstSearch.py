@@ -0,0 +1,161 @@
+from typing import Iterator, List, Optional, Tuple
+
+from src.engine.anagram import AnagramIndex, default_anagram_index
+from src.engine.grid import Grid
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import enum, typed_dict as td
+
+BINGO_TILES = 7
+
+Start = Tuple[Tuple[int, int], enum.Direction]
+
+
+def _cells(
+    start: Tuple[int, int], direction: enum.Direction, length: int
+) -> List[Tuple[int, int]]:
+    row, col = start
+    if direction == enum.Direction.HORIZONTAL:
+        return [(row, col + step) for step in range(length)]
+    return [(row + step, col) for step in range(length)]
+
+
+def _is_free_after(
+    grid: Grid, cell: Tuple[int, int], direction: enum.Direction
+) -> bool:
+    """
+    No letter on the line after the cell: NaiveSearch only generates the words
+    covering every letter after their start
+    """
+    row, col = cell
+    if direction == enum.Direction.HORIZONTAL:
+        return all(grid[row, after] == "" for after in range(col + 1, 15))
+    return all(grid[after, col] == "" for after in range(row + 1, 15))
+
+
+class BingoFirstSearch(NaiveSearch):
+    """
+    BingoFirstSearch looks for the bingos of a full rack first: the words of the 7
+    letters of the rack, alone or through one letter of the board, come from the
+    anagram index (see src/engine/anagram.py) in one lookup and only their
+    placements are checked, the same placements NaiveSearch generates. A bingo
+    scores the 50 points bonus on top of its word, which the other moves rarely
+    beat: the best bingo is played without searching the other moves. Without a
+    bingo the moves are searched like NaiveSearch.
+
+    :param anagram_index: index of the lexicon of BASE_TREE, the default one if None
+    """
+
+    def __init__(self, anagram_index: Optional[AnagramIndex] = None):
+        super().__init__()
+        self.strategy_code = "bingo"
+        self._anagram_index: Optional[AnagramIndex] = anagram_index
+
+    @property
+    def anagram_index(self) -> AnagramIndex:
+        # built on first use, it takes about a second
+        if self._anagram_index is None:
+            self._anagram_index = default_anagram_index()
+        return self._anagram_index
+
+    @staticmethod
+    def _free_starts(grid: Grid, length: int) -> Iterator[Start]:
+        """Starts of the words of a length laid on empty cells only"""
+        for direction in [enum.Direction.HORIZONTAL, enum.Direction.VERTICAL]:
+            for row in range(15):
+                for col in range(15):
+                    cells = _cells((row, col), direction, length)
+                    if (
+                        max(cells[-1]) <= 14
+                        and all(grid[cell] == "" for cell in cells)
+                        and _is_free_after(grid, cells[-1], direction)
+                    ):
+                        yield (row, col), direction
+
+    @staticmethod
+    def _starts_through(grid: Grid, word: str, row: int, col: int) -> Iterator[Start]:
+        """Starts of a word going through the letter of a cell, on empty cells else"""
+        for index, letter in enumerate(word):
+            if letter != grid[row, col]:
+                continue
+            for direction, start in (
+                (enum.Direction.HORIZONTAL, (row, col - index)),
+                (enum.Direction.VERTICAL, (row - index, col)),
+            ):
+                cells = _cells(start, direction, len(word))
+                if min(cells[0]) < 0 or max(cells[-1]) > 14:
+                    continue
+                if all(
+                    grid[cell] == "" for cell in cells if cell != (row, col)
+                ) and _is_free_after(grid, cells[-1], direction):
+                    yield start, direction
+
+    def bingo_moves(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> List[td.Move]:
+        """
+        Moves playing the 7 letters of the rack
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :return: the moves, the words alone first then through the letters of the
+            board row by row
+        """
+        if len(rack) != BINGO_TILES:
+            return []
+        grid = word_placer_checker.grid
+        candidates: List[Tuple[str, Start]] = []
+        words = self.anagram_index.anagrams(rack)
+        if words:
+            free_starts = list(self._free_starts(grid, BINGO_TILES))
+            candidates += [(word, start) for word in words for start in free_starts]
+        for row, col in zip(*(grid.grid != "").nonzero()):
+            row, col = int(row), int(col)
+            for word in self.anagram_index.anagrams(rack + [str(grid[row, col])]):
+                candidates += [
+                    (word, start)
+                    for start in self._starts_through(grid, word, row, col)
+                ]
+        self.search_stats["candidates_generated"] += len(candidates)
+
+        moves: List[td.Move] = []
+        for word, (start_position, direction) in candidates:
+            result = word_placer_checker.is_word_placable(
+                word, start_position, direction
+            )
+            if result["state"]:
+                moves.append(
+                    self._make_move(
+                        rack, word, start_position, direction, result, score_grid
+                    )
+                )
+        return moves
+
+    def find_best_word(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> td.ValidWord:
+        # the index holds the words of BASE_TREE only
+        if word_placer_checker.tree is BASE_TREE:
+            self._reset_search_stats()
+            best_move: Optional[td.Move] = None
+            best_value = 0.0
+            for move in self.bingo_moves(rack, word_placer_checker, score_grid):
+                value = self.evaluate_move(move)
+                if move["score"] > 0 and (best_move is None or value > best_value):
+                    best_move = move
+                    best_value = value
+            if best_move is not None:
+                if metrics.ENABLED:
+                    metrics.incr("strategy.bingo.hits")
+                logger.debug(
+                    "Best bingo: %s with value %s", best_move["play"], best_value
+                )
+                return td.ValidWord(
+                    play=best_move["play"],
+                    letter_used=best_move["letter_used"],
+                    score=best_move["score"],
+                )
+        return super().find_best_word(rack, word_placer_checker, score_grid)
@@ -0,0 +1,371 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.engine import zobrist
+from src.engine.grid import CellChange, Grid, consume_premiums
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.WordSearchStrategy import WordSearchStrategy
+from src.settings import settings
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+# bounds of a transposition table entry
+EXACT = 0
+LOWER = 1
+UPPER = 2
+# depth of the entries searched until the end of the game, valid at any depth
+SOLVED = 1_000_000
+
+# racks of the player to move and of the other player, sorted
+RacksKey = Tuple[Tuple[str, ...], Tuple[str, ...]]
+# turns skipped by the player to move and by the other player
+Skips = Tuple[int, int]
+# changes of the board and of the premiums, racks, skipped turns and start of a round
+# before a move
+_Undo = Tuple[List[CellChange], List[CellChange], RacksKey, Skips, bool]
+
+
+class _Timeout(Exception):
+    """The time limit of the solver ran out in the middle of an iteration"""
+
+
+def _remove_letters(rack: Tuple[str, ...], letter_used: List[str]) -> Tuple[str, ...]:
+    remaining = list(rack)
+    for letter in letter_used:
+        remaining.remove(letter if letter in remaining else "*")
+    return tuple(remaining)
+
+
+class _Position:
+    """
+    The position of the endgame, from the view of the player to move. The moves are
+    played on it and undone in place, the board and the premiums are never copied.
+
+    :param board: letters of the board
+    :param premiums: premiums left on the board
+    :param racks: rack of the player to move then rack of the other player
+    :param skips: turns skipped so far by the player to move and by the other player
+    :param first: the player to move plays first in a round of the game
+    """
+
+    __slots__ = ("board", "premiums", "racks", "skips", "first")
+
+    def __init__(
+        self, board: Grid, premiums: Grid, racks: RacksKey, skips: Skips, first: bool
+    ) -> None:
+        self.board: Grid = board
+        self.premiums: Grid = premiums
+        self.racks: RacksKey = racks
+        self.skips: Skips = skips
+        self.first: bool = first
+
+    @property
+    def key(self) -> int:
+        return (
+            self.board.hash
+            ^ zobrist.rack_hash(self.racks[0], 0)
+            ^ zobrist.rack_hash(self.racks[1], 1)
+            ^ zobrist.SKIP_KEYS[0][self.skips[0]]
+            ^ zobrist.SKIP_KEYS[1][self.skips[1]]
+            ^ (zobrist.ROUND_START_KEY if self.first else 0)
+        )
+
+    def is_over(self) -> bool:
+        """
+        The game is over, checked before the first player of a round like
+        Game.play_game: both racks are empty or a player skipped too many turns
+        """
+        return self.first and (
+            not (self.racks[0] or self.racks[1])
+            or max(self.skips) >= settings.MAX_SKIPPED_TURNS
+        )
+
+    def play(self, move: td.Move) -> _Undo:
+        undo = (
+            self.board.apply_move(move["play"]),
+            consume_premiums(self.premiums, move["play"]),
+            self.racks,
+            self.skips,
+            self.first,
+        )
+        rack = _remove_letters(self.racks[0], move["letter_used"])
+        self.racks = (self.racks[1], rack)
+        self.skips = (self.skips[1], self.skips[0])
+        self.first = not self.first
+        return undo
+
+    def pass_turn(self) -> _Undo:
+        """The player to move skips its turn, with the bag empty it keeps its rack"""
+        undo: _Undo = ([], [], self.racks, self.skips, self.first)
+        self.racks = (self.racks[1], self.racks[0])
+        self.skips = (self.skips[1], self.skips[0] + 1)
+        self.first = not self.first
+        return undo
+
+    def undo(self, undo: _Undo) -> None:
+        board_changes, premium_changes, self.racks, self.skips, self.first = undo
+        self.board.undo_move(board_changes)
+        self.premiums.undo_move(premium_changes)
+
+
+class EndgameSolver:
+    """
+    EndgameSolver finds the best move once the bag is empty: both racks are known and
+    the game has perfect information.
+
+    It runs a negamax alpha-beta search over the moves of the move generator, the
+    value of a position being the points the player to move scores until the end of
+    the game minus the points of the other player. The game ends like Game.play_game
+    ends it: before the first player of a round, once both racks are empty or a player
+    skipped settings.MAX_SKIPPED_TURNS turns in the game. A player only passes when no
+    move scores (always with an empty rack) and keeps its rack. The search is deepened one ply at a time (iterative deepening), the moves
+    are tried best first (the move of the transposition table then by decreasing
+    score) and the positions already searched are kept in a transposition table.
+
+    When the time limit runs out the best move of the last completed depth is played,
+    the best scoring move if not even the first depth completed.
+
+    :param time_limit: seconds of a solve
+    :param move_generator: strategy generating the moves, NaiveSearch if None
+    :param max_depth: plies searched at most, None to search until the end
+    """
+
+    def __init__(
+        self,
+        time_limit: float = 10.0,
+        move_generator: Optional[WordSearchStrategy] = None,
+        max_depth: Optional[int] = None,
+    ):
+        self.time_limit: float = time_limit
+        self.move_generator: WordSearchStrategy = (
+            move_generator if move_generator is not None else NaiveSearch()
+        )
+        self.max_depth: Optional[int] = max_depth
+        self._deadline: float = 0.0
+        self._checker: Optional[WordPlacerChecker] = None
+        # moves of each board and rack, best scoring first
+        self._moves: Dict[Tuple[int, Tuple[str, ...]], List[td.Move]] = {}
+        # key of a position: depth (SOLVED if no leaf was cut by the depth limit),
+        # value, bound, index of the best move
+        self._table: Dict[int, Tuple[int, int, int, int]] = {}
+        # a leaf of the current subtree was cut by the depth limit
+        self._cut: bool = False
+        # report of the last solve
+        self.nodes: int = 0
+        self.depth_reached: int = 0
+        self.exact: bool = False
+        self.value: Optional[int] = None
+        self.principal_variation: List[td.ValidWord] = []
+
+    def _position_moves(self, position: _Position) -> List[td.Move]:
+        rack = position.racks[0]
+        key = (position.board.hash, rack)
+        if key not in self._moves:
+            assert self._checker is not None
+            checker = WordPlacerChecker(position.board, self._checker.tree)
+            moves = [
+                move
+                for move in self.move_generator.generate_moves(
+                    list(rack), checker, position.premiums
+                )
+                if move["score"] > 0
+            ]
+            # stable sort, the first generated first for a same score
+            moves.sort(key=lambda move: move["score"], reverse=True)
+            self._moves[key] = moves
+        return self._moves[key]
+
+    def _negamax(self, position: _Position, depth: int, alpha: int, beta: int) -> int:
+        """
+        Value of the position searched depth plies deep, exact inside ]alpha, beta[,
+        an upper bound below and a lower bound above
+        """
+        self.nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _Timeout()
+        if position.is_over():
+            return 0
+        if depth == 0:
+            self._cut = True
+            return 0
+
+        key = position.key
+        best_index = 0
+        entry = self._table.get(key)
+        if entry is not None:
+            entry_depth, entry_value, bound, best_index = entry
+            if entry_depth >= depth and (
+                bound == EXACT
+                or (bound == LOWER and entry_value >= beta)
+                or (bound == UPPER and entry_value <= alpha)
+            ):
+                self._cut = self._cut or entry_depth != SOLVED
+                return entry_value
+
+        outer_cut = self._cut
+        self._cut = False
+        moves = self._position_moves(position)
+        if not moves:
+            undo = position.pass_turn()
+            try:
+                best_value = -self._negamax(position, depth - 1, -beta, -alpha)
+            finally:
+                position.undo(undo)
+        else:
+            # the best move of a previous search first, then by decreasing score
+            order = list(range(len(moves)))
+            if 0 < best_index < len(moves):
+                order.remove(best_index)
+                order.insert(0, best_index)
+            best_value = -SOLVED
+            low = alpha
+            for index in order:
+                score = moves[index]["score"]
+                undo = position.play(moves[index])
+                try:
+                    value = score - self._negamax(
+                        position, depth - 1, score - beta, score - low
+                    )
+                finally:
+                    position.undo(undo)
+                if value > best_value:
+                    best_value = value
+                    best_index = index
+                low = max(low, value)
+                if low >= beta:
+                    break
+
+        if best_value <= alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self._table[key] = (
+            depth if self._cut else SOLVED,
+            best_value,
+            bound,
+            best_index,
+        )
+        self._cut = self._cut or outer_cut
+        return best_value
+
+    def _principal_variation(self, position: _Position) -> List[td.ValidWord]:
+        """Moves of the transposition table from the position, while they are known"""
+        line: List[td.ValidWord] = []
+        undos: List[_Undo] = []
+        seen = set()
+        while position.key in self._table and position.key not in seen:
+            seen.add(position.key)
+            if position.is_over():
+                break
+            moves = self._moves.get((position.board.hash, position.racks[0]))
+            if moves is None:
+                break
+            if not moves:
+                line.append(
+                    td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+                )
+                undos.append(position.pass_turn())
+                continue
+            move = moves[self._table[position.key][3]]
+            line.append(
+                td.ValidWord(
+                    play=move["play"],
+                    letter_used=move["letter_used"],
+                    score=move["score"],
+                )
+            )
+            undos.append(position.play(move))
+        for undo in reversed(undos):
+            position.undo(undo)
+        return line
+
+    def solve(
+        self,
+        rack: List[str],
+        opponent_rack: List[str],
+        word_placer_checker: WordPlacerChecker,
+        score_grid: Grid,
+        skipped_turns: Skips = (0, 0),
+        first_to_play: bool = True,
+    ) -> td.ValidWord:
+        """
+        Best move of the player once the bag is empty
+        :param rack: rack of the player
+        :param opponent_rack: rack of the other player, known since the bag is empty
+        :param word_placer_checker:
+        :param score_grid:
+        :param skipped_turns: turns skipped so far by the player and by the other
+            player
+        :param first_to_play: the player plays first in a round of the game
+        :return: the first move of the best line found
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit
+        self._checker = word_placer_checker
+        self._moves = {}
+        self._table = {}
+        self.nodes = 0
+        self.depth_reached = 0
+        self.exact = False
+        self.value = None
+        self.principal_variation = []
+
+        root = _Position(
+            word_placer_checker.grid.copy(),
+            score_grid.copy(),
+            (tuple(sorted(rack)), tuple(sorted(opponent_rack))),
+            skipped_turns,
+            first_to_play,
+        )
+        moves = self._position_moves(root)
+        if not moves:
+            return td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+
+        # every ply plays a letter or skips a turn
+        max_depth = (
+            len(rack)
+            + len(opponent_rack)
+            + 2 * settings.MAX_SKIPPED_TURNS
+            - sum(skipped_turns)
+        )
+        if self.max_depth is not None:
+            max_depth = min(max_depth, self.max_depth)
+        try:
+            for depth in range(1, max_depth + 1):
+                self._cut = False
+                self.value = self._negamax(root, depth, -SOLVED, SOLVED)
+                self.depth_reached = depth
+                if not self._cut:
+                    self.exact = True
+                    break
+        except _Timeout:
+            pass
+
+        if self.depth_reached == 0:
+            best_move = moves[0]
+        else:
+            best_move = moves[self._table[root.key][3]]
+            self.principal_variation = self._principal_variation(root)
+        elapsed = time.perf_counter() - start
+        if metrics.ENABLED:
+            metrics.incr("strategy.endgame.nodes", self.nodes)
+            metrics.observe("strategy.endgame.solve", elapsed)
+        logger.info(
+            "Endgame: depth %s%s, value %s, %s nodes in %.2fs, best word %s",
+            self.depth_reached,
+            " (exact)" if self.exact else "",
+            self.value,
+            self.nodes,
+            elapsed,
+            best_move["play"],
+        )
+        return td.ValidWord(
+            play=best_move["play"],
+            letter_used=best_move["letter_used"],
+            score=best_move["score"],
+        )
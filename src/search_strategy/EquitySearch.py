@@ -0,0 +1,29 @@
+from typing import Optional
+
+from src.engine.leave import LeaveTable, default_leave_table
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils.typing import typed_dict as td
+
+
+class EquitySearch(NaiveSearch):
+    """
+    EquitySearch generates the same moves as NaiveSearch but plays the move of best
+    equity: its score plus the value of the letters it keeps on the rack, read from
+    a leave table fitted on self-play games (see src/engine/leave.py).
+
+    :param leave_table: value of the leaves, the table of the settings if None
+    :param leave_weight: weight of the leave value against the score
+    """
+
+    def __init__(
+        self, leave_table: Optional[LeaveTable] = None, leave_weight: float = 1.0
+    ):
+        super().__init__()
+        self.strategy_code = "equity"
+        self.leave_table: LeaveTable = (
+            leave_table if leave_table is not None else default_leave_table()
+        )
+        self.leave_weight: float = leave_weight
+
+    def evaluate_move(self, move: td.Move) -> float:
+        return move["score"] + self.leave_weight * self.leave_table.value(move["leave"])
@@ -0,0 +1,264 @@
+import math
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.engine import zobrist
+from src.engine.grid import Grid, consume_premiums
+from src.engine.tree import BASE_TREE, Tree
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+# word, start position and direction of a move
+MoveKey = Tuple[str, tuple, str]
+
+
+def _move_key(play: td.PlaceWord) -> MoveKey:
+    return play["word"], tuple(play["start_position"]), play["direction"].value
+
+
+def position_key(board: Grid, to_move: int) -> int:
+    """
+    Key of a position in the node storage: the Zobrist hash of the board and of the
+    player to move (0 for the searching player)
+    :param board:
+    :param to_move:
+    :return:
+    """
+    return board.hash ^ zobrist.SEAT_KEYS[to_move]
+
+
+class MctsEdge:
+    """Statistics of a move from a node, the value is from the searching player view"""
+
+    __slots__ = ("move", "child_key", "visits", "total")
+
+    def __init__(self, move: td.Move, child_key: int):
+        self.move: td.Move = move
+        self.child_key: int = child_key
+        self.visits: int = 0
+        self.total: float = 0.0
+
+
+class MctsNode:
+    """
+    A position of the search tree, shared by all the paths leading to it
+
+    :param board: letters of the board
+    :param premiums: premiums left on the board
+    :param to_move: 0 if the searching player is to move, 1 for the opponent
+    """
+
+    __slots__ = ("board", "premiums", "to_move", "visits", "edges", "moves")
+
+    def __init__(self, board: Grid, premiums: Grid, to_move: int):
+        self.board: Grid = board
+        self.premiums: Grid = premiums
+        self.to_move: int = to_move
+        self.visits: int = 0
+        self.edges: Dict[MoveKey, MctsEdge] = {}
+        # best moves of each rack played from this position, by decreasing score
+        self.moves: Dict[Tuple[str, ...], List[td.Move]] = {}
+
+
+class MctsSearch(NaiveSearch):
+    """
+    MctsSearch runs a Monte Carlo Tree Search over the moves of NaiveSearch.
+
+    Each iteration samples the opponent rack and the draws from the unseen letters,
+    walks down the tree with UCB1 and progressive widening (a node with n visits
+    considers the ceil(widening * sqrt(n)) best scoring of its top_k moves), adds one
+    position and backs up the points of the searching player minus the points of
+    the opponent along the path.
+
+    Nodes are stored by position key, so that the paths reaching the same position
+    share it. The tree is kept from one turn to the next: the subtree of the position
+    reached after the opponent move is kept, the rest is dropped.
+
+    :param iterations: iterations per move at most, None for no limit
+    :param time_budget: seconds per move at most, None for no limit
+    :param top_k: moves of a position the search can consider
+    :param widening: number of moves considered at the first visit of a position
+    :param exploration: UCB1 exploration constant, in points
+    :param max_depth: plies of an iteration
+    :param rack_size: size of the racks refilled during the iterations
+    """
+
+    def __init__(
+        self,
+        iterations: Optional[int] = None,
+        time_budget: Optional[float] = 5.0,
+        top_k: int = 10,
+        widening: float = 2.0,
+        exploration: float = 10.0,
+        max_depth: int = 2,
+        rack_size: int = 7,
+    ):
+        if iterations is None and time_budget is None:
+            raise ValueError("MctsSearch needs an iteration or a time budget")
+        super().__init__()
+        self.strategy_code = "mcts"
+        self.iterations: Optional[int] = iterations
+        self.time_budget: Optional[float] = time_budget
+        self.top_k: int = top_k
+        self.widening: float = widening
+        self.exploration: float = exploration
+        self.max_depth: int = max_depth
+        self.rack_size: int = rack_size
+        # lexicon of the game, taken from the word placer checker
+        self.tree: Tree = BASE_TREE
+        self.nodes: Dict[int, MctsNode] = {}
+        # report of the last move
+        self.iterations_done: int = 0
+        self.iterations_per_second: float = 0.0
+        self.reused_nodes: int = 0
+
+    def _node_moves(self, node: MctsNode, rack: List[str]) -> List[td.Move]:
+        rack_key = tuple(sorted(rack))
+        if rack_key not in node.moves:
+            checker = WordPlacerChecker(node.board.copy(), self.tree)
+            node.moves[rack_key] = [
+                move
+                for move in self.generate_moves(
+                    rack, checker, node.premiums, k=self.top_k
+                )
+                if move["score"] > 0
+            ]
+        return node.moves[rack_key]
+
+    def _edge(self, node: MctsNode, move: td.Move) -> MctsEdge:
+        key = _move_key(move["play"])
+        edge = node.edges.get(key)
+        if edge is None:
+            board = node.board.copy()
+            board.place_word(**move["play"])
+            edge = node.edges[key] = MctsEdge(
+                move, position_key(board, 1 - node.to_move)
+            )
+            if edge.child_key not in self.nodes:
+                premiums = node.premiums.copy()
+                consume_premiums(premiums, move["play"])
+                self.nodes[edge.child_key] = MctsNode(board, premiums, 1 - node.to_move)
+        return edge
+
+    def _select(self, node: MctsNode, moves: List[td.Move]) -> MctsEdge:
+        allowed = moves[: max(1, math.ceil(self.widening * math.sqrt(node.visits)))]
+        sign = 1 if node.to_move == 0 else -1
+        best_edge = None
+        best_value = float("-inf")
+        for move in allowed:
+            edge = self._edge(node, move)
+            if edge.visits == 0:
+                return edge
+            value = sign * edge.total / edge.visits + self.exploration * math.sqrt(
+                math.log(node.visits) / edge.visits
+            )
+            if value > best_value:
+                best_edge = edge
+                best_value = value
+        assert best_edge is not None
+        return best_edge
+
+    def _iterate(self, root: MctsNode, rack: List[str], context: td.SearchContext):
+        bag = list(context["unseen"])
+        self.rng.shuffle(bag)
+        opponent_rack = [
+            bag.pop() for _ in range(min(context["opponent_rack_size"], len(bag)))
+        ]
+        racks = [list(rack), opponent_rack]
+
+        path: List[Tuple[MctsNode, MctsEdge]] = []
+        node = root
+        spread = 0
+        for _ in range(self.max_depth):
+            mover_rack = racks[node.to_move]
+            moves = self._node_moves(node, mover_rack)
+            if not moves:
+                break
+            visited = node.visits > 0
+            edge = self._select(node, moves)
+            path.append((node, edge))
+            spread += edge.move["score"] if node.to_move == 0 else -edge.move["score"]
+            for letter in edge.move["letter_used"]:
+                mover_rack.remove(letter if letter in mover_rack else "*")
+            while len(mover_rack) < self.rack_size and bag:
+                mover_rack.append(bag.pop())
+            node = self.nodes[edge.child_key]
+            if not visited:
+                # a new position ends the iteration
+                break
+        for parent, edge in path:
+            parent.visits += 1
+            edge.visits += 1
+            edge.total += spread
+
+    def _keep_subtree(self, root_key: int) -> None:
+        """Drop the nodes that cannot be reached from the root anymore"""
+        reachable: Set[int] = set()
+        stack = [root_key]
+        while stack:
+            key = stack.pop()
+            if key in reachable or key not in self.nodes:
+                continue
+            reachable.add(key)
+            stack.extend(edge.child_key for edge in self.nodes[key].edges.values())
+        self.nodes = {key: self.nodes[key] for key in reachable}
+
+    def find_best_word(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> td.ValidWord:
+        context = self.context
+        if context is None or not context["unseen"]:
+            return super().find_best_word(rack, word_placer_checker, score_grid)
+        self.tree = word_placer_checker.tree
+        board = word_placer_checker.grid
+        root_key = position_key(board, 0)
+        self.reused_nodes = 0
+        if root_key in self.nodes:
+            self._keep_subtree(root_key)
+            self.reused_nodes = len(self.nodes)
+        else:
+            self.nodes = {root_key: MctsNode(board.copy(), score_grid.copy(), 0)}
+        root = self.nodes[root_key]
+        root_moves = self._node_moves(root, rack)
+        if not root_moves:
+            return td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        self.iterations_done = 0
+        while (self.iterations is None or self.iterations_done < self.iterations) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            self._iterate(root, rack, context)
+            self.iterations_done += 1
+        elapsed = time.perf_counter() - start
+        self.iterations_per_second = self.iterations_done / elapsed if elapsed else 0.0
+        if metrics.ENABLED:
+            metrics.incr("strategy.mcts.iterations", self.iterations_done)
+            metrics.observe("strategy.mcts.search", elapsed)
+
+        # the most visited move of the rack, the best scoring one if none was visited
+        best_move = root_moves[0]
+        best_visits = 0
+        for move in root_moves:
+            edge = root.edges.get(_move_key(move["play"]))
+            if edge is not None and edge.visits > best_visits:
+                best_move = move
+                best_visits = edge.visits
+        logger.info(
+            "MCTS: %s iterations (%.1f/s), %s nodes (%s reused), best word %s",
+            self.iterations_done,
+            self.iterations_per_second,
+            len(self.nodes),
+            self.reused_nodes,
+            best_move["play"],
+        )
+        return td.ValidWord(
+            play=best_move["play"],
+            letter_used=best_move["letter_used"],
+            score=best_move["score"],
+        )
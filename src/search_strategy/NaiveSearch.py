@@ -1,12 +1,16 @@
-from collections import Counter
-from typing import List, Tuple, Dict
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict
 
-from src.engine.grid import Grid, compute_total_word_score
+from src.engine.grid import Grid
+from src.engine.opening_book import (
+    OpeningBook,
+    default_opening_book,
+    is_opening_position,
+)
+from src.engine.move_cache import LINE_CACHE_SIZE, LineMoveCache, LineMoves, line_key
 from src.engine.word_checker import WordPlacerChecker
 from src.search_strategy.WordSearchStrategy import WordSearchStrategy
-from src.settings.logger_config import logger
+from src.utils import metrics
 from src.utils.typing import typed_dict as td, enum
-from src.utils.typing.default import DEFAULT_PLACE_WORD
 
 
 class NaiveSearch(WordSearchStrategy):
@@ -14,11 +18,45 @@ class NaiveSearch(WordSearchStrategy):
     UltraNaiveSearch is a search strategy that finds the best word to play by
     checking all possible words that can be formed with the given rack and
     already placed words on the board to find the best word to play.
+
+    The moves of each line of the board are kept in a cache keyed by the state of the
+    line and the rack (see src/engine/move_cache.py): a search only generates the
+    moves of the lines changed since a previous search with the same rack.
+
+    On the empty board the best move is read from the opening book when it has the
+    rack (see src/engine/opening_book.py), the search is skipped. The book holds the
+    best scoring moves of the rack only: a strategy valuing the moves otherwise plays
+    the best of these.
+
+    :param line_cache_size: lines kept in the cache, 0 to generate every line
+    :param use_opening_book: read the first move from the book of the settings
     """
 
-    def __init__(self):
+    def __init__(
+        self, line_cache_size: int = LINE_CACHE_SIZE, use_opening_book: bool = True
+    ):
         super().__init__()
         self.strategy_code = "naive"
+        self.line_cache: Optional[LineMoveCache] = (
+            LineMoveCache(line_cache_size) if line_cache_size > 0 else None
+        )
+        self.opening_book: Optional[OpeningBook] = (
+            default_opening_book() if use_opening_book else None
+        )
+
+    def _candidate_moves(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> Iterable[td.Move]:
+        if self.opening_book is not None and is_opening_position(
+            word_placer_checker, score_grid
+        ):
+            moves = self.opening_book.moves(rack)
+            if moves is not None:
+                self._reset_search_stats()
+                if metrics.ENABLED:
+                    metrics.incr("strategy.opening_book.hits")
+                return moves
+        return super()._candidate_moves(rack, word_placer_checker, score_grid)
 
     @staticmethod
     def _get_already_place_letters(
@@ -44,66 +82,128 @@ class NaiveSearch(WordSearchStrategy):
                     already_place_letters[i - row] = str(grid[i, col])
         return already_place_letters
 
-    def find_best_word(
+    def _iter_position_moves(
+        self,
+        rack: List[str],
+        word_placer_checker: WordPlacerChecker,
+        score_grid: Grid,
+        start_position: Tuple[int, int],
+        direction: enum.Direction,
+    ) -> Iterator[td.Move]:
+        """
+        Moves of the rack starting at a position in a direction
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :param start_position:
+        :param direction:
+        :return:
+        """
+        constraint = self._get_already_place_letters(
+            word_placer_checker.grid, start_position, direction
+        )
+        new_rack = rack.copy()
+        new_rack += list(constraint.values())
+        possible_words = self._find_all_possible_word(
+            new_rack, word_placer_checker.tree, constraint
+        )
+        for word in possible_words:
+            result = word_placer_checker.is_word_placable(
+                word, start_position, direction
+            )
+            if result["state"]:
+                yield self._make_move(
+                    rack, word, start_position, direction, result, score_grid
+                )
+
+    def _line_moves(
+        self,
+        rack: List[str],
+        word_placer_checker: WordPlacerChecker,
+        score_grid: Grid,
+        direction: enum.Direction,
+        line: int,
+    ) -> LineMoves:
+        """
+        Moves of each start position of a line, in the order of the line
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :param direction:
+        :param line: row of a horizontal line, column of a vertical one
+        :return:
+        """
+        horizontal = direction == enum.Direction.HORIZONTAL
+        return [
+            list(
+                self._iter_position_moves(
+                    rack,
+                    word_placer_checker,
+                    score_grid,
+                    (line, step) if horizontal else (step, line),
+                    direction,
+                )
+            )
+            for step in range(15)
+        ]
+
+    def _cached_lines(
+        self,
+        rack: List[str],
+        word_placer_checker: WordPlacerChecker,
+        score_grid: Grid,
+        direction: enum.Direction,
+    ) -> List[LineMoves]:
+        """Moves of the 15 lines of a direction, from the cache when unchanged"""
+        cache = self.line_cache
+        assert cache is not None
+        cache.use_tree(word_placer_checker.tree)
+        board = word_placer_checker.grid.grid
+        premiums = score_grid.grid
+        if direction == enum.Direction.VERTICAL:
+            board, premiums = board.T, premiums.T
+        rows = board.tolist()
+        premium_rows = premiums.tolist()
+        is_empty = bool((board == "").all())
+        lines: List[LineMoves] = []
+        hits = 0
+        for line in range(15):
+            key = line_key(rows, premium_rows, direction, line, rack, is_empty)
+            moves = cache.get(key)
+            if moves is None:
+                moves = self._line_moves(
+                    rack, word_placer_checker, score_grid, direction, line
+                )
+                cache.put(key, moves)
+            else:
+                hits += 1
+            lines.append(moves)
+        if metrics.ENABLED:
+            metrics.incr("strategy.line_cache.hits", hits)
+            metrics.incr("strategy.line_cache.misses", 15 - hits)
+        return lines
+
+    def _iter_moves(
         self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
-    ) -> td.ValidWord:
-        max_score = 0
-        best_word: td.PlaceWord = DEFAULT_PLACE_WORD
-        letter_used = []
-        for direction in [enum.Direction.HORIZONTAL, enum.Direction.VERTICAL]:
-            for row in range(15):
-                for col in range(15):
-                    start_position = (row, col)
-                    constraint = self._get_already_place_letters(
-                        word_placer_checker.grid, start_position, direction
-                    )
-                    new_rack = rack.copy()
-                    new_rack += list(constraint.values())
-                    possible_words = self._find_all_possible_word(
-                        new_rack, word_placer_checker.tree, constraint
-                    )
-                    for word in possible_words:
-                        result = word_placer_checker.is_word_placable(
-                            word, start_position, direction
+    ) -> Iterator[td.Move]:
+        if self.line_cache is None:
+            for direction in [enum.Direction.HORIZONTAL, enum.Direction.VERTICAL]:
+                for row in range(15):
+                    for col in range(15):
+                        yield from self._iter_position_moves(
+                            rack, word_placer_checker, score_grid, (row, col), direction
                         )
-                        # for index, letter in result["letter_already_placed"].items():
-                        #    word = word[:index] + letter + word[index + 1 :]
-                        if result["state"]:
-                            score = compute_total_word_score(
-                                td.PlaceWord(
-                                    word=word,
-                                    start_position=(row, col),
-                                    direction=direction,
-                                ),
-                                result["perpendicular_words"],
-                                len(result["letter_already_placed"]),
-                                score_grid,
-                            )
-                            if score > max_score:
-                                max_score = score
-                                best_word = td.PlaceWord(
-                                    word=word,
-                                    start_position=(row, col),
-                                    direction=direction,
-                                )
-                                logger.info(
-                                    f"New best word: {best_word} with score {max_score}"
-                                )
-                                logger.info(f"constraint: {constraint}")
-                                logger.info(f"result: {result}")
-                                letter_used = list(
-                                    (
-                                        Counter(word)
-                                        - Counter(
-                                            list(
-                                                result["letter_already_placed"].values()
-                                            )
-                                        )
-                                    ).elements()
-                                )
-        logger.debug(f"Best word: {best_word}")
-        return {
-            "play": best_word,
-            "letter_used": letter_used,
-            "score": max_score,
-        }
+            return
+        # same order as without the cache: by direction, row then column
+        rows = self._cached_lines(
+            rack, word_placer_checker, score_grid, enum.Direction.HORIZONTAL
+        )
+        for row in range(15):
+            for col in range(15):
+                yield from rows[row][col]
+        columns = self._cached_lines(
+            rack, word_placer_checker, score_grid, enum.Direction.VERTICAL
+        )
+        for row in range(15):
+            for col in range(15):
+                yield from columns[col][row]
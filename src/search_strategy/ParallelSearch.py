@@ -0,0 +1,231 @@
+import copy
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.engine.grid import Grid
+from src.engine.opening_book import is_opening_position
+from src.engine.tree import BASE_TREE, Tree
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.WordSearchStrategy import WordSearchStrategy
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import enum, typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+DIRECTIONS = [enum.Direction.HORIZONTAL, enum.Direction.VERTICAL]
+
+# board, premiums, rack, index of the direction in DIRECTIONS, row of a horizontal
+# line or column of a vertical one
+LineTask = Tuple[np.ndarray, np.ndarray, List[str], int, int]
+# order of a move in the serial generation: direction, row, column, index of the
+# move among the moves of its start position
+MoveRank = Tuple[int, int, int, int]
+# value, rank and best move of a line, None if no move of the line scores
+LineBest = Optional[Tuple[float, MoveRank, td.Move]]
+
+# strategy of a worker process, inherited from the parent when the pool forks
+_worker_strategy: Optional[NaiveSearch] = None
+
+
+def _init_line_worker(strategy: NaiveSearch) -> None:
+    global _worker_strategy
+    _worker_strategy = strategy
+
+
+def best_line_move(task: LineTask) -> Tuple[LineBest, td.SearchStats]:
+    """
+    Best move of the strategy of the worker process on one line of the board
+    :param task: see LineTask
+    :return: see line_best_move
+    """
+    assert _worker_strategy is not None
+    return line_best_move(_worker_strategy, task, BASE_TREE)
+
+
+def line_best_move(
+    strategy: NaiveSearch, task: LineTask, tree: Tree
+) -> Tuple[LineBest, td.SearchStats]:
+    """
+    Best move of a strategy on one line of the board: its value, its rank in the
+    serial order (the first generated wins a tie) and the move. The strategy is only
+    read apart from its search stats, a thread gives it its own copy.
+    :param strategy:
+    :param task: see LineTask
+    :param tree: the lexicon
+    :return: the best move of the line and the search stats of the line
+    """
+    board, premiums, rack, direction_index, line = task
+    direction = DIRECTIONS[direction_index]
+    checker = WordPlacerChecker(Grid(board), tree)
+    score_grid = Grid(premiums)
+    strategy._reset_search_stats()
+
+    best: LineBest = None
+    for step in range(15):
+        row, col = (line, step) if direction_index == 0 else (step, line)
+        moves = strategy._iter_position_moves(
+            rack, checker, score_grid, (row, col), direction
+        )
+        for index, move in enumerate(moves):
+            if move["score"] <= 0:
+                continue
+            value = strategy.evaluate_move(move)
+            if best is None or value > best[0]:
+                best = (value, (direction_index, row, col, index), move)
+    return best, strategy.search_stats
+
+
+class ParallelSearch(WordSearchStrategy):
+    """
+    ParallelSearch plays the move of a NaiveSearch based strategy (NaiveSearch,
+    EquitySearch) with the 30 lines of the board (15 rows for the horizontal words,
+    15 columns for the vertical ones) searched in a pool of forked processes sharing
+    the lexicon. The best move of each line is merged in the serial order of
+    generation: the move played is the one the strategy plays alone.
+
+    The strategy is copied into the processes when the pool starts, a change of its
+    parameters afterwards is not seen by them. The search runs in this process when
+    asked to, when this process is a pool worker, when the lexicon is not the base
+    one or on the empty board when the strategy reads an opening book. The pool lives
+    until close, which the game calls once it is over.
+
+    With threads the lines are searched by threads of this process instead, on the
+    lexicon of the checker, without copying the board or the moves between processes.
+    The threads only scale on a free-threaded build of python (3.13t and later), on
+    other builds they take turns holding the GIL and play the same moves.
+
+    :param strategy: strategy generating and evaluating the moves, NaiveSearch if None
+    :param processes: processes (or threads) of the pool, the number of cores if
+        None, 1 to search in this process
+    :param threads: search the lines in a pool of threads instead of processes
+    """
+
+    def __init__(
+        self,
+        strategy: Optional[NaiveSearch] = None,
+        processes: Optional[int] = None,
+        threads: bool = False,
+    ):
+        super().__init__()
+        self.strategy: NaiveSearch = strategy if strategy is not None else NaiveSearch()
+        self.strategy_code = "parallel"
+        self.processes: Optional[int] = processes
+        self.threads: bool = threads
+        self._executor: Optional[Executor] = None
+
+    def _line_executor(
+        self, word_placer_checker: WordPlacerChecker
+    ) -> Optional[Executor]:
+        """Workers the lines are searched on, None to search them in this thread"""
+        if self.processes == 1:
+            return None
+        if self.threads:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.processes)
+            return self._executor
+        if (
+            multiprocessing.current_process().daemon
+            or word_placer_checker.tree is not BASE_TREE
+        ):
+            return None
+        if self._executor is None:
+            # forked so that the processes inherit the lexicon and the strategy
+            self._executor = ProcessPoolExecutor(
+                self.processes,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_line_worker,
+                initargs=(self.strategy,),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the workers of the pool, a later search starts new ones"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _iter_moves(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> Iterator[td.Move]:
+        return self.strategy._iter_moves(rack, word_placer_checker, score_grid)
+
+    def evaluate_move(self, move: td.Move) -> float:
+        return self.strategy.evaluate_move(move)
+
+    def find_best_word(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> td.ValidWord:
+        # the lines only search the moves, the book of the strategy is read by its
+        # own search
+        executor = (
+            None
+            if self.strategy.opening_book is not None
+            and is_opening_position(word_placer_checker, score_grid)
+            else self._line_executor(word_placer_checker)
+        )
+        if executor is None:
+            best_word = self.strategy.find_best_word(
+                rack, word_placer_checker, score_grid
+            )
+            self.search_stats = self.strategy.search_stats
+            return best_word
+
+        # the letters sorted like generate_moves, for the same order of generation
+        letters = sorted(rack)
+        tasks: List[LineTask] = [
+            (word_placer_checker.grid.grid, score_grid.grid, letters, direction, line)
+            for direction in range(len(DIRECTIONS))
+            for line in range(15)
+        ]
+        if self.threads:
+            # each line on its own copy of the strategy for its search stats, the
+            # lexicon is the one of the checker
+            results = executor.map(
+                lambda task: line_best_move(
+                    copy.copy(self.strategy), task, word_placer_checker.tree
+                ),
+                tasks,
+            )
+        else:
+            results = executor.map(best_line_move, tasks)
+        self._reset_search_stats()
+        best: LineBest = None
+        for line_best, line_stats in results:
+            self.search_stats["candidates_generated"] += line_stats[
+                "candidates_generated"
+            ]
+            self.search_stats["candidates_validated"] += line_stats[
+                "candidates_validated"
+            ]
+            self.search_stats["max_depth"] = max(
+                self.search_stats["max_depth"], line_stats["max_depth"]
+            )
+            if line_best is None:
+                continue
+            # the best value, the first in the serial order for a same value
+            if (
+                best is None
+                or line_best[0] > best[0]
+                or (line_best[0] == best[0] and line_best[1] < best[1])
+            ):
+                best = line_best
+        if metrics.ENABLED:
+            metrics.incr(
+                "strategy.candidates_generated",
+                self.search_stats["candidates_generated"],
+            )
+
+        if best is None:
+            logger.debug("Best word: %s", DEFAULT_PLACE_WORD)
+            return td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+        value, _, best_move = best
+        logger.debug("Best word: %s with value %s", best_move["play"], value)
+        return td.ValidWord(
+            play=best_move["play"],
+            letter_used=best_move["letter_used"],
+            score=best_move["score"],
+        )
@@ -0,0 +1,288 @@
+import atexit
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.engine.grid import Grid, consume_premiums
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.WordSearchStrategy import WordSearchStrategy
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+# candidate index, board, premiums, candidate, unseen letters, opponent rack size,
+# rack size, plies, seed, code of the rollout strategy
+RolloutTask = Tuple[
+    int, np.ndarray, np.ndarray, td.Move, List[str], int, int, int, int, str
+]
+
+# rollout strategies of this process, by code
+_rollout_strategies: Dict[str, WordSearchStrategy] = {}
+# rollout processes shared by the simulation strategies of this process
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _rollout_strategy(strategy_code: str) -> WordSearchStrategy:
+    if strategy_code not in _rollout_strategies:
+        # imported here, the registry imports this module
+        from src.search_strategy.registry import build_strategy
+
+        _rollout_strategies[strategy_code] = build_strategy(strategy_code)
+    return _rollout_strategies[strategy_code]
+
+
+def _rollout_executor(processes: Optional[int]) -> Optional[ProcessPoolExecutor]:
+    """
+    Processes the rollouts run on, None to run them in this process: when asked to or
+    when this process is a pool worker, which cannot have children
+    :param processes: number of processes when the executor is created
+    :return:
+    """
+    global _executor
+    if processes == 1 or multiprocessing.current_process().daemon:
+        return None
+    if _executor is None:
+        # forked so that the rollout processes inherit the lexicon
+        _executor = ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("fork")
+        )
+    return _executor
+
+
+def close_rollout_executor() -> None:
+    """Stop the rollout processes, a later simulation starts new ones"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+atexit.register(close_rollout_executor)
+
+
+def rollout(task: RolloutTask) -> Tuple[int, int]:
+    """
+    Play a candidate move then a few plies with the greedy rollout strategy, the
+    opponent rack and the draws being sampled from the unseen letters.
+    Only the board and the premiums are copied, the lexicon is shared.
+    :param task: see RolloutTask
+    :return: index of the candidate and the points of the player minus the points
+        of the opponent over the rollout, the candidate included
+    """
+    (
+        index,
+        board,
+        premiums,
+        move,
+        unseen,
+        opponent_rack_size,
+        rack_size,
+        plies,
+        seed,
+        strategy_code,
+    ) = task
+    rng = random.Random(seed)
+    strategy = _rollout_strategy(strategy_code)
+    grid = Grid(board)
+    score_grid = Grid(premiums)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    grid.place_word(**move["play"])
+    consume_premiums(score_grid, move["play"])
+
+    bag = list(unseen)
+    rng.shuffle(bag)
+    opponent_rack = [bag.pop() for _ in range(min(opponent_rack_size, len(bag)))]
+    rack = list(move["leave"])
+    while len(rack) < rack_size and bag:
+        rack.append(bag.pop())
+    racks = [opponent_rack, rack]
+
+    spread = move["score"]
+    for ply in range(plies):
+        ply_rack = racks[ply % 2]
+        if not ply_rack:
+            break
+        reply = strategy.find_best_word(ply_rack, checker, score_grid)
+        if not reply["play"]["word"]:
+            continue
+        grid.place_word(**reply["play"])
+        consume_premiums(score_grid, reply["play"])
+        spread += reply["score"] if ply % 2 else -reply["score"]
+        for letter in reply["letter_used"]:
+            ply_rack.remove(letter if letter in ply_rack else "*")
+        while len(ply_rack) < rack_size and bag:
+            ply_rack.append(bag.pop())
+    return index, spread
+
+
+class SimulationSearch(NaiveSearch):
+    """
+    SimulationSearch takes the best scoring moves of NaiveSearch and plays each of
+    them in rollouts: the opponent rack is sampled from the unseen letters and a few
+    plies are played greedily. The move with the best mean spread is played.
+
+    Rollouts are spread over the candidates in turn until the time budget of the
+    move runs out, in a process pool (in this process when it is a pool worker).
+    Without a search context (outside of a game) it plays like NaiveSearch.
+
+    :param nb_candidates: number of best scoring moves simulated
+    :param plies: moves played after the candidate, the opponent then the player
+    :param time_budget: seconds spent on the rollouts of a move
+    :param max_rollouts: rollouts of a move at most, None for no limit
+    :param processes: processes of the rollout pool, the number of cores if None,
+        1 to run the rollouts in this process
+    :param rollout_strategy: code of the strategy playing the plies of the rollouts
+    :param rack_size: size of the racks in the rollouts
+    """
+
+    def __init__(
+        self,
+        nb_candidates: int = 8,
+        plies: int = 2,
+        time_budget: float = 5.0,
+        max_rollouts: Optional[int] = None,
+        processes: Optional[int] = None,
+        rollout_strategy: str = "naive_blind",
+        rack_size: int = 7,
+    ):
+        super().__init__()
+        self.strategy_code = "simulation"
+        self.nb_candidates: int = nb_candidates
+        self.plies: int = plies
+        self.time_budget: float = time_budget
+        self.max_rollouts: Optional[int] = max_rollouts
+        self.processes: Optional[int] = processes
+        self.rollout_strategy: str = rollout_strategy
+        self.rack_size: int = rack_size
+        # number of rollouts played for the last move
+        self.rollouts_played: int = 0
+
+    def _rollout_tasks(
+        self,
+        candidates: List[td.Move],
+        board: np.ndarray,
+        premiums: np.ndarray,
+        context: td.SearchContext,
+    ) -> Iterator[RolloutTask]:
+        count = 0
+        while self.max_rollouts is None or count < self.max_rollouts:
+            index = count % len(candidates)
+            yield (
+                index,
+                board,
+                premiums,
+                candidates[index],
+                context["unseen"],
+                context["opponent_rack_size"],
+                self.rack_size,
+                self.plies,
+                self.rng.getrandbits(32),
+                self.rollout_strategy,
+            )
+            count += 1
+
+    def _simulate(
+        self,
+        candidates: List[td.Move],
+        board: np.ndarray,
+        premiums: np.ndarray,
+        context: td.SearchContext,
+    ) -> List[List[int]]:
+        """
+        Run rollouts until the time budget or the number of rollouts is spent
+        :return: spreads of the rollouts of each candidate
+        """
+        spreads: List[List[int]] = [[] for _ in candidates]
+        deadline = time.perf_counter() + self.time_budget
+        tasks = self._rollout_tasks(candidates, board, premiums, context)
+        executor = _rollout_executor(self.processes)
+        if executor is None:
+            for task in tasks:
+                if time.perf_counter() >= deadline:
+                    break
+                index, spread = rollout(task)
+                spreads[index].append(spread)
+            return spreads
+
+        # keep every rollout process busy until the deadline, then cancel the
+        # rollouts not started yet: the ones running finish in the background and
+        # are not waited for
+        in_flight: Set[Future] = set()
+        max_in_flight = 2 * (self.processes or os.cpu_count() or 1)
+        exhausted = False
+        while True:
+            while (
+                not exhausted
+                and len(in_flight) < max_in_flight
+                and time.perf_counter() < deadline
+            ):
+                next_task = next(tasks, None)
+                if next_task is None:
+                    exhausted = True
+                else:
+                    in_flight.add(executor.submit(rollout, next_task))
+            remaining = deadline - time.perf_counter()
+            if not in_flight or remaining <= 0:
+                for future in in_flight:
+                    future.cancel()
+                return spreads
+            done, in_flight = wait(
+                in_flight, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                index, spread = future.result()
+                spreads[index].append(spread)
+
+    def find_best_word(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> td.ValidWord:
+        context = self.context
+        if context is None or not context["unseen"]:
+            return super().find_best_word(rack, word_placer_checker, score_grid)
+        candidates = [
+            move
+            for move in self.generate_moves(
+                rack, word_placer_checker, score_grid, k=self.nb_candidates
+            )
+            if move["score"] > 0
+        ]
+        self.rollouts_played = 0
+        if not candidates:
+            return td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+
+        spreads = self._simulate(
+            candidates, word_placer_checker.grid.grid, score_grid.grid, context
+        )
+        self.rollouts_played = sum(len(candidate) for candidate in spreads)
+        if metrics.ENABLED:
+            metrics.incr("strategy.simulation.rollouts", self.rollouts_played)
+
+        best_move = candidates[0]
+        best_value = float("-inf")
+        for move, move_spreads in zip(candidates, spreads):
+            # a candidate without rollout is only worth its score
+            value = (
+                sum(move_spreads) / len(move_spreads) if move_spreads else move["score"]
+            )
+            if value > best_value:
+                best_move = move
+                best_value = value
+        logger.debug(
+            "Best word: %s with mean spread %s over %s rollouts",
+            best_move["play"],
+            best_value,
+            self.rollouts_played,
+        )
+        return td.ValidWord(
+            play=best_move["play"],
+            letter_used=best_move["letter_used"],
+            score=best_move["score"],
+        )
@@ -1,18 +1,43 @@
-from typing import List, Dict, Optional
+import heapq
+import random
+from collections import Counter
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
+from src.engine.grid import Grid, compute_total_word_score
+from src.engine.leave import compute_leave
 from src.engine.tree import Tree
 from src.engine.word_checker import WordPlacerChecker
-from src.utils.typing import typed_dict as td
+from src.settings.logger_config import logger
+from src.utils import metrics
+from src.utils.typing import enum, typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
 from src.utils.utils import count_letters
 
 
 class WordSearchStrategy:
     def __init__(self):
         self.strategy_code = "base"
+        # set by the game so that randomized strategies are reproducible
+        self.rng: random.Random = random.Random()
+        # effort of the last search
+        self.search_stats: td.SearchStats = self._new_search_stats()
+        # what the player knows of the game before its move, set by the game
+        self.context: Optional[td.SearchContext] = None
 
     @staticmethod
+    def _new_search_stats() -> td.SearchStats:
+        return td.SearchStats(
+            candidates_generated=0, candidates_validated=0, max_depth=0
+        )
+
+    def _reset_search_stats(self) -> None:
+        self.search_stats = self._new_search_stats()
+
     def _find_all_possible_word(
-        rack: List[str], tree: Tree, constraint: Optional[Dict[int, str]] = None
+        self,
+        rack: List[str],
+        tree: Tree,
+        constraint: Optional[Dict[int, str]] = None,
     ) -> List[str]:
         """
         Find all valid words that can be formed with the given letters
@@ -23,10 +48,156 @@ class WordSearchStrategy:
         """
         letters_count = count_letters(rack)
         results: List[str] = []
-        tree.search(tree.root, letters_count, [], results, constraint=constraint)
+        max_depth = [0]
+        tree.search(
+            tree.root,
+            letters_count,
+            [],
+            results,
+            constraint=constraint,
+            max_depth=max_depth,
+        )
+        self.search_stats["candidates_generated"] += len(results)
+        if max_depth[0] > self.search_stats["max_depth"]:
+            self.search_stats["max_depth"] = max_depth[0]
+        if metrics.ENABLED:
+            metrics.incr("strategy.candidates_generated", len(results))
         return results
 
+    def _make_move(
+        self,
+        rack: List[str],
+        word: str,
+        start_position: Tuple[int, int],
+        direction: enum.Direction,
+        result: td.Result,
+        score_grid: Grid,
+    ) -> td.Move:
+        """
+        Score a word validated by the word placer checker
+        :param rack: rack of the player
+        :param word:
+        :param start_position:
+        :param direction:
+        :param result: result of the word placer checker for this word
+        :param score_grid:
+        :return: the move
+        """
+        self.search_stats["candidates_validated"] += 1
+        if metrics.ENABLED:
+            metrics.incr(f"strategy.{self.strategy_code}.candidates_validated")
+        play = td.PlaceWord(
+            word=word, start_position=start_position, direction=direction
+        )
+        score = compute_total_word_score(
+            play,
+            result["perpendicular_words"],
+            len(result["letter_already_placed"]),
+            score_grid,
+        )
+        letter_used = list(
+            (
+                Counter(word) - Counter(result["letter_already_placed"].values())
+            ).elements()
+        )
+        return td.Move(
+            play=play,
+            letter_used=letter_used,
+            score=score,
+            leave=compute_leave(rack, letter_used),
+        )
+
+    def _iter_moves(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> Iterator[td.Move]:
+        """
+        Generate every legal move of the rack, in a deterministic order
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :return:
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def generate_moves(
+        self,
+        rack: List[str],
+        word_placer_checker: WordPlacerChecker,
+        score_grid: Grid,
+        k: Optional[int] = None,
+    ) -> Iterable[td.Move]:
+        """
+        Legal moves of the rack, generated in one pass
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :param k: keep only the k best moves, in a bounded heap
+        :return: every move as they are generated if k is None, else the k best
+            moves by decreasing score (the first generated first for a same score)
+        """
+        self._reset_search_stats()
+        # the letters sorted: the order of generation, hence the move chosen among
+        # moves of a same value, only depends on the letters of the rack
+        moves = self._iter_moves(sorted(rack), word_placer_checker, score_grid)
+        if k is None:
+            return moves
+        return heapq.nlargest(k, moves, key=lambda move: move["score"])
+
+    def _candidate_moves(
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
+    ) -> Iterable[td.Move]:
+        """
+        Moves find_best_word chooses from, every move by default
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :return:
+        """
+        return self.generate_moves(rack, word_placer_checker, score_grid)
+
+    def close(self) -> None:
+        """
+        Release what the strategy holds between its searches (e.g. a pool of
+        workers), nothing by default. The strategy can still search afterwards.
+        :return:
+        """
+        pass
+
+    def evaluate_move(self, move: td.Move) -> float:
+        """
+        Value of a move the strategy maximizes, its score by default
+        :param move:
+        :return:
+        """
+        return move["score"]
+
     def find_best_word(
-        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid
+        self, rack: List[str], word_placer_checker: WordPlacerChecker, score_grid: Grid
     ) -> td.ValidWord:
-        raise NotImplementedError("Subclasses must implement this method")
+        """
+        Move of best value among the moves scoring some points, the first generated
+        among the moves of a same value. A pass (empty word) if no move scores any
+        point.
+        :param rack:
+        :param word_placer_checker:
+        :param score_grid:
+        :return:
+        """
+        best_move: Optional[td.Move] = None
+        best_value = 0.0
+        for move in self._candidate_moves(rack, word_placer_checker, score_grid):
+            if move["score"] <= 0:
+                continue
+            value = self.evaluate_move(move)
+            if best_move is None or value > best_value:
+                best_move = move
+                best_value = value
+        if best_move is None:
+            logger.debug("Best word: %s", DEFAULT_PLACE_WORD)
+            return td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+        logger.debug("Best word: %s with value %s", best_move["play"], best_value)
+        return td.ValidWord(
+            play=best_move["play"],
+            letter_used=best_move["letter_used"],
+            score=best_move["score"],
+        )
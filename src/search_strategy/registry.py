@@ -0,0 +1,37 @@
+from typing import Dict, Tuple, Type
+
+from src.search_strategy.BingoFirstSearch import BingoFirstSearch
+from src.search_strategy.EquitySearch import EquitySearch
+from src.search_strategy.MctsSearch import MctsSearch
+from src.search_strategy.NaiveBlindSearch import NaiveBlindSearch
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.ParallelSearch import ParallelSearch
+from src.search_strategy.SimulationSearch import SimulationSearch
+from src.search_strategy.WordSearchStrategy import WordSearchStrategy
+
+# strategies that can be referenced by their code, e.g. to describe a game
+# to play in another process or on another machine
+STRATEGIES: Dict[str, Type[WordSearchStrategy]] = {
+    "naive": NaiveSearch,
+    "naive_blind": NaiveBlindSearch,
+    "equity": EquitySearch,
+    "simulation": SimulationSearch,
+    "mcts": MctsSearch,
+    "parallel": ParallelSearch,
+    "bingo": BingoFirstSearch,
+}
+
+DEFAULT_STRATEGY_PAIR: Tuple[str, str] = ("naive_blind", "naive")
+
+
+def build_strategy(strategy_code: str) -> WordSearchStrategy:
+    """
+    Create a new strategy from its code
+    :param strategy_code: code of the strategy, a key of STRATEGIES
+    :return: a new instance of the strategy
+    """
+    if strategy_code not in STRATEGIES:
+        raise ValueError(
+            f"Unknown strategy {strategy_code}, expected one of {list(STRATEGIES)}"
+        )
+    return STRATEGIES[strategy_code]()
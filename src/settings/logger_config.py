@@ -1,11 +1,40 @@
+"""
+Logging of the application.
+
+The loggers never write themselves: they put their records in a queue and a single
+listener thread of the main process writes them, so that a slow console or disk never
+stalls the caller. Pool workers send their records to the main process through a
+multiprocessing queue (see worker_log_queue and configure_worker_logging).
+
+Log with the %-style arguments, the message is only formatted if the level is enabled:
+
+    logger.debug("Best word: %s", best_word)
+"""
+
+import atexit
 import logging
+import multiprocessing
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from src.settings import settings
+
+# real handlers of each logger, only used by the listener thread
+_handlers: Dict[str, List[logging.Handler]] = {}
+
 
+class _Writer(logging.Handler):
+    """Hand each record to the real handlers of the logger that emitted it"""
 
-def _setup_logger():
-    # Créer un logger
-    logger = logging.getLogger("app_logger")
-    logger.setLevel(logging.DEBUG)  # Permet de capturer tous les niveaux de log
+    def emit(self, record: logging.LogRecord) -> None:
+        for handler in _handlers.get(record.name, []):
+            if record.levelno >= handler.level:
+                handler.handle(record)
 
+
+def _app_handlers() -> List[logging.Handler]:
     # Format des logs
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s: \n%(message)s"
@@ -13,38 +42,95 @@ def _setup_logger():
 
     # Handler pour afficher dans la console
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.WARN)  # Afficher tous les logs dans la console
+    console_handler.setLevel(logging.WARN)
     console_handler.setFormatter(formatter)
-    # console_handler.setStream(sys.stdout)
 
-    # Handler pour enregistrer les erreurs critiques dans un fichier
-    file_handler = logging.FileHandler("logs/critical_errors.log")
+    # Handler pour enregistrer les erreurs critiques dans un fichier, ouvert au
+    # premier enregistrement
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    file_handler = logging.FileHandler(
+        os.path.join(settings.LOG_DIR, "critical_errors.log"), delay=True
+    )
     file_handler.setLevel(
         logging.CRITICAL
     )  # Enregistrer uniquement les erreurs critiques dans le fichier
     file_handler.setFormatter(formatter)
 
-    # Ajouter les handlers au logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    return [console_handler, file_handler]
 
+
+def _print_handlers() -> List[logging.Handler]:
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.WARN)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+    return [console_handler]
+
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = QueueListener(_queue, _Writer())
+
+
+def _setup_logger(name: str, handlers: List[logging.Handler]) -> logging.Logger:
+    logger = logging.getLogger(name)
+    # the records below this level are dropped before being built
+    logger.setLevel(settings.LOG_LEVEL)
+    _handlers[name] = handlers
+    logger.addHandler(QueueHandler(_queue))
     return logger
 
 
-def _setup_print_logger():
-    logger = logging.getLogger("print_logger")
-    logger.setLevel(logging.DEBUG)
+def _replace_handlers(handlers: Dict[str, List[logging.Handler]]) -> None:
+    for name, logger_handlers in handlers.items():
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in logger_handlers:
+            logger.addHandler(handler)
 
-    formatter = logging.Formatter("%(message)s")
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.WARN)
-    console_handler.setFormatter(formatter)
+# multiprocessing queue of the pool workers, created with the first pool
+_worker_queue: Optional["multiprocessing.Queue[logging.LogRecord]"] = None
+_worker_listener: Optional[QueueListener] = None
 
-    logger.addHandler(console_handler)
 
-    return logger
+def worker_log_queue() -> "multiprocessing.Queue[logging.LogRecord]":
+    """
+    Queue the pool workers of this process send their records to, the records are
+    written by the listener of this process
+    :return:
+    """
+    global _worker_queue, _worker_listener
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.Queue()
+        _worker_listener = QueueListener(_worker_queue, QueueHandler(_queue))
+        _worker_listener.start()
+        atexit.register(_worker_listener.stop)
+    return _worker_queue
+
+
+def configure_worker_logging(
+    log_queue: "multiprocessing.Queue[logging.LogRecord]",
+) -> None:
+    """
+    Send the records of this worker process to the process owning the queue,
+    putting a record in the queue never waits for it to be written
+    :param log_queue: queue returned by worker_log_queue in the main process
+    :return:
+    """
+    _replace_handlers({name: [QueueHandler(log_queue)] for name in _handlers})
+
+
+def _after_fork_in_child() -> None:
+    # the listener thread does not exist in a forked child, it writes its records
+    # itself until it is configured as a worker
+    global _worker_queue, _worker_listener
+    _worker_queue = None
+    _worker_listener = None
+    _replace_handlers(_handlers)
 
 
-logger = _setup_logger()
-print_logger = _setup_print_logger()
+logger = _setup_logger("app_logger", _app_handlers())
+print_logger = _setup_logger("print_logger", _print_handlers())
+_listener.start()
+atexit.register(_listener.stop)
+os.register_at_fork(after_in_child=_after_fork_in_child)
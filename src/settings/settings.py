@@ -1,6 +1,8 @@
 import os
 
 MAX_WORD_SIZE = 15
+# a game ends once a player skipped this many turns
+MAX_SKIPPED_TURNS = 3
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -10,3 +12,25 @@ LETTERS_VALUES = "french.let"
 
 FRENCH_DICTIONARY_PATH = os.path.join(BASE_DIR, DATA_FOLDER, FRENCH_DICTIONARY)
 LETTERS_VALUES_PATH = os.path.join(BASE_DIR, DATA_FOLDER, LETTERS_VALUES)
+
+# coordinator of the games played on several machines, see src/distributed.py
+COORDINATOR_PORT = 50000
+# the default key is public, it is only accepted on the loopback interface
+COORDINATOR_DEFAULT_AUTHKEY = b"scrabble"
+COORDINATOR_AUTHKEY = os.environ.get(
+    "SCRABBLE_AUTHKEY", COORDINATOR_DEFAULT_AUTHKEY.decode()
+).encode()
+
+# results of the benchmark the new results are compared to, see src/benchmark/run.py
+BENCHMARK_BASELINE_PATH = os.path.join(BASE_DIR, "benchmarks", "baseline.json")
+
+# value of the letters kept on the rack, fitted with python -m src.engine.leave
+LEAVE_TABLE_PATH = os.path.join(BASE_DIR, DATA_FOLDER, "leaves.npy")
+
+# best first moves of racks on the empty board, generated with
+# python -m src.engine.opening_book
+OPENING_BOOK_PATH = os.path.join(BASE_DIR, DATA_FOLDER, "opening_book.npy")
+
+# logs below this level are not even formatted, e.g. SCRABBLE_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get("SCRABBLE_LOG_LEVEL", "WARNING")
+LOG_DIR = os.path.join(BASE_DIR, "logs")
@@ -0,0 +1,204 @@
+"""
+Counters and latency histograms for the hot paths of the engine and the strategies.
+
+Metrics are disabled by default (or enabled with SCRABBLE_METRICS=1), the hot code
+guards every call with the module flag so that disabled metrics cost one attribute
+lookup:
+
+    if metrics.ENABLED:
+        metrics.incr("tree.nodes_visited")
+
+Each process has its own registry, pool workers send a snapshot of theirs with every
+game and the parent merges them. The threads of a process share its registry, a lock
+keeps their updates whole.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, TypedDict
+
+ENABLED: bool = os.environ.get("SCRABBLE_METRICS", "0") == "1"
+
+# upper bounds of the histogram buckets in seconds, from 1 microsecond to ~2 minutes
+BUCKETS: List[float] = [1e-6 * 2**i for i in range(28)]
+
+
+class Histogram(TypedDict):
+    # one count per bucket of BUCKETS, plus one for the values above the last bound
+    buckets: List[int]
+    count: int
+    total: float
+    max: float
+
+
+class Snapshot(TypedDict):
+    counters: Dict[str, int]
+    histograms: Dict[str, Histogram]
+
+
+_counters: Dict[str, int] = {}
+_histograms: Dict[str, Histogram] = {}
+# held by every read or write of the registry
+_lock = threading.Lock()
+
+
+def _after_fork_in_child() -> None:
+    # a thread of the parent may have held the lock when it forked
+    global _lock
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def enable() -> None:
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def _new_histogram() -> Histogram:
+    return Histogram(buckets=[0] * (len(BUCKETS) + 1), count=0, total=0.0, max=0.0)
+
+
+def incr(name: str, value: int = 1) -> None:
+    """
+    Increment a counter
+    :param name:
+    :param value:
+    :return:
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Record a duration in a histogram
+    :param name:
+    :param seconds:
+    :return:
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _new_histogram()
+        histogram["buckets"][bisect.bisect_left(BUCKETS, seconds)] += 1
+        histogram["count"] += 1
+        histogram["total"] += seconds
+        if seconds > histogram["max"]:
+            histogram["max"] = seconds
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """
+    Record the duration of a block in a histogram, does nothing if metrics are disabled
+    :param name:
+    :return:
+    """
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def snapshot() -> Snapshot:
+    """
+    Copy of the metrics of this process, picklable to be sent to another process
+    :return:
+    """
+    with _lock:
+        return Snapshot(
+            counters=dict(_counters),
+            histograms={
+                name: Histogram(
+                    buckets=list(histogram["buckets"]),
+                    count=histogram["count"],
+                    total=histogram["total"],
+                    max=histogram["max"],
+                )
+                for name, histogram in _histograms.items()
+            },
+        )
+
+
+def merge(other: Snapshot) -> None:
+    """
+    Add the metrics of another process to the metrics of this process
+    :param other:
+    :return:
+    """
+    for name, value in other["counters"].items():
+        incr(name, value)
+    with _lock:
+        for name, other_histogram in other["histograms"].items():
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = _histograms[name] = _new_histogram()
+            for i, count in enumerate(other_histogram["buckets"]):
+                histogram["buckets"][i] += count
+            histogram["count"] += other_histogram["count"]
+            histogram["total"] += other_histogram["total"]
+            histogram["max"] = max(histogram["max"], other_histogram["max"])
+
+
+def histogram_percentile(histogram: Histogram, q: float) -> float:
+    """
+    Approximate percentile of a histogram, the upper bound of the bucket holding it
+    (capped by the largest value recorded)
+    :param histogram:
+    :param q: percentile between 0 and 100
+    :return:
+    """
+    if histogram["count"] == 0:
+        return 0.0
+    rank = q / 100 * histogram["count"]
+    seen = 0
+    for i, count in enumerate(histogram["buckets"]):
+        seen += count
+        if seen >= rank and count > 0:
+            return (
+                min(BUCKETS[i], histogram["max"])
+                if i < len(BUCKETS)
+                else histogram["max"]
+            )
+    return histogram["max"]
+
+
+def report() -> str:
+    """
+    Human readable summary of the metrics of this process
+    :return:
+    """
+    lines = ["Counters:"]
+    for name, value in sorted(_counters.items()):
+        lines.append(f"  {name}: {value}")
+    lines.append("Latencies (count, mean, p50, p90, p99, max):")
+    for name, histogram in sorted(_histograms.items()):
+        lines.append(
+            f"  {name}: {histogram['count']}, "
+            f"{histogram['total'] / max(1, histogram['count']):.4f}s, "
+            f"{histogram_percentile(histogram, 50):.4f}s, "
+            f"{histogram_percentile(histogram, 90):.4f}s, "
+            f"{histogram_percentile(histogram, 99):.4f}s, "
+            f"{histogram['max']:.4f}s"
+        )
+    return "\n".join(lines)
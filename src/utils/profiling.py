@@ -0,0 +1,145 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple, TypedDict
+
+
+class ProfileData(TypedDict):
+    # raw cProfile statistics, see cProfile.Profile.create_stats
+    stats: Dict[Any, Any]
+    # "outer;inner;innermost" stack -> number of samples
+    stacks: Dict[str, int]
+
+
+class StackSampler:
+    """
+    Sample the stack of a thread at a fixed interval from a background thread, the
+    samples are collapsed stacks ready for flamegraph tools
+
+    :param interval: seconds between two samples
+    :param thread_id: identifier of the sampled thread, the calling thread if None
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval: float = interval
+        self.thread_id: int = (
+            thread_id if thread_id is not None else threading.get_ident()
+        )
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def profile_call(
+    func: Callable, *args, sampling_interval: float = 0.005
+) -> Tuple[Any, ProfileData]:
+    """
+    Call a function under cProfile and the stack sampler
+    :param func:
+    :param args:
+    :param sampling_interval: seconds between two stack samples
+    :return: the result of the call and its profile
+    """
+    sampler = StackSampler(sampling_interval)
+    profiler = cProfile.Profile()
+    sampler.start()
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+        sampler.stop()
+    profiler.create_stats()
+    return result, ProfileData(
+        stats=profiler.stats,  # type: ignore[attr-defined]
+        stacks=dict(sampler.stacks),
+    )
+
+
+class _RawStats:
+    """Adapter giving raw cProfile statistics the interface pstats.Stats loads from"""
+
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileReport:
+    """
+    Merge the profiles of many games, possibly played in other processes
+    """
+
+    def __init__(self) -> None:
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+        self.nb_profiles: int = 0
+
+    def add(self, profile: ProfileData) -> None:
+        raw = _RawStats(profile["stats"])
+        if self.stats is None:
+            self.stats = pstats.Stats(raw)  # type: ignore[arg-type]
+        else:
+            self.stats.add(raw)  # type: ignore[arg-type]
+        self.stacks.update(profile["stacks"])
+        self.nb_profiles += 1
+
+    def text(self, limit: int = 50) -> str:
+        """
+        Functions sorted by cumulative time
+        :param limit: number of functions
+        :return:
+        """
+        if self.stats is None:
+            return "No profile collected"
+        stream = io.StringIO()
+        self.stats.stream = stream  # type: ignore[attr-defined]
+        self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return f"Profile of {self.nb_profiles} games\n{stream.getvalue()}"
+
+    def write(self, directory: str) -> None:
+        """
+        Write the merged profile in a directory:
+        - profile.pstats: cProfile statistics, for pstats, snakeviz, ...
+        - profile.txt: the functions sorted by cumulative time
+        - profile.folded: collapsed stacks, for flamegraph.pl, speedscope, ...
+        :param directory:
+        :return:
+        """
+        os.makedirs(directory, exist_ok=True)
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(directory, "profile.pstats"))
+        with open(os.path.join(directory, "profile.txt"), "w") as f:
+            f.write(self.text())
+        with open(os.path.join(directory, "profile.folded"), "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
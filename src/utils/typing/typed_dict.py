@@ -1,4 +1,7 @@
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Optional, Tuple, Union
+
+import numpy as np
+from typing_extensions import NotRequired
 
 from src.utils.typing.enum import Direction
 
@@ -15,9 +18,51 @@ class ValidWord(TypedDict):
     score: int
 
 
+class Move(ValidWord):
+    # letters of the rack kept after the move
+    leave: List[str]
+
+
+class MoveUndo(TypedDict):
+    # what Game.undo_move needs to restore the game as it was before a move
+    rack_before: List[str]
+    # row, column and previous value of the cells changed by the move
+    board_changes: List[Tuple[int, int, Union[str, int]]]
+    premium_changes: List[Tuple[int, int, Union[str, int]]]
+    passed: bool
+    # the rack drawn after a pass
+    drawn: List[str]
+
+
+class SearchContext(TypedDict):
+    # letters the player cannot see: the bag and the racks of the opponents
+    unseen: List[str]
+    bag_size: int
+    # number of letters the next opponent plays with
+    opponent_rack_size: int
+    # turns skipped so far by the player and by the next opponent
+    skipped_turns: NotRequired[Tuple[int, int]]
+    # the player plays first in a round, the game only ends before its turn
+    first_to_play: NotRequired[bool]
+
+
+class SearchStats(TypedDict):
+    candidates_generated: int
+    candidates_validated: int
+    max_depth: int
+
+
+class MoveStats(SearchStats):
+    wall_time: float
+    cpu_time: float
+    # number of letters in the bag before the move, tells the phase of the game
+    bag_size: int
+
+
 class PlayerMove(TypedDict):
     rack_before: List[str]
     valid_word: ValidWord
+    stats: NotRequired[MoveStats]
 
 
 class Result(TypedDict):
@@ -30,3 +75,25 @@ class Result(TypedDict):
 class GameHistory(TypedDict):
     history: List[Dict[str, PlayerMove]]
     players_score: Dict[str, List[int]]
+    seed: Optional[int]
+
+
+class GameBatch(TypedDict):
+    batch_id: int
+    game_indices: List[int]
+    run_seed: Optional[int]
+    strategies: Tuple[str, str]
+
+
+class GameSnapshot(TypedDict):
+    # letters of the board, "" for an empty cell
+    board: np.ndarray
+    premiums: np.ndarray
+    bag: List[str]
+    # racks, total scores and skipped turns of the players in seat order
+    racks: List[List[str]]
+    scores: List[int]
+    skipped: List[int]
+    turn: int
+    seed: Optional[int]
+    rack_size: int
@@ -1,7 +1,9 @@
+import hashlib
 import time
 from typing import TypedDict, Dict, List
 
 from src.settings.logger_config import logger
+from src.utils import metrics
 
 
 class LetterValue(TypedDict):
@@ -21,8 +23,10 @@ def measure_execution_time(func):
         result = func(*args, **kwargs)
         end_time = time.time()
         execution_time = end_time - start_time
+        if metrics.ENABLED:
+            metrics.observe(f"function.{func.__name__}", execution_time)
         logger.info(
-            f"Function {func.__name__} took {execution_time:.8f} seconds to execute"
+            "Function %s took %.8f seconds to execute", func.__name__, execution_time
         )
         return result
 
@@ -72,3 +76,29 @@ def load_word(file: str, max_size: float = float("inf")) -> list:
             if len(word.strip()) <= max_size:
                 result.append(word.strip())
     return result
+
+
+def derive_seed(run_seed: int, game_index: int) -> int:
+    """
+    Derive the seed of a game from the seed of the run and the index of the game,
+    stable across processes and python sessions (unlike hash())
+    :param run_seed:
+    :param game_index:
+    :return: a 64 bits seed
+    """
+    digest = hashlib.blake2b(
+        f"{run_seed}:{game_index}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Percentile of a list of values (nearest rank)
+    :param values: non empty list of values
+    :param q: percentile between 0 and 100
+    :return:
+    """
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
@@ -0,0 +1,57 @@
+import pytest
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.anagram import AnagramIndex
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.BingoFirstSearch import BingoFirstSearch
+from src.search_strategy.NaiveSearch import NaiveSearch
+
+INDEX = AnagramIndex(["sternal", "antlers", "rentals", "altern", "sternale"])
+
+
+def test_anagrams_with_blanks():
+    assert INDEX.anagrams("latners") == ("antlers", "rentals", "sternal")
+    assert INDEX.anagrams("lat*ers") == ("antlers", "rentals", "sternal")
+    assert INDEX.anagrams("l*t*ers") == ("antlers", "rentals", "sternal")
+    assert INDEX.anagrams("sternal*") == ("sternale",)
+    # only the lengths of a bingo are indexed
+    assert INDEX.anagrams("altern") == ()
+    with pytest.raises(ValueError):
+        INDEX.anagrams("st***al")
+
+
+def _move_keys(moves):
+    return {
+        (
+            move["play"]["word"],
+            move["play"]["start_position"],
+            move["play"]["direction"],
+            move["score"],
+        )
+        for move in moves
+    }
+
+
+def test_bingos_are_the_seven_tile_moves_of_the_search():
+    strategy = BingoFirstSearch()
+    for position in POSITIONS:
+        if position["name"] not in ("empty", "mid_game"):
+            continue
+        grid = build_grid(position)
+        score_grid = build_score_grid(grid)
+        rack = list(position["rack"])
+        checker = WordPlacerChecker(grid, BASE_TREE)
+        searched = [
+            move
+            for move in NaiveSearch(use_opening_book=False).generate_moves(
+                rack, checker, score_grid
+            )
+            if len(move["letter_used"]) == 7
+        ]
+        bingos = strategy.bingo_moves(rack, checker, score_grid)
+        assert bingos
+        assert _move_keys(bingos) == _move_keys(searched)
+        assert strategy.find_best_word(rack, checker, score_grid) == NaiveSearch(
+            use_opening_book=False
+        ).find_best_word(rack, checker, score_grid)
@@ -0,0 +1,71 @@
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.game.game import Game
+from src.game.player import ComputerPlayer
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils.typing import typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+
+
+def _game() -> Game:
+    grid = build_grid(ENDGAME)
+    game = Game(
+        [ComputerPlayer(NaiveSearch()), ComputerPlayer(NaiveSearch())],
+        grid=grid,
+        score_grid=build_score_grid(grid),
+        seed=3,
+    )
+    game.init_game()
+    return game
+
+
+def _state(game: Game):
+    return (
+        game.grid.grid.copy(),
+        game.score_grid.grid.copy(),
+        [(player.rack.copy(), player.score_history.copy()) for player in game.players],
+        [player.nb_skip_turn for player in game.players],
+        sorted(game.bag.bag),
+        game.state_hash(),
+    )
+
+
+def _assert_same_state(first, second):
+    assert (first[0] == second[0]).all()
+    assert (first[1] == second[1]).all()
+    assert first[2:] == second[2:]
+
+
+def test_undo_restores_the_game():
+    game = _game()
+    player = game.players[0]
+    player.rack = list(ENDGAME["rack"])
+    before = _state(game)
+    valid_word = NaiveSearch().find_best_word(
+        player.rack, WordPlacerChecker(game.grid, BASE_TREE), game.score_grid
+    )
+    # scoring only reads the score grid
+    _assert_same_state(before, _state(game))
+
+    undo = game.apply_move(player, valid_word)
+    assert game.grid.hash != before[-1]
+    assert len(undo["board_changes"]) == len(valid_word["letter_used"])
+    assert player.score_history[-1] == valid_word["score"]
+    game.undo_move(player, undo)
+    _assert_same_state(before, _state(game))
+
+
+def test_undo_restores_a_pass():
+    game = _game()
+    player = game.players[1]
+    before = _state(game)
+    undo = game.apply_move(
+        player, td.ValidWord(play=DEFAULT_PLACE_WORD, letter_used=[], score=0)
+    )
+    assert player.nb_skip_turn == 1
+    assert sorted(game.bag.bag) != before[4]
+    game.undo_move(player, undo)
+    _assert_same_state(before, _state(game))
@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.game.bag import BASE_BAG, UnseenTiles
+from src.utils.utils import derive_seed
+
+
+def test_same_seed_same_draws():
+    bag_1 = BASE_BAG.copy(rng=random.Random(42))
+    bag_2 = BASE_BAG.copy(rng=random.Random(42))
+    assert list(bag_1.pick_n_random_letters(20)) == list(
+        bag_2.pick_n_random_letters(20)
+    )
+
+
+def test_derive_seed_is_stable():
+    assert derive_seed(42, 3) == derive_seed(42, 3)
+    assert derive_seed(42, 3) != derive_seed(42, 4)
+    assert derive_seed(42, 3) != derive_seed(43, 3)
+
+
+def test_copy_keeps_the_current_letters():
+    bag = BASE_BAG.copy(rng=random.Random(1))
+    drawn = list(bag.pick_n_random_letters(30))
+    copy = bag.copy()
+    assert len(copy) == len(bag) == 72
+    assert copy.bag == bag.bag
+    assert Counter(copy.bag) + Counter(drawn) == Counter(BASE_BAG.bag)
+    # the copy draws on its own
+    copy.pick_random_letter()
+    assert len(bag) == 72
+
+
+def test_draw_every_letter_then_put_them_back():
+    bag = BASE_BAG.copy(rng=random.Random(2))
+    drawn = list(bag.pick_n_random_letters(200))
+    assert Counter(drawn) == Counter(BASE_BAG.bag)
+    assert len(bag) == 0 and not bag.is_in_bag("e")
+    bag.put_back(drawn[:5])
+    bag.put_back("e")
+    assert len(bag) == 6 and bag.is_in_bag("e")
+    bag.remove_letters(["e"])
+    with pytest.raises(ValueError):
+        bag.remove_letters(["e"] * 10)
+
+
+def test_unseen_tiles_samples_racks_of_the_unseen_letters():
+    bag = BASE_BAG.copy(rng=random.Random(3))
+    opponent_rack = list(bag.pick_n_random_letters(7))
+    list(bag.pick_n_random_letters(90))
+    unseen = UnseenTiles.from_bag(bag, [opponent_rack])
+    assert len(unseen) == 12
+    assert Counter(unseen.letters()) == Counter(bag.bag) + Counter(opponent_rack)
+
+    racks = unseen.sample_racks(7, 1000, np.random.default_rng(0))
+    assert racks.shape == (1000, len(bag.kinds))
+    assert (racks.sum(axis=1) == 7).all()
+    assert (racks <= unseen.counts).all()
+    assert not Counter(unseen.rack_letters(racks[0])) - Counter(unseen.letters())
+    rack = unseen.sample_rack(7, random.Random(4))
+    assert len(rack) == 7
+    assert not Counter(rack) - Counter(unseen.letters())
+    # a rack of the opponent cannot be larger than the unseen tiles
+    assert len(unseen.sample_rack(20, random.Random(4))) == 12
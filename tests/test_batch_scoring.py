@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.batch_scoring import BatchScorer
+from src.engine.grid import Grid, compute_total_word_score
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils.typing import enum, typed_dict as td
+
+
+def test_batch_scores_match_the_scores_of_the_moves():
+    for position in POSITIONS:
+        if position["name"] not in ("mid_game", "endgame"):
+            continue
+        grid = build_grid(position)
+        score_grid = build_score_grid(grid)
+        moves = list(
+            NaiveSearch().generate_moves(
+                list(position["rack"]), WordPlacerChecker(grid, BASE_TREE), score_grid
+            )
+        )
+        assert moves
+        scores = BatchScorer(grid, score_grid).score_plays(
+            [move["play"] for move in moves]
+        )
+        assert scores.tolist() == [move["score"] for move in moves]
+
+
+def test_cross_word_above_the_new_tile_is_scored():
+    grid = Grid()
+    grid[6, 7] = "a"
+    score_grid = build_score_grid(grid)
+    # "at" horizontal on row 7 makes the vertical word "aa" with the a above
+    play = td.PlaceWord(
+        word="at", start_position=(7, 7), direction=enum.Direction.HORIZONTAL
+    )
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    result = checker._check_word_placement(
+        play["word"], play["start_position"], play["direction"]
+    )
+    assert [word["word"] for word in result["perpendicular_words"]] == ["aa"]
+    assert result["perpendicular_words"][0]["start_position"] == (6, 7)
+    expected = compute_total_word_score(
+        play, result["perpendicular_words"], 0, score_grid
+    )
+    scores = BatchScorer(grid, score_grid).score_plays([play])
+    assert scores.dtype == np.int64
+    assert scores.tolist() == [expected]
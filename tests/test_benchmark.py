@@ -0,0 +1,33 @@
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.benchmark.run import compare
+
+
+def test_positions_build():
+    for position in POSITIONS:
+        grid = build_grid(position)
+        assert grid.grid.shape == (15, 15)
+        score_grid = build_score_grid(grid)
+        assert (score_grid.grid[grid.grid != ""] == 0).all()
+
+
+def test_compare_flags_regressions():
+    baseline = {
+        "metrics": {
+            "lexicon": {"build_seconds": 2.0},
+            "games": {"games_per_second": 0.1},
+        }
+    }
+    same = {
+        "metrics": {
+            "lexicon": {"build_seconds": 2.1},
+            "games": {"games_per_second": 0.095},
+        }
+    }
+    slower = {
+        "metrics": {
+            "lexicon": {"build_seconds": 3.0},
+            "games": {"games_per_second": 0.05},
+        }
+    }
+    assert compare(same, baseline, 0.2) == []
+    assert len(compare(slower, baseline, 0.2)) == 2
@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+
+import pytest
+
+from src.distributed import SimulationCoordinator, run_worker
+from src.utils.typing import typed_dict as td
+
+
+def _fake_game(game_index, run_seed, strategies) -> td.GameHistory:
+    return td.GameHistory(
+        history=[], players_score={f"1/{strategies[0]}": [game_index]}, seed=run_seed
+    )
+
+
+def _crashing_game(game_index, run_seed, strategies) -> td.GameHistory:
+    # the first worker to play game 3 dies without a word
+    marker = os.environ["SCRABBLE_TEST_MARKER"]
+    if game_index == 3 and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return _fake_game(game_index, run_seed, strategies)
+
+
+def _run(runner, nb_workers: int, **kwargs):
+    # a hang fails the test instead of stalling the run
+    coordinator = SimulationCoordinator(
+        8, seed=1, batch_size=2, address=("127.0.0.1", 0), idle_timeout=30, **kwargs
+    )
+    coordinator.start()
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=run_worker,
+            args=(coordinator.address, coordinator.authkey),
+            kwargs={"processes": 1, "runner": runner, "poll_timeout": 0.2},
+        )
+        for _ in range(nb_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        results = coordinator.run()
+    finally:
+        for worker in workers:
+            worker.join(timeout=15)
+            if worker.is_alive():
+                worker.terminate()
+    assert all(not worker.is_alive() for worker in workers)
+    return results
+
+
+def _game_indices(results):
+    return sorted(sum(history["players_score"].values(), []) for history in results)
+
+
+def test_workers_play_every_game_once():
+    results = _run(_fake_game, 3)
+    assert _game_indices(results) == [[i] for i in range(8)]
+    assert all(history["seed"] == 1 for history in results)
+
+
+def test_idle_worker_is_released():
+    # more workers than batches, some of them never get a batch
+    results = _run(_fake_game, 6)
+    assert len(results) == 8
+
+
+def test_public_bind_needs_a_private_key():
+    with pytest.raises(ValueError):
+        SimulationCoordinator(8, address=("", 0))
+
+
+def test_lost_batch_is_replayed(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCRABBLE_TEST_MARKER", str(tmp_path / "crashed"))
+    results = _run(_crashing_game, 2, lease_timeout=1.0)
+    assert _game_indices(results) == [[i] for i in range(8)]
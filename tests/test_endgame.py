@@ -0,0 +1,123 @@
+from typing import List
+
+import pytest
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.game.game import Game
+from src.game.player import ComputerPlayer, Player
+from src.search_strategy.EndgameSolver import EndgameSolver, _Position
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils.typing import typed_dict as td
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+
+
+def _minimax(solver, position):
+    """Value of the position without pruning nor transposition table"""
+    if position.is_over():
+        return 0
+    moves = solver._position_moves(position)
+    if not moves:
+        undo = position.pass_turn()
+        value = -_minimax(solver, position)
+        position.undo(undo)
+        return value
+    best = None
+    for move in moves:
+        undo = position.play(move)
+        value = move["score"] - _minimax(solver, position)
+        position.undo(undo)
+        best = value if best is None else max(best, value)
+    return best
+
+
+def test_solver_finds_the_exact_value():
+    grid = build_grid(ENDGAME)
+    solver = EndgameSolver(time_limit=60)
+    best = solver.solve(
+        list("ge"),
+        list("so"),
+        WordPlacerChecker(grid, BASE_TREE),
+        build_score_grid(grid),
+    )
+    assert solver.exact
+    root = _Position(
+        grid.copy(), build_score_grid(grid), (("e", "g"), ("o", "s")), (0, 0), True
+    )
+    assert solver.value == _minimax(solver, root)
+    # the moves were undone
+    assert (root.board.grid == grid.grid).all()
+    assert root.board.hash == grid.hash
+    assert solver.principal_variation[0] == best
+    # the principal variation scores the value of the endgame
+    spread = sum(
+        move["score"] if ply % 2 == 0 else -move["score"]
+        for ply, move in enumerate(solver.principal_variation)
+    )
+    assert spread == solver.value
+    # the board of the game is left untouched
+    assert (grid.grid == build_grid(ENDGAME).grid).all()
+
+
+def test_solver_out_of_time_plays_the_best_scoring_move():
+    grid = build_grid(ENDGAME)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    solver = EndgameSolver(time_limit=0)
+    best = solver.solve(list("tag"), list("so"), checker, build_score_grid(grid))
+    assert solver.depth_reached == 0
+    assert not solver.exact
+    assert best == NaiveSearch().find_best_word(
+        list("tag"), checker, build_score_grid(grid)
+    )
+
+
+def test_player_uses_the_solver_once_the_bag_is_empty():
+    grid = build_grid(ENDGAME)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    solver = EndgameSolver(time_limit=60)
+    player = ComputerPlayer(NaiveSearch(), solver)
+    player.rack = list("ge")
+
+    player.set_search_context(
+        td.SearchContext(unseen=list("soabc"), bag_size=3, opponent_rack_size=2)
+    )
+    player.get_valid_move(checker, build_score_grid(grid))
+    assert solver.nodes == 0
+
+    player.set_search_context(
+        td.SearchContext(unseen=list("so"), bag_size=0, opponent_rack_size=2)
+    )
+    player.get_valid_move(checker, build_score_grid(grid))
+    assert solver.exact
+
+
+@pytest.mark.parametrize("skipped_turns", [(0, 0), (2, 0), (2, 2)])
+def test_solver_value_is_the_spread_of_the_game(skipped_turns):
+    # both players solve the endgame: the game scores the value of the first solve,
+    # it ends before a round once a player skipped too many turns in the game
+    grid = build_grid(ENDGAME)
+    players: List[Player] = [
+        ComputerPlayer(NaiveSearch(), EndgameSolver(time_limit=60)) for _ in range(2)
+    ]
+    game = Game(players, grid=grid, score_grid=build_score_grid(grid), seed=1)
+    game.init_game()
+    game.bag.set_letters([])
+    for player, rack, skipped in zip(game.players, ["ge", "so"], skipped_turns):
+        player.rack = list(rack)
+        player.nb_skip_turn = skipped
+
+    solver = EndgameSolver(time_limit=60)
+    solver.solve(
+        list("ge"),
+        list("so"),
+        WordPlacerChecker(grid, BASE_TREE),
+        game.score_grid,
+        skipped_turns,
+    )
+    assert solver.exact
+
+    game.play_game()
+    first, second = game.players
+    assert sum(first.score_history) - sum(second.score_history) == solver.value
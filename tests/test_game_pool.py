@@ -0,0 +1,46 @@
+import multiprocessing
+from typing import List
+
+from src import game_thread
+from src.game_thread import GamePool
+from src.utils.typing import typed_dict as td
+
+
+def _fake_game(seed=None, strategies=None) -> td.GameHistory:
+    pid = multiprocessing.current_process().pid
+    assert pid is not None
+    return td.GameHistory(history=[], players_score={"1/fake": [pid]}, seed=seed)
+
+
+def _seeds(results: List[td.GameHistory]) -> List[int]:
+    seeds = [h["seed"] for h in results if h["seed"] is not None]
+    assert len(seeds) == len(results)
+    return seeds
+
+
+def test_pool_is_reused_across_batches(monkeypatch):
+    # workers are forked, they see the patched game
+    monkeypatch.setattr(game_thread, "play_computer_vs_computer_game", _fake_game)
+    with GamePool(2, chunksize=2) as pool:
+        first = pool.run(6, seed=1)
+        second = pool.run(6, seed=1)
+    assert sorted(_seeds(first)) == sorted(_seeds(second))
+    assert len(set(_seeds(first))) == 6
+
+
+def test_workers_are_recycled(monkeypatch):
+    monkeypatch.setattr(game_thread, "play_computer_vs_computer_game", _fake_game)
+    with GamePool(1, games_per_worker=2) as pool:
+        results = pool.run(6, seed=1)
+    pids = {h["players_score"]["1/fake"][0] for h in results}
+    assert len(pids) == 3
+
+
+def test_thread_pool_plays_the_games_in_this_process(monkeypatch):
+    monkeypatch.setattr(game_thread, "play_computer_vs_computer_game", _fake_game)
+    with GamePool(2, threads=True) as pool:
+        results = pool.run(4, seed=1, progress=False)
+    assert {h["players_score"]["1/fake"][0] for h in results} == {
+        multiprocessing.current_process().pid
+    }
+    assert len({h["seed"] for h in results}) == 4
@@ -0,0 +1,86 @@
+from src.game.game import Game
+from src.game.player import ComputerPlayer
+from src.search_strategy.WordSearchStrategy import WordSearchStrategy
+from src.utils.typing import typed_dict as td
+from src.utils.typing.default import DEFAULT_PLACE_WORD
+
+
+class RandomPassSearch(WordSearchStrategy):
+    """Pass every turn with a random score, cheap enough to play whole games"""
+
+    def __init__(self):
+        super().__init__()
+        self.strategy_code = "random_pass"
+
+    def find_best_word(self, rack, word_placer_checker, score_grid) -> td.ValidWord:
+        return td.ValidWord(
+            play=DEFAULT_PLACE_WORD, letter_used=[], score=self.rng.randint(0, 50)
+        )
+
+
+def _play(seed: int) -> td.GameHistory:
+    game = Game(
+        [ComputerPlayer(RandomPassSearch()), ComputerPlayer(RandomPassSearch())],
+        seed=seed,
+    )
+    game.init_game()
+    return game.play_game()
+
+
+def _moves(history: td.GameHistory):
+    # player ids hold hash(player), compare the moves in play order instead
+    return [
+        (
+            move["rack_before"],
+            move["valid_word"]["play"]["word"],
+            move["valid_word"]["score"],
+        )
+        for plays in history["history"]
+        for move in plays.values()
+    ]
+
+
+def test_same_seed_replays_the_game():
+    history = _play(7)
+    assert _moves(history) == _moves(_play(7))
+    assert history["seed"] == 7
+
+
+def test_different_seed_different_game():
+    assert _moves(_play(7)) != _moves(_play(8))
+
+
+def test_moves_carry_their_stats_when_recorded():
+    game = Game(
+        [ComputerPlayer(RandomPassSearch()), ComputerPlayer(RandomPassSearch())],
+        seed=7,
+        record_stats=True,
+    )
+    game.init_game()
+    history = game.play_game()
+    for plays in history["history"]:
+        for move in plays.values():
+            assert move["stats"]["wall_time"] >= 0
+            assert move["stats"]["bag_size"] <= 88
+    assert all("stats" not in move for move in _play(7)["history"][0].values())
+
+
+class ContextRecorder(RandomPassSearch):
+    def __init__(self):
+        super().__init__()
+        self.contexts = []
+
+    def find_best_word(self, rack, word_placer_checker, score_grid) -> td.ValidWord:
+        self.contexts.append((list(rack), self.context))
+        return super().find_best_word(rack, word_placer_checker, score_grid)
+
+
+def test_players_get_the_unseen_letters():
+    strategies = [ContextRecorder(), ContextRecorder()]
+    game = Game([ComputerPlayer(strategy) for strategy in strategies], seed=3)
+    game.init_game()
+    game.play_game()
+    # the players only pass, every letter is in the bag or on a rack
+    for rack, context in strategies[0].contexts + strategies[1].contexts:
+        assert len(rack) + len(context["unseen"]) == 102
+        assert context["opponent_rack_size"] == 7
@@ -0,0 +1,64 @@
+from collections import Counter
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.grid import consume_premiums
+from src.engine.leave import compute_leave
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveBlindSearch import NaiveBlindSearch
+from src.search_strategy.NaiveSearch import NaiveSearch
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+
+
+def _setup():
+    grid = build_grid(ENDGAME)
+    return list(ENDGAME["rack"]), WordPlacerChecker(grid, BASE_TREE), grid
+
+
+def test_compute_leave():
+    assert compute_leave(list("aabc"), list("ba")) == list("ac")
+    assert compute_leave(list("ab*"), list("az")) == list("b")
+
+
+def test_moves_use_the_rack():
+    rack, checker, grid = _setup()
+    moves = list(
+        NaiveBlindSearch().generate_moves(rack, checker, build_score_grid(grid))
+    )
+    assert moves
+    for move in moves:
+        assert Counter(move["letter_used"]) + Counter(move["leave"]) == Counter(rack)
+
+
+def test_top_k_matches_all_moves():
+    rack, checker, grid = _setup()
+    strategy = NaiveBlindSearch()
+    moves = list(strategy.generate_moves(rack, checker, build_score_grid(grid)))
+    top = strategy.generate_moves(rack, checker, build_score_grid(grid), k=5)
+    assert top == sorted(moves, key=lambda move: move["score"], reverse=True)[:5]
+    best = strategy.find_best_word(rack, checker, build_score_grid(grid))
+    assert best["score"] == top[0]["score"]
+    assert best["play"] == top[0]["play"]
+
+
+def test_line_cache_gives_the_moves_of_a_fresh_search():
+    rack, checker, grid = _setup()
+    score_grid = build_score_grid(grid)
+    cached = NaiveSearch()
+    assert list(cached.generate_moves(rack, checker, score_grid)) == list(
+        NaiveSearch(line_cache_size=0).generate_moves(rack, checker, score_grid)
+    )
+
+    # another word on the board: only the lines it touches are generated again
+    reply = NaiveSearch(line_cache_size=0).find_best_word(
+        list("eaiotnr"), checker, score_grid
+    )
+    grid.place_word(**reply["play"])
+    consume_premiums(score_grid, reply["play"])
+    assert cached.line_cache is not None
+    hits = cached.line_cache.hits
+    assert list(cached.generate_moves(rack, checker, score_grid)) == list(
+        NaiveSearch(line_cache_size=0).generate_moves(rack, checker, score_grid)
+    )
+    assert cached.line_cache.hits - hits >= 10
@@ -0,0 +1,92 @@
+import pytest
+
+from src.game.journal import GameJournal
+from src.utils.typing import enum, typed_dict as td
+
+
+def _history(score: int) -> td.GameHistory:
+    play = td.PlaceWord(
+        word="test", start_position=(7, 7), direction=enum.Direction.HORIZONTAL
+    )
+    move = td.PlayerMove(
+        rack_before=list("testabc"),
+        valid_word=td.ValidWord(play=play, letter_used=list("test"), score=score),
+    )
+    return td.GameHistory(
+        history=[{"1/computer_naive": move}],
+        players_score={"1/computer_naive": [score]},
+        seed=3,
+    )
+
+
+def test_record_and_resume(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    with GameJournal(path, seed=42).open() as journal:
+        journal.record(0, _history(8))
+        journal.record(2, _history(10))
+
+    with GameJournal(path, seed=42).open(resume=True) as journal:
+        assert journal.is_completed(0) and journal.is_completed(2)
+        assert not journal.is_completed(1)
+        assert journal.completed[2] == _history(10)
+        journal.record(1, _history(12))
+
+    with GameJournal(path, seed=42).open(resume=True) as journal:
+        assert len(journal) == 3
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    with GameJournal(path, seed=42).open() as journal:
+        journal.record(0, _history(8))
+    with open(path, "a") as f:
+        f.write('{"game_index": 1, "hist')
+
+    with GameJournal(path, seed=42).open(resume=True) as journal:
+        assert list(journal.completed) == [0]
+        journal.record(1, _history(12))
+    with GameJournal(path, seed=42).open(resume=True) as journal:
+        assert len(journal) == 2
+
+
+def test_refuse_overwrite_and_seed_mismatch(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    GameJournal(path, seed=42).open().close()
+    with pytest.raises(FileExistsError):
+        GameJournal(path, seed=42).open()
+    with pytest.raises(ValueError):
+        GameJournal(path, seed=1).open(resume=True)
+
+
+def test_corrupted_record_is_an_error(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    with GameJournal(path, seed=42).open() as journal:
+        journal.record(0, _history(8))
+        journal.record(1, _history(10))
+    with open(path) as f:
+        lines = f.readlines()
+    lines[1] = lines[1][:20] + "\n"
+    with open(path, "w") as f:
+        f.writelines(lines)
+
+    with pytest.raises(ValueError):
+        GameJournal(path, seed=42).open(resume=True)
+    # the valid records after the damaged one are kept
+    with open(path) as f:
+        assert len(f.readlines()) == 3
+
+
+def test_journal_without_header_is_an_error(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text('{"game_index": 0, "history": {}}\n')
+    with pytest.raises(ValueError):
+        GameJournal(str(path), seed=42).open(resume=True)
+
+
+def test_read_whatever_the_seed(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    with GameJournal(path, seed=7).open() as journal:
+        journal.record(0, _history(8))
+    journal = GameJournal.read(path)
+    assert journal.seed == 7
+    assert journal.completed == {0: _history(8)}
@@ -0,0 +1,79 @@
+import itertools
+
+import numpy as np
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.leave import (
+    LEAVE_LETTERS,
+    MAX_LEAVE_SIZE,
+    TABLE_SIZE,
+    LeaveTable,
+    fit_leave_table,
+    leave_index,
+)
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.EquitySearch import EquitySearch
+from src.utils.typing import enum, typed_dict as td
+
+
+def test_leave_index_is_a_bijection():
+    # the table is filled with a vectorized version of leave_index
+    indexes = [
+        leave_index(letters)
+        for size in range(3)
+        for letters in itertools.combinations_with_replacement(LEAVE_LETTERS, size)
+    ]
+    assert sorted(indexes) == list(range(len(indexes)))
+    assert leave_index("*" * MAX_LEAVE_SIZE) == TABLE_SIZE - 1
+    assert leave_index("eas") == leave_index("sea")
+
+
+def _move(rack: str, used: str, score: int) -> td.PlayerMove:
+    play = td.PlaceWord(
+        word=used, start_position=(7, 7), direction=enum.Direction.HORIZONTAL
+    )
+    return td.PlayerMove(
+        rack_before=list(rack),
+        valid_word=td.ValidWord(play=play, letter_used=list(used), score=score),
+    )
+
+
+def test_fit_values_the_letters_followed_by_good_moves(tmp_path):
+    histories = []
+    for _ in range(20):
+        # keeping a blank is followed by a 40 points move, keeping a q by 2 points
+        histories.append(
+            td.GameHistory(
+                history=[
+                    {"1/a": _move("abcde*q", "abcde", 10)},
+                    {"1/a": _move("*qfghij", "fghij", 40)},
+                    {"1/a": _move("*qklmno", "*klmno", 2)},
+                    {"1/a": _move("qprstuv", "prstuv", 20)},
+                ],
+                players_score={"1/a": [10, 40, 2, 20]},
+                seed=None,
+            )
+        )
+    table = fit_leave_table(histories)
+    assert table.value("*") > 0 > table.value("q")
+    assert table.value("*q") > table.value("q")
+    assert table.value("") == 0
+
+    path = str(tmp_path / "leaves.npy")
+    table.save(path)
+    assert np.array_equal(LeaveTable.load(path).values, table.values)
+
+
+def test_equity_keeps_a_valuable_leave():
+    position = next(p for p in POSITIONS if p["name"] == "endgame")
+    grid = build_grid(position)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    values = np.zeros(TABLE_SIZE, dtype=np.float32)
+    values[leave_index("g")] = 100
+    strategy = EquitySearch(LeaveTable(values))
+    best = strategy.find_best_word(
+        list(position["rack"]), checker, build_score_grid(grid)
+    )
+    assert best["score"] > 0
+    assert "g" not in best["letter_used"]
@@ -0,0 +1,77 @@
+import logging
+import multiprocessing
+import time
+
+from src.game.game import Game
+from src.game.observer import ConsoleObserver
+from src.game.player import ComputerPlayer
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.settings import logger_config
+from src.settings.logger_config import (
+    configure_worker_logging,
+    logger,
+    worker_log_queue,
+)
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class _Unprintable:
+    def __str__(self):
+        raise AssertionError("a disabled record must not be formatted")
+
+
+def _log_from_worker(log_queue, message):
+    configure_worker_logging(log_queue)
+    logger.error("worker says %s", message)
+
+
+def _wait_for(capture, message, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if any(record.getMessage() == message for record in capture.records):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_disabled_levels_are_not_formatted():
+    assert not logger.isEnabledFor(logging.DEBUG)
+    logger.debug("value %s", _Unprintable())
+
+
+def test_records_are_written_by_the_listener(monkeypatch):
+    capture = _Capture()
+    monkeypatch.setitem(logger_config._handlers, "app_logger", [capture])
+    logger.error("parent says %s", 1)
+    assert _wait_for(capture, "parent says 1")
+
+
+def test_worker_records_reach_the_parent(monkeypatch):
+    capture = _Capture()
+    monkeypatch.setitem(logger_config._handlers, "app_logger", [capture])
+    process = multiprocessing.get_context("fork").Process(
+        target=_log_from_worker, args=(worker_log_queue(), "hello")
+    )
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+    assert _wait_for(capture, "worker says hello")
+    assert capture.records[-1].levelname == "ERROR"
+
+
+def test_console_observer_is_shown_at_the_default_level(monkeypatch):
+    # the console handler of print_logger shows the warnings and above
+    capture = _Capture()
+    capture.setLevel(logging.WARN)
+    monkeypatch.setitem(logger_config._handlers, "print_logger", [capture])
+    game = Game([ComputerPlayer(NaiveSearch()), ComputerPlayer(NaiveSearch())], seed=1)
+    ConsoleObserver(delay=0).on_turn_start(game)
+    assert _wait_for(capture, f"Turn {game.turn}")
@@ -0,0 +1,48 @@
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.MctsSearch import MctsSearch, position_key
+from src.utils.typing import typed_dict as td
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+CONTEXT = td.SearchContext(unseen=list("eaiousr"), bag_size=2, opponent_rack_size=5)
+
+
+def _search(strategy, grid, rack):
+    strategy.context = CONTEXT
+    return strategy.find_best_word(
+        rack, WordPlacerChecker(grid, BASE_TREE), build_score_grid(grid)
+    )
+
+
+def test_search_reports_its_iterations():
+    strategy = MctsSearch(iterations=12, time_budget=None)
+    strategy.rng.seed(1)
+    best = _search(strategy, build_grid(ENDGAME), list(ENDGAME["rack"]))
+    assert best["score"] > 0
+    assert strategy.iterations_done == 12
+    assert strategy.iterations_per_second > 0
+    root = strategy.nodes[position_key(build_grid(ENDGAME), 0)]
+    assert root.visits == 12
+    assert sum(edge.visits for edge in root.edges.values()) == 12
+
+
+def test_tree_is_reused_after_the_opponent_move():
+    strategy = MctsSearch(iterations=12, time_budget=None)
+    strategy.rng.seed(1)
+    grid = build_grid(ENDGAME)
+    best = _search(strategy, grid, list(ENDGAME["rack"]))
+    # play the chosen move then an opponent reply the search explored
+    root = strategy.nodes[position_key(grid, 0)]
+    edge = next(e for e in root.edges.values() if e.move["play"] == best["play"])
+    reply = max(strategy.nodes[edge.child_key].edges.values(), key=lambda e: e.visits)
+    grid.place_word(**best["play"])
+    grid.place_word(**reply.move["play"])
+    kept = strategy.nodes[reply.child_key]
+    visits_before = kept.visits
+
+    strategy.iterations = 4
+    _search(strategy, grid, list("eai"))
+    assert strategy.reused_nodes >= 1
+    assert strategy.nodes[position_key(grid, 0)] is kept
+    assert kept.visits >= visits_before + 4 - 1
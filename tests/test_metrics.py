@@ -0,0 +1,40 @@
+import pytest
+
+from src.utils import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_counters_and_histograms(enabled_metrics):
+    metrics.incr("a")
+    metrics.incr("a", 2)
+    metrics.observe("t", 0.001)
+    metrics.observe("t", 0.5)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"a": 3}
+    assert snapshot["histograms"]["t"]["count"] == 2
+    assert snapshot["histograms"]["t"]["max"] == 0.5
+    assert metrics.histogram_percentile(snapshot["histograms"]["t"], 50) >= 0.001
+
+
+def test_merge(enabled_metrics):
+    metrics.incr("a")
+    metrics.observe("t", 0.01)
+    other = metrics.snapshot()
+    metrics.merge(other)
+    assert metrics.snapshot()["counters"]["a"] == 2
+    assert metrics.snapshot()["histograms"]["t"]["count"] == 2
+
+
+def test_timer_is_a_noop_when_disabled():
+    metrics.reset()
+    with metrics.timer("t"):
+        pass
+    assert metrics.snapshot()["histograms"] == {}
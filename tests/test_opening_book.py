@@ -0,0 +1,54 @@
+from src.engine.grid import SCORE_GRID, Grid
+from src.engine.opening_book import OpeningBook, build_opening_book
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.utils.typing import enum
+
+RACKS = [list("tea"), list("zzz")]
+
+
+def _first_move(strategy, rack, grid=None):
+    return strategy.find_best_word(
+        rack,
+        WordPlacerChecker(grid if grid is not None else Grid(), BASE_TREE),
+        Grid(SCORE_GRID.grid),
+    )
+
+
+def test_book_gives_the_searched_first_move(tmp_path):
+    path = str(tmp_path / "book.npy")
+    build_opening_book(RACKS).save(path)
+    book = OpeningBook.load(path)
+    assert len(book) == 2
+
+    strategy = NaiveSearch(use_opening_book=False)
+    strategy.opening_book = book
+    for rack in RACKS:
+        expected = _first_move(NaiveSearch(use_opening_book=False), rack)
+        # the letters of the rack in another order are the same rack
+        assert _first_move(strategy, rack[::-1]) == expected
+        assert strategy.search_stats["candidates_generated"] == 0
+    assert book.moves(list("zzz")) == []
+    assert book.moves(list("abc")) is None
+
+
+def test_book_is_only_read_on_the_empty_board():
+    strategy = NaiveSearch(use_opening_book=False)
+    strategy.opening_book = build_opening_book([list("tea")])
+    grid = Grid()
+    grid.place_word("eta", (7, 7), enum.Direction.HORIZONTAL)
+    _first_move(strategy, list("tea"), grid)
+    assert strategy.search_stats["candidates_generated"] > 0
+
+
+def test_book_move_does_not_depend_on_the_order_of_the_letters():
+    # racks with several best moves of a same score, in the order of a drawn rack
+    racks = [list("tatsorl"), list("liearii"), list("truleen")]
+    strategy = NaiveSearch(use_opening_book=False)
+    strategy.opening_book = build_opening_book(racks)
+    for rack in racks:
+        searched = _first_move(NaiveSearch(use_opening_book=False), rack)
+        assert _first_move(strategy, rack) == searched
+        assert strategy.search_stats["candidates_generated"] == 0
+        assert _first_move(NaiveSearch(use_opening_book=False), rack[::-1]) == searched
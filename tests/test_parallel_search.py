@@ -0,0 +1,82 @@
+from typing import List
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.grid import SCORE_GRID, Grid
+from src.engine.opening_book import build_opening_book
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.game.game import Game
+from src.game.player import ComputerPlayer, Player
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.ParallelSearch import ParallelSearch
+
+
+def _best_word(strategy, position):
+    grid = build_grid(position)
+    return strategy.find_best_word(
+        list(position["rack"]),
+        WordPlacerChecker(grid, BASE_TREE),
+        build_score_grid(grid),
+    )
+
+
+def test_parallel_search_plays_the_serial_move():
+    strategy = ParallelSearch(NaiveSearch(), processes=2)
+    try:
+        for position in POSITIONS:
+            if position["name"] not in ("mid_game", "endgame"):
+                continue
+            serial = NaiveSearch()
+            assert _best_word(strategy, position) == _best_word(serial, position)
+            assert (
+                strategy.search_stats["candidates_validated"]
+                == serial.search_stats["candidates_validated"]
+            )
+    finally:
+        strategy.close()
+
+
+def test_single_process_searches_in_this_process():
+    strategy = ParallelSearch(processes=1)
+    endgame = next(p for p in POSITIONS if p["name"] == "endgame")
+    assert _best_word(strategy, endgame) == _best_word(NaiveSearch(), endgame)
+    assert strategy._executor is None
+
+
+def test_thread_search_plays_the_serial_move():
+    strategy = ParallelSearch(NaiveSearch(), processes=3, threads=True)
+    mid_game = next(p for p in POSITIONS if p["name"] == "mid_game")
+    try:
+        assert _best_word(strategy, mid_game) == _best_word(NaiveSearch(), mid_game)
+    finally:
+        strategy.close()
+
+
+def test_opening_move_is_read_from_the_book_of_the_strategy():
+    book_strategy = NaiveSearch(use_opening_book=False)
+    book_strategy.opening_book = build_opening_book([list("tea")])
+    strategy = ParallelSearch(book_strategy, processes=2)
+    checker = WordPlacerChecker(Grid(), BASE_TREE)
+    try:
+        best = strategy.find_best_word(list("aet"), checker, Grid(SCORE_GRID.grid))
+    finally:
+        strategy.close()
+    assert best == book_strategy.find_best_word(
+        list("aet"), checker, Grid(SCORE_GRID.grid)
+    )
+    assert strategy.search_stats["candidates_generated"] == 0
+    assert strategy._executor is None
+
+
+def test_game_closes_the_pool_of_its_players():
+    endgame = next(p for p in POSITIONS if p["name"] == "endgame")
+    grid = build_grid(endgame)
+    strategies = [ParallelSearch(processes=2, threads=True) for _ in range(2)]
+    players: List[Player] = [ComputerPlayer(strategy) for strategy in strategies]
+    game = Game(players, grid=grid, score_grid=build_score_grid(grid), seed=1)
+    game.init_game()
+    game.bag.set_letters([])
+    for player, rack in zip(game.players, ["ge", "so"]):
+        player.rack = list(rack)
+    game.play_game()
+    assert all(strategy._executor is None for strategy in strategies)
@@ -0,0 +1,51 @@
+import os
+import time
+
+from src import game_thread
+from src.game_thread import GamePool
+from src.utils.profiling import ProfileReport, profile_call
+from src.utils.typing import typed_dict as td
+
+
+def _busy(seconds: float) -> int:
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+def _fake_game(seed=None, strategies=None) -> td.GameHistory:
+    _busy(0.05)
+    return td.GameHistory(history=[], players_score={"1/fake": [0]}, seed=seed)
+
+
+def test_profile_call_collects_stats_and_stacks():
+    result, profile = profile_call(_busy, 0.05, sampling_interval=0.001)
+    assert result > 0
+    assert any(key[2] == "_busy" for key in profile["stats"])
+    assert any("_busy" in stack for stack in profile["stacks"])
+
+
+def test_report_merges_profiles(tmp_path):
+    report = ProfileReport()
+    for _ in range(2):
+        report.add(profile_call(_busy, 0.02, sampling_interval=0.001)[1])
+    assert report.stats is not None
+    raw_stats = report.stats.stats  # type: ignore[attr-defined]
+    busy_calls = [stat[1] for key, stat in raw_stats.items() if key[2] == "_busy"]
+    assert busy_calls == [2]
+    report.write(str(tmp_path))
+    assert "_busy" in (tmp_path / "profile.txt").read_text()
+    folded = (tmp_path / "profile.folded").read_text().splitlines()
+    assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert os.path.getsize(tmp_path / "profile.pstats") > 0
+
+
+def test_pool_merges_the_profiles_of_the_workers(monkeypatch, tmp_path):
+    monkeypatch.setattr(game_thread, "play_computer_vs_computer_game", _fake_game)
+    with GamePool(2, profile=True, sampling_interval=0.001) as pool:
+        pool.run(4, seed=1, progress=False)
+    assert pool.profile_report is not None
+    assert pool.profile_report.nb_profiles == 4
+    assert any("_busy" in stack for stack in pool.profile_report.stacks)
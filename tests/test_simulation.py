@@ -0,0 +1,63 @@
+import time
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.engine.tree import BASE_TREE
+from src.engine.word_checker import WordPlacerChecker
+from src.search_strategy.NaiveSearch import NaiveSearch
+from src.search_strategy.SimulationSearch import SimulationSearch
+from src.utils.typing import typed_dict as td
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+CONTEXT = td.SearchContext(unseen=list("eaiousr"), bag_size=2, opponent_rack_size=5)
+
+
+def _candidates(checker, grid):
+    return [
+        move["play"]
+        for move in NaiveSearch().generate_moves(
+            list(ENDGAME["rack"]), checker, build_score_grid(grid), k=4
+        )
+    ]
+
+
+def _search(strategy):
+    grid = build_grid(ENDGAME)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    strategy.context = CONTEXT
+    best = strategy.find_best_word(
+        list(ENDGAME["rack"]), checker, build_score_grid(grid)
+    )
+    # the rollouts play on copies of the board
+    assert (grid.grid == build_grid(ENDGAME).grid).all()
+    assert best["play"] in _candidates(checker, grid)
+    return best
+
+
+def test_rollouts_in_process_are_reproducible():
+    strategies = [
+        SimulationSearch(nb_candidates=4, max_rollouts=8, processes=1, time_budget=60)
+        for _ in range(2)
+    ]
+    for strategy in strategies:
+        strategy.rng.seed(5)
+    assert _search(strategies[0]) == _search(strategies[1])
+    assert strategies[0].rollouts_played == 8
+
+
+def test_rollouts_in_a_process_pool_stop_at_the_budget():
+    strategy = SimulationSearch(nb_candidates=4, processes=2, time_budget=2.0)
+    start = time.perf_counter()
+    _search(strategy)
+    # the rollouts still running at the deadline are not waited for
+    assert time.perf_counter() - start < strategy.time_budget + 1.0
+    assert strategy.rollouts_played > 0
+
+
+def test_without_context_plays_the_best_score():
+    grid = build_grid(ENDGAME)
+    checker = WordPlacerChecker(grid, BASE_TREE)
+    rack = list(ENDGAME["rack"])
+    expected = NaiveSearch().find_best_word(rack, checker, build_score_grid(grid))
+    strategy = SimulationSearch(processes=1)
+    assert strategy.find_best_word(rack, checker, build_score_grid(grid)) == expected
+    assert strategy.rollouts_played == 0
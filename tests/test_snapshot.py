@@ -0,0 +1,52 @@
+import pytest
+
+from src.benchmark.positions import POSITIONS, build_grid, build_score_grid
+from src.game.game import Game
+from src.game.player import ComputerPlayer
+from src.game.snapshot import snapshot_size
+from src.search_strategy.NaiveSearch import NaiveSearch
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+
+
+def _players():
+    return [ComputerPlayer(NaiveSearch()), ComputerPlayer(NaiveSearch())]
+
+
+def test_snapshot_round_trip():
+    grid = build_grid(ENDGAME)
+    game = Game(
+        _players(), grid=grid, score_grid=build_score_grid(grid), seed=2**64 - 1
+    )
+    game.init_game()
+    game.players[0].rack = list("t*g")
+    game.players[0].score_history = [12, 30]
+    game.players[1].nb_skip_turn = 2
+    game.turn = 14
+
+    data = game.to_bytes()
+    assert len(data) == snapshot_size(2, 7)
+    restored = Game.from_bytes(data, _players())
+    assert restored.to_bytes() == data
+    assert restored.state_hash() == game.state_hash()
+    assert (restored.grid.grid == game.grid.grid).all()
+    assert (restored.score_grid.grid == game.score_grid.grid).all()
+    assert sorted(restored.bag.bag) == sorted(game.bag.bag)
+    assert restored.players[0].rack == ["t", "*", "g"]
+    assert sum(restored.players[0].score_history) == 42
+    assert restored.players[1].nb_skip_turn == 2
+    assert restored.turn == 14
+    assert restored.seed == 2**64 - 1
+
+
+def test_unseeded_game_and_invalid_snapshots():
+    game = Game(_players())
+    game.init_game()
+    data = game.to_bytes()
+    assert Game.from_bytes(data, _players()).seed is None
+    with pytest.raises(ValueError):
+        Game.from_bytes(data[:-1], _players())
+    with pytest.raises(ValueError):
+        Game.from_bytes(b"JSON" + data[4:], _players())
+    with pytest.raises(ValueError):
+        Game.from_bytes(data, _players()[:1] * 3)
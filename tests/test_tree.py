@@ -0,0 +1,21 @@
+from typing import List
+
+import pytest
+
+from src.engine.tree import BASE_TREE, convert_to_tree
+
+
+def test_built_tree_is_frozen():
+    tree = convert_to_tree(["chat", "chien"])
+    assert tree.is_word("chat")
+    with pytest.raises(RuntimeError):
+        tree.insert("rat")
+    assert not tree.is_word("rat")
+
+
+def test_search_does_not_modify_the_letters_count():
+    letters_count = {"c": 1, "h": 1, "a": 1, "t": 1, "*": 1}
+    results: List[str] = []
+    BASE_TREE.search(BASE_TREE.root, letters_count, [], results, constraint={0: "c"})
+    assert "chat" in results
+    assert letters_count == {"c": 1, "h": 1, "a": 1, "t": 1, "*": 1}
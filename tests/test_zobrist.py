@@ -0,0 +1,46 @@
+import random
+
+from src.benchmark.positions import POSITIONS, build_grid
+from src.engine import zobrist
+from src.engine.grid import Grid
+from src.game.bag import BASE_BAG
+from src.utils.typing import enum
+
+ENDGAME = next(p for p in POSITIONS if p["name"] == "endgame")
+
+
+def test_place_word_keeps_the_board_hash_up_to_date():
+    grid = build_grid(ENDGAME)
+    start = grid.hash
+    copy = grid.copy()
+    copy.place_word("lutinat", (9, 7), enum.Direction.HORIZONTAL)
+    copy.place_word("banjo", (10, 0), enum.Direction.HORIZONTAL)
+    assert copy.hash != start
+    assert copy.hash == zobrist.board_hash(copy.grid)
+    assert grid.hash == start
+    # a write through __setitem__ drops the hash, it is computed again
+    copy[9, 14] = "s"
+    assert copy.hash == zobrist.board_hash(copy.grid)
+    assert Grid().hash == zobrist.board_hash(Grid().grid) == 0
+
+
+def test_transpositions_have_the_same_hash():
+    first, second = Grid(), Grid()
+    first.place_word("ame", (7, 7), enum.Direction.HORIZONTAL)
+    first.place_word("eau", (7, 9), enum.Direction.VERTICAL)
+    second.place_word("eau", (7, 9), enum.Direction.VERTICAL)
+    second.place_word("ame", (7, 7), enum.Direction.HORIZONTAL)
+    assert first.hash == second.hash
+
+
+def test_multiset_hashes():
+    assert zobrist.rack_hash(list("tag"), 0) == zobrist.rack_hash(list("gta"), 0)
+    assert zobrist.rack_hash(list("tag"), 0) != zobrist.rack_hash(list("tag"), 1)
+    assert zobrist.rack_hash(list("ee"), 0) != zobrist.rack_hash(list("e"), 0)
+
+    bag = BASE_BAG.copy(rng=random.Random(3))
+    full = bag.hash
+    letters = list(bag.pick_n_random_letters(7))
+    assert bag.hash == zobrist.multiset_hash(bag.bag) != full
+    bag.put_back(letters)
+    assert bag.hash == full